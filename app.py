@@ -1,10 +1,50 @@
-from flask import Flask, request, render_template
+import time
+_import_start = time.perf_counter()
+
+from flask import Flask, Response, g, request, render_template, jsonify
 from src.pipelines.predict_pipeline import PredictPipeline
+from src.pipelines.serving_startup import prewarm_and_report
 from src.configuration.predict_config import CustomData
 from src.configuration import config
+from src.exception import ValidationError
+from src.logger import Logger
+from src.metrics import BATCH_SIZE, ERRORS, PHASE_LATENCY, REQUEST_LATENCY, REQUESTS, registry
+
+# Initialize the custom logger
+logger = Logger.get_logger()
+request_logger = Logger.get_hot_path_logger()
 
 app = Flask(__name__, template_folder=config.TEMPLATES_DIR)
 
+# Shared across requests; model and preprocessor are cached process-wide
+predict_pipeline = PredictPipeline()
+
+# Load and warm the artifacts before the worker accepts traffic
+if config.SERVING_PREWARM:
+    prewarm_and_report(predict_pipeline, import_seconds=time.perf_counter() - _import_start)
+
+registry.gauge("prediction_model_info", "Version (model:preprocessor) of the artifacts serving predictions.",
+               ("version",), lambda values: {(predict_pipeline.model_version(),): 1})
+
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def record_request_metrics(response):
+    endpoint = request.endpoint or "unmatched"
+    REQUESTS.inc(endpoint, str(response.status_code))
+    REQUEST_LATENCY.observe(time.perf_counter() - g.request_start, endpoint)
+    return response
+
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus metrics, summed over all worker processes."""
+    return Response(registry.render(), mimetype="text/plain; version=0.0.4")
+
 
 @app.route('/')
 def index():
@@ -20,32 +60,81 @@ def predict_datapoint():
 
     try:
         # Extract and validate input data
-        data = CustomData(
-            gender=request.form.get('gender', '').strip(),
-            race_ethnicity=request.form.get('ethnicity', '').strip(),
-            parental_level_of_education=request.form.get('parental_level_of_education', '').strip(),
-            lunch=request.form.get('lunch', '').strip(),
-            test_preparation_course=request.form.get('test_preparation_course', '').strip(),
-            reading_score=int(request.form.get('reading_score', 0)),  # Fixed incorrect field mapping
-            writing_score=int(request.form.get('writing_score', 0))   # Fixed incorrect field mapping
-        )
-
-        # Convert input data to DataFrame
-        pred_df = data.get_data_as_dataframe()
-
-        # Debugging log
-        print(f"Received Data: {pred_df.to_dict(orient='records')}")
-
-        # Model Prediction
-        predict_pipeline = PredictPipeline()
-        results = predict_pipeline.predict(pred_df)
+        with PHASE_LATENCY.time("parse"):
+            form = request.form
+        with PHASE_LATENCY.time("validate"):
+            record = CustomData.from_form(form).__dict__
+
+        request_logger.info("Received prediction request", extra={"record": record})
+
+        # Model Prediction (compiled single-record fast path when available)
+        results = predict_pipeline.predict_record(record)
+
+        return _render_home(results=results[0])
 
-        return render_template('home.html', results=results[0])
+    except ValidationError as e:
+        ERRORS.inc(request.endpoint, "validation")
+        request_logger.info("Rejected invalid input: %s", e)
+        return _render_home(error="Invalid input or prediction error.")
+
+    except Exception as e:
+        ERRORS.inc(request.endpoint, "prediction")
+        logger.error("Form prediction failed: %s", type(e).__name__)
+        return _render_home(error="Invalid input or prediction error.")
+
+
+def _render_home(**context):
+    with PHASE_LATENCY.time("render"):
+        return render_template('home.html', **context)
+
+
+def _batch_records():
+    """Parses and validates a JSON batch request; returns (records, None) or (None, error response)."""
+    with PHASE_LATENCY.time("parse"):
+        payload = request.get_json(silent=True)
+        records = payload.get('records') if isinstance(payload, dict) else payload
+
+    if isinstance(records, list) and len(records) > predict_pipeline.config.max_batch_records:
+        ERRORS.inc(request.endpoint, "validation")
+        return None, (jsonify(error=f"Batch too large: at most {predict_pipeline.config.max_batch_records} records."), 413)
+
+    # Validate the whole batch before scoring any of it
+    with PHASE_LATENCY.time("validate"):
+        errors = CustomData.validate_records(records)
+    if errors:
+        ERRORS.inc(request.endpoint, "validation")
+        return None, (jsonify(error="Invalid input.", details=errors), 400)
+    BATCH_SIZE.observe(len(records), "request")
+    return records, None
+
+
+def _batch_response(results):
+    with PHASE_LATENCY.time("render"):
+        return jsonify(predictions=results.tolist(), count=len(results))
+
+
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    """Score a JSON batch of records with a single transform + predict call."""
+    records, error = _batch_records()
+    if error:
+        return error
+    if not records:
+        return jsonify(predictions=[], count=0)
+
+    try:
+        with PHASE_LATENCY.time("build_frame"):
+            pred_df = CustomData.records_to_dataframe(records)
+        results = predict_pipeline.predict(pred_df)
+        return _batch_response(results)
 
     except Exception as e:
-        print(f"Error: {e}")  # Replace with proper logging in production
-        return render_template('home.html', error="Invalid input or prediction error.")
+        ERRORS.inc(request.endpoint, "prediction")
+        logger.error("Batch prediction failed: %s", type(e).__name__)
+        return jsonify(error="Prediction error."), 500
 
 
 if __name__ == "__main__":
+    # Development server only (a single process, its metrics stay in memory); in production run
+    # `gunicorn --config gunicorn.conf.py app:app`
     app.run(host="0.0.0.0", port=5001, debug=True)
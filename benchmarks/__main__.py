@@ -0,0 +1,71 @@
+"""
+Benchmark command line.
+
+    python -m benchmarks generate data/synthetic.csv --rows 5000000
+    python -m benchmarks run --rows 1000000 --output benchmarks/results/current.json
+    python -m benchmarks compare baseline.json current.json --threshold 0.10 --threshold-for predict/batch_1=0.25
+
+`compare` exits with status 1 when any benchmark regressed beyond its threshold.
+"""
+import argparse
+import sys
+
+from benchmarks.harness import compare_results, environment, format_comparison, load_results, save_results
+from benchmarks.suite import GROUPS, run_suite
+from benchmarks.synthetic_data import write_dataset
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Training and serving benchmarks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="Write a synthetic dataset shaped like rawData.csv.")
+    generate.add_argument("output_path")
+    generate.add_argument("--rows", type=int, default=1_000_000)
+    generate.add_argument("--seed", type=int, default=0)
+
+    run = commands.add_parser("run", help="Run the benchmarks and save the results as JSON.")
+    run.add_argument("--output", required=True)
+    run.add_argument("--rows", type=int, default=100_000)
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--repeat", type=int, default=5)
+    run.add_argument("--only", nargs="+", choices=GROUPS)
+    run.add_argument("--workdir", help="Keep the generated data and artifacts here instead of a temp dir.")
+    run.add_argument("--search-rows", type=int, default=5_000)
+    run.add_argument("--search-strategy", choices=("grid", "pooled", "halving"))
+
+    compare = commands.add_parser("compare", help="Compare two result files.")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown, as a fraction.")
+    compare.add_argument("--threshold-for", action="append", default=[], metavar="NAME=FRACTION",
+                         help="Per-benchmark threshold override (repeatable).")
+    compare.add_argument("--metric", default="median_s", choices=("median_s", "min_s", "mean_s", "p95_s"))
+
+    args = parser.parse_args(argv)
+
+    if args.command == "generate":
+        print(write_dataset(args.output_path, args.rows, seed=args.seed))
+        return 0
+
+    if args.command == "run":
+        results = run_suite(rows=args.rows, seed=args.seed, repeat=args.repeat, only=args.only,
+                            workdir=args.workdir, search_rows=args.search_rows,
+                            search_strategy=args.search_strategy)
+        meta = dict(environment(), rows=args.rows, seed=args.seed, repeat=args.repeat,
+                    search_rows=args.search_rows)
+        print(save_results(args.output, results, meta))
+        return 0
+
+    thresholds = {}
+    for override in args.threshold_for:
+        name, _, value = override.rpartition("=")
+        thresholds[name] = float(value)
+    rows = compare_results(load_results(args.baseline), load_results(args.current), threshold=args.threshold,
+                           thresholds=thresholds, metric=args.metric)
+    print(format_comparison(rows))
+    return 1 if any(row["status"] == "regression" for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
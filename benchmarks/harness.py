@@ -0,0 +1,121 @@
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+import numpy as np
+
+
+def measure(fn: Callable[[], object], repeat: int = 5, warmup: int = 1, setup: Callable[[], object] = None,
+            items: int = None) -> dict:
+    """
+    Times `fn` over `repeat` runs after `warmup` untimed runs.
+
+    `setup` runs (untimed) before every run, e.g. to remove outputs a stage would otherwise reuse.
+    With `items` (rows, requests, ...) per run, the result also reports the throughput.
+    """
+    for _ in range(warmup):
+        if setup is not None:
+            setup()
+        fn()
+
+    seconds = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        seconds.append(time.perf_counter() - start)
+
+    seconds = np.asarray(seconds)
+    result = {
+        "repeat": repeat,
+        "min_s": float(seconds.min()),
+        "median_s": float(np.median(seconds)),
+        "mean_s": float(seconds.mean()),
+        "p95_s": float(np.percentile(seconds, 95)),
+    }
+    if items:
+        result["items"] = items
+        result["items_per_s"] = items / result["median_s"] if result["median_s"] else float("inf")
+    return result
+
+
+def environment() -> dict:
+    """Describes where the benchmarks ran, so results from different machines are not mixed up silently."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def save_results(file_path: str, results: Dict[str, dict], meta: dict) -> str:
+    os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+    with open(file_path, "w") as file:
+        json.dump({"meta": meta, "results": results}, file, indent=2)
+    return file_path
+
+
+def load_results(file_path: str) -> dict:
+    with open(file_path) as file:
+        return json.load(file)
+
+
+def compare_results(baseline: dict, current: dict, threshold: float = 0.10,
+                    thresholds: Dict[str, float] = None, metric: str = "median_s") -> List[dict]:
+    """
+    Compares two result files benchmark by benchmark.
+
+    A benchmark regresses when its `metric` grew by more than its threshold (a fraction: 0.10 means
+    10% slower); `thresholds` overrides the default per benchmark name. Benchmarks present in only
+    one run are reported with status "added" or "removed".
+
+    Returns:
+        list: One row per benchmark with baseline, current, ratio and status
+        ("regression", "improvement", "ok", "added" or "removed").
+    """
+    thresholds = thresholds or {}
+    base_results, current_results = baseline["results"], current["results"]
+    rows = []
+    for name in sorted(set(base_results) | set(current_results)):
+        if name not in current_results:
+            rows.append({"name": name, "status": "removed"})
+            continue
+        if name not in base_results:
+            rows.append({"name": name, "status": "added", "current": current_results[name][metric]})
+            continue
+
+        before, after = base_results[name][metric], current_results[name][metric]
+        ratio = after / before if before else float("inf")
+        limit = thresholds.get(name, threshold)
+        if ratio > 1 + limit:
+            status = "regression"
+        elif ratio < 1 - limit:
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append({"name": name, "baseline": before, "current": after, "ratio": ratio,
+                     "threshold": limit, "status": status})
+    return rows
+
+
+def format_comparison(rows: List[dict]) -> str:
+    lines = [f"{'benchmark':<45} {'baseline':>12} {'current':>12} {'ratio':>8}  status"]
+    for row in rows:
+        if "ratio" in row:
+            lines.append(f"{row['name']:<45} {row['baseline']:>12.6f} {row['current']:>12.6f} "
+                         f"{row['ratio']:>8.3f}  {row['status']}")
+        else:
+            lines.append(f"{row['name']:<45} {'':>12} {'':>12} {'':>8}  {row['status']}")
+    return "\n".join(lines)
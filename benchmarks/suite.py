@@ -0,0 +1,158 @@
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+import numpy as np
+from sklearn.linear_model import LinearRegression
+
+from benchmarks.harness import measure
+from benchmarks.synthetic_data import write_dataset
+from src.components.data_ingestion import DataIngestion
+from src.components.data_transformation import DataTransformation
+from src.components.model_exporter import ModelExporter
+from src.components.model_trainer import ModelTrainer
+from src.components.preprocessor_compiler import PreprocessorCompiler
+from src.configuration import config
+from src.configuration.predict_config import PredictConfig
+from src.metrics import registry as metrics_registry
+from src.pipelines.predict_pipeline import PredictPipeline
+from src.utils import evaluate_models, load_frame, load_object, save_object
+
+# Benchmark groups, in the order they run; `run_suite(only=...)` selects by these prefixes
+GROUPS = ("ingestion", "transformation", "search", "load_object", "predict", "flask")
+PREDICT_BATCH_SIZES = (1, 100, 10_000)
+FLASK_REQUESTS_PER_RUN = 100
+
+
+def run_suite(rows: int = 100_000, seed: int = 0, repeat: int = 5, only=None, workdir: str = None,
+              search_rows: int = 5_000, search_strategy: str = None) -> dict:
+    """
+    Runs the training and serving benchmarks on a synthetic dataset of `rows` rows.
+
+    Everything is written under `workdir` (a temporary directory by default), never to the
+    project's artifacts: the serving metrics snapshots and startup report are redirected there
+    too, and the metrics the benchmarks recorded are cleared at the end. Model searches run once each on `search_rows` training rows, since a
+    full grid search on millions of rows is not a useful benchmark. Serving benchmarks score
+    through the model path: the prediction cache and prediction table are disabled.
+
+    Returns:
+        dict: Timing results keyed by benchmark name (e.g. "predict/batch_100").
+    """
+    selected = set(only or GROUPS)
+    own_workdir = workdir is None
+    workdir = workdir or tempfile.mkdtemp(prefix="benchmarks_")
+    os.makedirs(workdir, exist_ok=True)
+    results = {}
+
+    def run(group, name, fn, **kwargs):
+        if group in selected:
+            results[name] = measure(fn, **kwargs)
+        return fn()
+
+    redirects = [patch.object(config, "METRICS_DIR", os.path.join(workdir, "metrics")),
+                 patch.object(config, "STARTUP_REPORT_FILE", os.path.join(workdir, "startup_report.json"))]
+    for redirect in redirects:
+        redirect.start()
+
+    try:
+        dataset_path = write_dataset(os.path.join(workdir, "dataset.csv"), rows, seed=seed)
+
+        # Training: ingestion and transformation (always run, since serving needs their outputs)
+        ingestion = DataIngestion()
+        ingestion.ingestion_config.dataset_file = dataset_path
+        ingestion.ingestion_config.raw_data_path = os.path.join(workdir, "data.csv")
+        ingestion.ingestion_config.train_data_path = os.path.join(workdir, "train.csv")
+        ingestion.ingestion_config.test_data_path = os.path.join(workdir, "test.csv")
+        ingestion.ingestion_config.report_file_path = os.path.join(workdir, "ingestion_report.json")
+        train_path, test_path = run("ingestion", "ingestion", ingestion.initiate_data_ingestion,
+                                    repeat=repeat, items=rows)
+
+        transformation = DataTransformation()
+        preprocessor_path = os.path.join(workdir, "preprocessor.pkl")
+        transformation.data_transformation_config.preprocessor_obj_file_path = preprocessor_path
+        x_train, y_train, x_test, y_test, _ = run(
+            "transformation", "transformation",
+            lambda: transformation.initiate_split_transformation(train_path, test_path), repeat=repeat, items=rows)
+
+        # Training: one hyperparameter search per model family
+        if "search" in selected:
+            trainer = ModelTrainer()
+            journal_path = os.path.join(workdir, "search_journal.jsonl")
+            n_search, n_eval = min(search_rows, x_train.shape[0]), min(search_rows, x_test.shape[0])
+            with patch.object(config, "SEARCH_JOURNAL_FILE", journal_path):
+                for model_name, model in trainer.models.items():
+                    results[f"search/{model_name}"] = measure(
+                        lambda: evaluate_models(x_train[:n_search], y_train[:n_search], x_test[:n_eval],
+                                                y_test[:n_eval], {model_name: model},
+                                                {model_name: trainer.model_config.get(model_name, {})},
+                                                search_strategy=search_strategy),
+                        repeat=1, warmup=0, items=n_search,
+                        setup=lambda: os.path.exists(journal_path) and os.remove(journal_path))
+
+        # Serving artifacts: a quick model plus the compiled preprocessor and portable export
+        model_path = os.path.join(workdir, "model.pkl")
+        save_object(model_path, LinearRegression().fit(x_train, y_train),
+                    metadata={"feature_dtype": config.FEATURE_DTYPE})
+        compiler = PreprocessorCompiler()
+        compiled_path = os.path.join(workdir, "compiled_preprocessor.pkl")
+        compiler.data_transformation_config.compiled_preprocessor_obj_file_path = compiled_path
+        compiler.initiate_preprocessor_compilation(preprocessor_path, test_path)
+        exporter = ModelExporter()
+        exporter.model_trainer_config.portable_model_file_path = os.path.join(workdir, "model_portable.npz")
+        exporter.initiate_model_export(model_path, x_test)
+
+        for name, path in (("preprocessor", preprocessor_path), ("model", model_path)):
+            run("load_object", f"load_object/{name}", lambda path=path: load_object(path), repeat=repeat)
+
+        pipeline = PredictPipeline(PredictConfig(
+            model_path=model_path, preprocessor_path=preprocessor_path, compiled_preprocessor_path=compiled_path,
+            portable_model_path=exporter.model_trainer_config.portable_model_file_path,
+            prediction_cache_max_entries=0, use_prediction_table=False, micro_batching=False,
+        ))
+        features = load_frame(test_path).drop(columns=["math_score"])
+        rng = np.random.default_rng(seed)
+        for batch_size in PREDICT_BATCH_SIZES:
+            batch = features.iloc[rng.integers(0, len(features), size=batch_size)].reset_index(drop=True)
+            run("predict", f"predict/batch_{batch_size}", lambda batch=batch: pipeline.predict(batch),
+                repeat=repeat, items=batch_size)
+        record = features.iloc[0].to_dict()
+        run("predict", "predict/record", lambda: pipeline.predict_record(record), repeat=repeat, items=1)
+
+        if "flask" in selected:
+            results["flask/predictdata"] = _measure_flask(pipeline, features.iloc[:FLASK_REQUESTS_PER_RUN], repeat)
+
+        return results
+
+    finally:
+        # Nothing is left for the metrics writer to flush once METRICS_DIR is restored
+        metrics_registry.clear()
+        for redirect in reversed(redirects):
+            redirect.stop()
+        if own_workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def _measure_flask(pipeline, features, repeat: int) -> dict:
+    """Times POST /predictdata through the Flask test client, `len(features)` requests per run."""
+    with patch.object(config, "SERVING_PREWARM", False):
+        import app as app_module
+
+    forms = [{
+        "gender": row["gender"],
+        "ethnicity": row["race_ethnicity"],
+        "parental_level_of_education": row["parental_level_of_education"],
+        "lunch": row["lunch"],
+        "test_preparation_course": row["test_preparation_course"],
+        "reading_score": str(row["reading_score"]),
+        "writing_score": str(row["writing_score"]),
+    } for row in features.astype(object).to_dict(orient="records")]
+
+    def post_all():
+        for form in forms:
+            response = client.post("/predictdata", data=form)
+            if response.status_code != 200:
+                raise RuntimeError(f"/predictdata returned {response.status_code}")
+
+    with patch.object(app_module, "predict_pipeline", pipeline), app_module.app.test_client() as client:
+        return measure(post_all, repeat=repeat, items=len(forms))
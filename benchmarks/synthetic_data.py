@@ -0,0 +1,39 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.configuration import config
+
+SCORE_COLUMNS = ("math_score", "reading_score", "writing_score")
+
+
+def generate_dataset(n_rows: int, seed: int = 0, source: pd.DataFrame = None, noise: float = 3.0) -> pd.DataFrame:
+    """
+    Generates `n_rows` rows shaped like rawData.csv.
+
+    Rows are resampled from the source dataset, so the joint distribution of the categoricals and
+    their relationship with the scores are kept; each score gets Gaussian noise (std `noise`) and
+    is clipped to 0-100. The same seed always gives the same rows.
+    """
+    if source is None:
+        source = pd.read_csv(config.DATASET_FILE)
+    rng = np.random.default_rng(seed)
+    df = source.iloc[rng.integers(0, len(source), size=n_rows)].reset_index(drop=True)
+    for column in SCORE_COLUMNS:
+        jittered = df[column].to_numpy(dtype=np.float64) + rng.normal(scale=noise, size=n_rows)
+        df[column] = np.clip(np.rint(jittered), 0, 100).astype(np.int64)
+    return df
+
+
+def write_dataset(file_path: str, n_rows: int, seed: int = 0, chunk_size: int = 500_000) -> str:
+    """Writes a synthetic dataset of `n_rows` rows to CSV in chunks, so millions of rows fit in memory."""
+    os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+    source = pd.read_csv(config.DATASET_FILE)
+    tmp_path = f"{file_path}.tmp.{os.getpid()}"
+    for chunk, start in enumerate(range(0, n_rows, chunk_size)):
+        rows = min(chunk_size, n_rows - start)
+        generate_dataset(rows, seed=seed + chunk, source=source).to_csv(
+            tmp_path, mode="w" if chunk == 0 else "a", header=chunk == 0, index=False)
+    os.replace(tmp_path, file_path)
+    return file_path
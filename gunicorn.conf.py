@@ -0,0 +1,80 @@
+"""
+Production server settings: `gunicorn --config gunicorn.conf.py app:app`
+
+Each setting can be overridden with the matching SERVER_* environment variable (or WEB_CONCURRENCY
+for the worker count); defaults live in src/configuration/config.py.
+
+With `preload_app`, the master imports the app once and warms the model and preprocessor before
+forking, so every worker starts ready and shares the loaded pages copy-on-write.
+
+Concurrency comes from `workers` processes x `threads` per worker (the gthread worker class):
+a request holds one worker thread while it is scored, and NumPy/sklearn release the GIL for most
+of a transform + predict, so the threads of a worker overlap. There is no async endpoint: under
+a WSGI worker an async view still blocks its worker thread for the whole request. Large batches
+go to `/predict/batch`, which scores them with one vectorized call.
+
+`/metrics` answers from whichever worker takes the scrape, but covers all of them: every worker
+writes its totals to METRICS_DIR each second and the scrape sums those snapshots. The directory
+is cleared when the server starts, and the snapshot of an exited worker is folded into one
+retired total, so the counters never go backwards.
+
+Graceful reload:
+- A retrained model needs no restart: workers pick up changed artifacts on their next request.
+- `kill -HUP <master>` replaces the workers gracefully (in-flight requests finish within
+  graceful_timeout). New workers are forked from the preloaded master, so to deploy new code run
+  `kill -USR2 <master>` (starts a new master alongside the old one), then `kill -QUIT <old master>`.
+"""
+import multiprocessing
+import os
+
+# Aliased: `config` is itself a gunicorn setting name
+from src.configuration import config as app_config
+from src.logger import Logger
+from src.metrics import registry as metrics_registry
+
+
+# Initialize the custom logger
+logger = Logger.get_logger()
+
+
+def _env(name, default, cast=int):
+    value = os.environ.get(name)
+    return default if value in (None, "") else cast(value)
+
+
+bind = _env("SERVER_BIND", app_config.SERVER_BIND, str)
+workers = _env("WEB_CONCURRENCY", _env("SERVER_WORKERS", app_config.SERVER_WORKERS)
+               or 2 * multiprocessing.cpu_count() + 1)
+threads = _env("SERVER_THREADS", app_config.SERVER_THREADS)
+preload_app = _env("SERVER_PRELOAD", app_config.SERVER_PRELOAD, lambda value: value.lower() in ("1", "true", "yes"))
+timeout = _env("SERVER_TIMEOUT", app_config.SERVER_TIMEOUT)
+graceful_timeout = _env("SERVER_GRACEFUL_TIMEOUT", app_config.SERVER_GRACEFUL_TIMEOUT)
+max_requests = _env("SERVER_MAX_REQUESTS", app_config.SERVER_MAX_REQUESTS)
+max_requests_jitter = max_requests // 10
+worker_class = "gthread" if threads > 1 else "sync"
+
+
+def on_starting(server):
+    # Start /metrics from zero: drop the snapshots of a previous server and the prewarm of this one.
+    # Only the server shares its metrics through METRICS_DIR; the workers inherit the setting.
+    metrics_registry.clear()
+    metrics_registry.enable_snapshots()
+
+
+def when_ready(server):
+    logger.info(f"Server ready on {bind}: {workers} workers x {threads} threads (preload={preload_app}).")
+
+
+def post_fork(server, worker):
+    logger.info(f"Worker {worker.pid} started.")
+
+
+def worker_exit(server, worker):
+    # Runs in the exiting worker: write its final totals for `child_exit` to retire
+    metrics_registry.flush()
+    logger.info(f"Worker {worker.pid} exited.")
+
+
+def child_exit(server, worker):
+    # Runs in the master once the worker is gone
+    metrics_registry.retire(worker.pid)
@@ -0,0 +1,151 @@
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable
+
+from src.configuration import config
+from src.logger import Logger
+from src.utils import load_object
+
+
+# Initialize the custom logger
+logger = Logger.get_logger()
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    """A loaded artifact together with the file state it was loaded from."""
+    obj: Any
+    signature: tuple
+    version: str
+    checked_at: float
+
+
+class ArtifactCache:
+    """
+    Process-wide cache of deserialized artifacts (model, preprocessor, ...).
+
+    Each file is loaded once and shared across requests and threads. When the file
+    changes on disk (mtime/size/inode, confirmed by a content hash) the first request to
+    notice loads the new object and swaps it in atomically; requests already holding the
+    old object keep using it until they finish.
+    """
+
+    _cache = None  # Static instance
+    _cache_lock = threading.Lock()
+
+    def __init__(self, loader: Callable[[str], Any] = None,
+                 check_interval: float = config.ARTIFACT_CACHE_CHECK_INTERVAL,
+                 hash_content: bool = config.ARTIFACT_CACHE_HASH_CONTENT):
+        self._loader = loader or partial(load_object, mmap_mode="r" if config.ARTIFACT_MMAP else None)
+        self.check_interval = check_interval
+        self.hash_content = hash_content
+        self._entries = {}
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    @staticmethod
+    def get_cache():
+        """Returns the process-wide artifact cache (singleton)."""
+        if ArtifactCache._cache is None:
+            with ArtifactCache._cache_lock:
+                if ArtifactCache._cache is None:
+                    ArtifactCache._cache = ArtifactCache()
+        return ArtifactCache._cache
+
+    def get(self, file_path) -> Any:
+        """Returns the cached object for `file_path`, reloading it if the file has changed."""
+        return self.get_entry(file_path).obj
+
+    def get_entry(self, file_path) -> CacheEntry:
+        """Returns the cache entry (object, file signature and version) for `file_path`."""
+        file_path = str(file_path)
+        entry = self._entries.get(file_path)
+
+        # Fast path: recently checked, no file system access at all
+        if entry is not None and time.monotonic() - entry.checked_at < self.check_interval:
+            return entry
+
+        try:
+            signature = self._signature(file_path)
+        except FileNotFoundError:
+            if entry is not None:
+                # File is being replaced; keep serving what we have
+                return entry
+            raise
+
+        if entry is not None and entry.signature == signature:
+            entry = CacheEntry(entry.obj, entry.signature, entry.version, time.monotonic())
+            self._entries[file_path] = entry
+            return entry
+
+        return self._reload(file_path, signature)
+
+    def version(self, file_path) -> str:
+        """Returns the version (content hash or file signature) of the cached artifact."""
+        return self.get_entry(file_path).version
+
+    def invalidate(self, file_path=None):
+        """Drops one cached artifact, or all of them when no path is given."""
+        if file_path is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(str(file_path), None)
+
+    def _reload(self, file_path: str, signature: tuple) -> CacheEntry:
+        """Loads `file_path` under a per-file lock so concurrent requests trigger a single load."""
+        with self._lock_for(file_path):
+            entry = self._entries.get(file_path)
+            # Another thread may have finished the load while we were waiting
+            if entry is not None and entry.signature == signature:
+                return entry
+
+            version = self._content_hash(file_path) if self.hash_content else self._format_signature(signature)
+            if entry is not None and entry.version == version:
+                # Touched or rewritten with identical bytes: nothing to reload
+                entry = CacheEntry(entry.obj, signature, version, time.monotonic())
+                self._entries[file_path] = entry
+                return entry
+
+            try:
+                obj = self._loader(file_path)
+            except Exception:
+                if entry is not None:
+                    logger.warning(f"Reload of {file_path} failed; keeping version {entry.version[:12]}")
+                    # Recorded under the failed file's signature: retried only once the file changes again
+                    entry = CacheEntry(entry.obj, signature, entry.version, time.monotonic())
+                    self._entries[file_path] = entry
+                    return entry
+                raise
+
+            new_entry = CacheEntry(obj, signature, version, time.monotonic())
+            self._entries[file_path] = new_entry  # Atomic swap
+            if entry is None:
+                logger.info(f"Artifact cached: {file_path} (version {version[:12]})")
+            else:
+                logger.info(f"Artifact reloaded: {file_path} ({entry.version[:12]} -> {version[:12]})")
+            return new_entry
+
+    def _lock_for(self, file_path: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(file_path, threading.Lock())
+
+    @staticmethod
+    def _signature(file_path: str) -> tuple:
+        stat = os.stat(file_path)
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    @staticmethod
+    def _format_signature(signature: tuple) -> str:
+        return "-".join(str(part) for part in signature)
+
+    @staticmethod
+    def _content_hash(file_path: str, chunk_size: int = 1 << 20) -> str:
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as file:
+            for chunk in iter(lambda: file.read(chunk_size), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
@@ -1,10 +1,16 @@
 import os
+import time
+from contextlib import ExitStack
+import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
 
 from src.exception import CustomException
+from src.configuration import config
 from src.configuration.data_ingestion_config import DataIngestionConfig
+from src.instrumentation import annotate
 from src.logger import Logger
+from src.utils import FrameWriter, apply_schema, save_frame, save_json
 
 
 # Initialize the custom logger
@@ -21,25 +27,101 @@ class DataIngestion:
             if not os.path.exists(self.ingestion_config.dataset_file):
                 raise CustomException(f"Dataset file not found: {self.ingestion_config.dataset_file}")
 
-            df = pd.read_csv(self.ingestion_config.dataset_file)
+            if config.INGESTION_STREAMING:
+                return self.initiate_streaming_ingestion()
+
+            df = apply_schema(pd.read_csv(self.ingestion_config.dataset_file))
             logger.info("Dataset successfully loaded into a DataFrame.")
+            annotate(rows=len(df))
 
             os.makedirs(os.path.dirname(self.ingestion_config.train_data_path), exist_ok=True)
 
-            df.to_csv(self.ingestion_config.raw_data_path, index=False, header=True)
+            self._save(df, self.ingestion_config.raw_data_path)
 
             logger.info("Splitting dataset into training and test sets...")
-            train_set, test_set = train_test_split(df, test_size=0.2, random_state=4)
+            train_set, test_set = train_test_split(df, test_size=config.TEST_SIZE, random_state=config.SPLIT_RANDOM_STATE)
 
-            train_set.to_csv(self.ingestion_config.train_data_path, index=False, header=True)
-            test_set.to_csv(self.ingestion_config.test_data_path, index=False, header=True)
+            train_path = self._save(train_set, self.ingestion_config.train_data_path)
+            test_path = self._save(test_set, self.ingestion_config.test_data_path)
 
-            logger.info("Data ingestion completed successfully.")
-            return self.ingestion_config.train_data_path, self.ingestion_config.test_data_path
+            logger.info(f"Data ingestion completed successfully ({config.INTERMEDIATE_FORMAT} intermediates).")
+            return train_path, test_path
 
         except Exception as e:
             raise CustomException("Data ingestion failed!", cause=e)
 
+    def initiate_streaming_ingestion(self):
+        """
+        Splits the dataset into train/test without loading it into memory.
+
+        The dataset is read in chunks of `INGESTION_CHUNK_SIZE` rows; each row goes to the test set
+        when the seeded hash of its row key falls below `TEST_SIZE`, so the split is deterministic,
+        independent of the chunk size, and approximately (not exactly) `TEST_SIZE` of the rows.
+        Chunks are appended to the raw/train/test intermediates as they are read.
+        """
+        logger.info(f"Starting streaming data ingestion (chunks of {config.INGESTION_CHUNK_SIZE} rows)...")
+        try:
+            os.makedirs(os.path.dirname(self.ingestion_config.train_data_path), exist_ok=True)
+            start = time.perf_counter()
+            chunks = 0
+
+            formats = [config.INTERMEDIATE_FORMAT]
+            if config.EXPORT_CSV and config.INTERMEDIATE_FORMAT != "csv":
+                formats.append("csv")
+            paths = {
+                "raw": self.ingestion_config.raw_data_path,
+                "train": self.ingestion_config.train_data_path,
+                "test": self.ingestion_config.test_data_path,
+            }
+
+            with ExitStack() as stack:
+                writers = {
+                    split: [stack.enter_context(FrameWriter(path, file_format)) for file_format in formats]
+                    for split, path in paths.items()
+                }
+                for chunk in pd.read_csv(self.ingestion_config.dataset_file, chunksize=config.INGESTION_CHUNK_SIZE):
+                    chunk = apply_schema(chunk)
+                    is_test = self.assign_test_rows(chunk)
+                    for split, rows in [("raw", chunk), ("train", chunk[~is_test]), ("test", chunk[is_test])]:
+                        for writer in writers[split]:
+                            writer.write(rows)
+                    chunks += 1
+
+            raw_writer, train_writer, test_writer = (writers[split][0] for split in paths)
+            elapsed = time.perf_counter() - start
+            report = {
+                "mode": "streaming",
+                "rows": raw_writer.rows,
+                "train_rows": train_writer.rows,
+                "test_rows": test_writer.rows,
+                "chunks": chunks,
+                "seconds": round(elapsed, 3),
+                "rows_per_second": round(raw_writer.rows / elapsed, 1) if elapsed > 0 else 0.0,
+            }
+            save_json(self.ingestion_config.report_file_path, report)
+            annotate(rows=raw_writer.rows, chunks=chunks)
+            logger.info(f"Streaming data ingestion completed: {report}")
+            return train_writer.file_path, test_writer.file_path
+
+        except Exception as e:
+            raise CustomException("Streaming data ingestion failed!", cause=e)
+
+    @staticmethod
+    def assign_test_rows(chunk: pd.DataFrame) -> np.ndarray:
+        """Returns a boolean mask of the rows whose seeded row-key hash puts them in the test set."""
+        key_columns = config.INGESTION_ROW_KEY or list(chunk.columns)
+        hashes = pd.util.hash_pandas_object(chunk[key_columns], index=False,
+                                            hash_key=f"{config.SPLIT_RANDOM_STATE:016x}"[-16:]).to_numpy()
+        return hashes < np.uint64(config.TEST_SIZE * 2 ** 64)
+
+    @staticmethod
+    def _save(df, file_path):
+        """Writes a split in the intermediate format, plus a CSV copy when EXPORT_CSV is set."""
+        saved_path = save_frame(df, file_path)
+        if config.EXPORT_CSV and config.INTERMEDIATE_FORMAT != "csv":
+            save_frame(df, file_path, file_format="csv")
+        return saved_path
+
 
 if __name__ == '__main__':
 
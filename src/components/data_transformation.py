@@ -1,21 +1,25 @@
 import os
-import sys
 import numpy as np
-import pandas as pd
+from scipy import sparse
 from sklearn.compose import ColumnTransformer
 from sklearn.impute import SimpleImputer
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import OneHotEncoder, StandardScaler
 
+from src.configuration import config
 from src.configuration.data_transformation_config import DataTransformationConfig
 from src.exception import CustomException
-from src.utils import save_object
+from src.instrumentation import annotate
+from src.utils import load_frame, save_object
 from src.logger import Logger
 
 
 # Initialize the custom logger
 logger = Logger.get_logger()
 
+# ColumnTransformer.sparse_threshold for each config.FEATURE_LAYOUT ("auto" is the sklearn default)
+SPARSE_THRESHOLDS = {"dense": 0.0, "sparse": 1.0, "auto": 0.3}
+
 
 class DataTransformation:
     def __init__(self):
@@ -59,13 +63,13 @@ class DataTransformation:
                 transformers=[
                     ("num_pipeline", num_pipeline, numerical_columns),
                     ("cat_pipeline", cat_pipeline, categorical_columns),
-                ]
+                ],
+                sparse_threshold=SPARSE_THRESHOLDS[config.FEATURE_LAYOUT],
             )
 
             return preprocessor
 
         except Exception as e:
-            logger.error(f"Error creating data transformer: {str(e)}")
             raise CustomException("Failed to create preprocessing pipeline", cause=e)
 
     def initiate_data_transformation(self, train_path: str, test_path: str):
@@ -77,6 +81,32 @@ class DataTransformation:
             - Transformed test data as a NumPy array
             - Path to the saved preprocessing object
         """
+        x_train, y_train, x_test, y_test, preprocessor_path = self._transform(train_path, test_path)
+
+        # Concatenate transformed features with target column
+        train_arr = np.c_[_dense(x_train), y_train]
+        test_arr = np.c_[_dense(x_test), y_test]
+        return train_arr, test_arr, preprocessor_path
+
+    def initiate_split_transformation(self, train_path: str, test_path: str):
+        """
+        Like `initiate_data_transformation`, but keeps the features and target apart.
+
+        Features are returned as the preprocessor produced them (a CSR matrix when the
+        ColumnTransformer output is sparse, see config.FEATURE_LAYOUT) in config.FEATURE_DTYPE,
+        so no dense float64 copy with the target packed in is ever built.
+
+        Returns:
+            tuple: (x_train, y_train, x_test, y_test, preprocessor path)
+        """
+        x_train, y_train, x_test, y_test, preprocessor_path = self._transform(train_path, test_path)
+        logger.info(f"Features: {x_train.shape[1]} columns, "
+                    f"{'sparse' if sparse.issparse(x_train) else 'dense'} {config.FEATURE_DTYPE}.")
+        return (x_train.astype(config.FEATURE_DTYPE, copy=False), y_train,
+                x_test.astype(config.FEATURE_DTYPE, copy=False), y_test, preprocessor_path)
+
+    def _transform(self, train_path: str, test_path: str):
+        """Fits the preprocessor on train, transforms train and test, and saves the preprocessor."""
         try:
             # Ensure train & test files exist
             if not os.path.exists(train_path):
@@ -84,21 +114,22 @@ class DataTransformation:
             if not os.path.exists(test_path):
                 raise FileNotFoundError(f"Test file not found: {test_path}")
 
-            train_df = pd.read_csv(train_path)
-            test_df = pd.read_csv(test_path)
+            train_df = load_frame(train_path)
+            test_df = load_frame(test_path)
 
             logger.info(f"Successfully loaded train ({train_path}) and test ({test_path}) datasets.")
+            annotate(rows=len(train_df) + len(test_df))
 
             preprocessing_obj = self.get_data_transformer_object()
 
             target_column_name = "math_score"
 
             # Separate input & target features
-            x_train = train_df.drop(columns=[target_column_name], axis=1)
-            y_train = train_df[target_column_name]
+            x_train = train_df.drop(columns=[target_column_name])
+            y_train = train_df[target_column_name].to_numpy(dtype=np.float64)
 
-            x_test = test_df.drop(columns=[target_column_name], axis=1)
-            y_test = test_df[target_column_name]
+            x_test = test_df.drop(columns=[target_column_name])
+            y_test = test_df[target_column_name].to_numpy(dtype=np.float64)
 
             logger.info(f"Applying preprocessing transformations...")
 
@@ -106,27 +137,27 @@ class DataTransformation:
             x_train_transformed = preprocessing_obj.fit_transform(x_train)
             x_test_transformed = preprocessing_obj.transform(x_test)
 
-            # Concatenate transformed features with target column
-            train_arr = np.c_[x_train_transformed, y_train.to_numpy()]
-            test_arr = np.c_[x_test_transformed, y_test.to_numpy()]
-
             logger.info(f"Preprocessing completed. Saving preprocessor object...")
 
             save_object(
                 file_path=self.data_transformation_config.preprocessor_obj_file_path,
                 obj=preprocessing_obj,
+                metadata={"feature_dtype": config.FEATURE_DTYPE},
             )
 
-            return train_arr, test_arr, self.data_transformation_config.preprocessor_obj_file_path
+            return (x_train_transformed, y_train, x_test_transformed, y_test,
+                    self.data_transformation_config.preprocessor_obj_file_path)
 
         except FileNotFoundError as fnf_error:
-            logger.error(f"File error: {str(fnf_error)}")
-            raise CustomException(str(fnf_error), sys)
+            raise CustomException(str(fnf_error), cause=fnf_error)
         except Exception as e:
-            logger.error(f"Data transformation failed: {str(e)}")
             raise CustomException("Data transformation failed!", cause=e)
 
 
+def _dense(x):
+    return x.toarray() if sparse.issparse(x) else x
+
+
 if __name__ == '__main__':
     from src.components.data_ingestion import DataIngestion
 
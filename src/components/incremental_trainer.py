@@ -0,0 +1,428 @@
+import hashlib
+import io
+import math
+import os
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+from catboost import CatBoostRegressor
+from sklearn.base import clone
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from sklearn.impute import SimpleImputer
+from sklearn.metrics import r2_score
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from src.components.data_ingestion import DataIngestion
+from src.configuration import config
+from src.configuration.data_ingestion_config import DataIngestionConfig
+from src.configuration.data_transformation_config import DataTransformationConfig
+from src.configuration.incremental_training_config import IncrementalTrainingConfig
+from src.configuration.model_trainer_config import ModelTrainerConfig
+from src.exception import CustomException
+from src.instrumentation import annotate
+from src.logger import Logger
+from src.utils import apply_schema, frame_path, load_frame, load_json, load_object, model_input, save_json, \
+    save_object
+
+
+# Initialize the custom logger
+logger = Logger.get_logger()
+
+# Bytes before the recorded end of the dataset that must be unchanged for it to count as appended to
+FINGERPRINT_BYTES = 65536
+# Estimators that keep their fitted trees and add new ones with warm_start
+WARM_START_MODELS = (RandomForestRegressor, GradientBoostingRegressor)
+# Estimators continued from their fitted trees, whose split thresholds need the features transformed as before
+CONTINUED_MODELS = WARM_START_MODELS + (CatBoostRegressor,)
+
+
+def column_stats(df: pd.DataFrame) -> dict:
+    """
+    Running statistics of every column, mergeable with `merge_stats`.
+
+    Numeric columns keep count, mean and M2 (sum of squared deviations) plus their value counts,
+    from which the exact median is recovered (the scores are integers, so there are few distinct
+    values); categorical columns keep their category counts.
+    """
+    stats = {}
+    for column in df.columns:
+        values = df[column].dropna()
+        if isinstance(values.dtype, pd.CategoricalDtype) or not pd.api.types.is_numeric_dtype(values):
+            counts = values.astype(str).value_counts()
+            stats[column] = {"count": int(values.size), "categories": {k: int(c) for k, c in counts.items()}}
+            continue
+        x = values.to_numpy(dtype=np.float64)
+        mean = float(x.mean()) if x.size else 0.0
+        stats[column] = {
+            "count": int(x.size),
+            "mean": mean,
+            "m2": float(((x - mean) ** 2).sum()),
+            "values": {repr(float(v)): int(c) for v, c in values.value_counts().items()},
+        }
+    return stats
+
+
+def merge_stats(stats: dict, other: dict) -> dict:
+    """Combines the running statistics of two disjoint sets of rows (Chan et al. for mean and M2)."""
+    merged = {}
+    for column in stats.keys() | other.keys():
+        a, b = stats.get(column), other.get(column)
+        if a is None or b is None:
+            merged[column] = a or b
+            continue
+        n = a["count"] + b["count"]
+        if "categories" in a:
+            merged[column] = {"count": n, "categories": _add_counts(a["categories"], b["categories"])}
+            continue
+        delta = b["mean"] - a["mean"]
+        merged[column] = {
+            "count": n,
+            "mean": a["mean"] + delta * b["count"] / n if n else 0.0,
+            "m2": a["m2"] + b["m2"] + delta ** 2 * a["count"] * b["count"] / n if n else 0.0,
+            "values": _add_counts(a["values"], b["values"]),
+        }
+    return merged
+
+
+def detect_drift(stats: dict, rows: pd.DataFrame, threshold: float = None, category_threshold: float = None) -> dict:
+    """
+    Compares appended rows with the running statistics of the training data.
+
+    Numeric columns drift when their mean moved by more than `threshold` standard deviations,
+    categorical columns when the total variation distance between the category frequencies exceeds
+    `category_threshold` or a category was never seen. Both allow for the sampling noise of the
+    appended rows (2 / sqrt(rows)), so a small batch does not drift by chance.
+
+    Returns:
+        dict: Drift score per column and the list of drifted columns.
+    """
+    threshold = config.INCREMENTAL_DRIFT_THRESHOLD if threshold is None else threshold
+    category_threshold = config.INCREMENTAL_CATEGORY_DRIFT_THRESHOLD if category_threshold is None \
+        else category_threshold
+    scores, drifted = {}, []
+    for column, current in column_stats(rows).items():
+        previous = stats.get(column)
+        if previous is None or not current["count"] or not previous["count"]:
+            continue
+        noise = 2 / math.sqrt(current["count"])
+        if "categories" in previous:
+            unseen = set(current["categories"]) - set(previous["categories"])
+            shares = [(current["categories"].get(category, 0) / current["count"],
+                       previous["categories"].get(category, 0) / previous["count"])
+                      for category in set(current["categories"]) | set(previous["categories"])]
+            score = 0.5 * sum(abs(new - old) for new, old in shares)
+            limit = category_threshold + noise
+        else:
+            unseen = ()
+            std = math.sqrt(previous["m2"] / previous["count"])
+            shift = abs(current["mean"] - previous["mean"])
+            score = shift / std if std > 0 else (math.inf if shift else 0.0)
+            limit = threshold + noise
+        scores[column] = round(score, 4)
+        if unseen or score > limit:
+            drifted.append(column)
+    return {"scores": scores, "drifted": drifted}
+
+
+class IncrementalTrainer:
+    """
+    Updates the trained model with the rows appended to the dataset since the last run.
+
+    The state of the last run (dataset end offset and a fingerprint of the bytes before it, row
+    counts, running column statistics, test R²) is kept next to the artifacts. An incremental run:
+
+    1. reads only the bytes appended after the recorded offset, and splits them with the seeded
+       row hash of streaming ingestion;
+    2. checks them for drift against the running statistics;
+    3. continues the previous best model: Random Forest and Gradient Boosting add trees with
+       `warm_start`, CatBoost continues boosting from `init_model`. The trees already fitted split
+       on the transformed features, so the preprocessor is kept exactly as fitted; its statistics
+       are refreshed by the next full retrain;
+    4. refits any other model with its previous best parameters (no search), after updating the
+       preprocessor statistics in place (imputer medians and most frequent values from the running
+       statistics, scaler moments with `partial_fit`) without refitting it;
+    5. saves the updated splits, preprocessor, model and state only if the test R² did not drop by
+       more than `INCREMENTAL_MAX_R2_DROP`.
+
+    Whenever incremental training does not apply, the returned report has mode "full" and a
+    reason, and no artifact has been changed: the caller retrains from scratch.
+    """
+
+    def __init__(self):
+        self.ingestion_config = DataIngestionConfig()
+        self.data_transformation_config = DataTransformationConfig()
+        self.model_trainer_config = ModelTrainerConfig()
+        self.incremental_config = IncrementalTrainingConfig()
+
+    def initiate_incremental_training(self):
+        """
+        Runs one incremental update.
+
+        Returns:
+            tuple: (report, x_test). The report's mode is "incremental" (model updated), "unchanged"
+            (no appended rows) or "full" (a full retrain is needed, see its reason); x_test holds
+            the transformed test features after an incremental update, None otherwise.
+        """
+        start = time.perf_counter()
+        try:
+            report, x_test = self._update()
+        except Exception as e:
+            raise CustomException("Incremental training failed!", cause=e)
+        report["seconds"] = round(time.perf_counter() - start, 3)
+        save_json(self.incremental_config.report_file_path, report)
+        logger.info(f"Incremental training: {report['mode']} ({report.get('reason') or 'ok'}).")
+        return report, x_test
+
+    def record_state(self, r2_score: float):
+        """Records the state of a full training run, so the next incremental run starts from it."""
+        try:
+            train_df = load_frame(frame_path(self.ingestion_config.train_data_path))
+            test_rows = len(load_frame(frame_path(self.ingestion_config.test_data_path)))
+            model = load_object(self.model_trainer_config.trained_model_file_path)
+            self._save_state(column_stats(train_df), len(train_df), test_rows, model, r2_score, mode="full")
+        except Exception as e:
+            raise CustomException("Failed to record the incremental training state!", cause=e)
+
+    def _update(self):
+        state_path = self.incremental_config.state_file_path
+        if not os.path.exists(state_path):
+            return {"mode": "full", "reason": "no previous training state"}, None
+        state = load_json(state_path)
+
+        dataset_file = str(self.ingestion_config.dataset_file)
+        if state["dataset_file"] != dataset_file:
+            return {"mode": "full", "reason": f"dataset changed from {state['dataset_file']}"}, None
+        new_rows, end = self._read_appended_rows(dataset_file, state)
+        if new_rows is None:
+            return {"mode": "full", "reason": "dataset was rewritten, not only appended to"}, None
+        if new_rows.empty:
+            return {"mode": "unchanged", "reason": "no appended rows", "r2_score": state["r2_score"]}, None
+        annotate(rows=len(new_rows))
+
+        report = {"mode": "full", "new_rows": len(new_rows), "previous_r2_score": state["r2_score"]}
+        report["drift"] = detect_drift(state["stats"], new_rows)
+        if report["drift"]["drifted"]:
+            report["reason"] = f"drift in {', '.join(report['drift']['drifted'])}"
+            return report, None
+
+        # Append the new rows to the splits
+        train_path = frame_path(self.ingestion_config.train_data_path)
+        test_path = frame_path(self.ingestion_config.test_data_path)
+        raw_path = frame_path(self.ingestion_config.raw_data_path)
+        train_df, test_df = load_frame(train_path), load_frame(test_path)
+        if len(train_df) != state["train_rows"] or len(test_df) != state["test_rows"]:
+            report["reason"] = "train/test splits do not match the recorded state"
+            return report, None
+        is_test = DataIngestion.assign_test_rows(new_rows)
+        new_train, new_test = new_rows[~is_test], new_rows[is_test]
+        train_df = apply_schema(pd.concat([train_df, new_train], ignore_index=True))
+        test_df = apply_schema(pd.concat([test_df, new_test], ignore_index=True))
+        report.update(new_train_rows=len(new_train), new_test_rows=len(new_test))
+        stats = merge_stats(state["stats"], column_stats(new_train))
+
+        # Preprocessor: kept as fitted for a continued model, updated for a refit one; then
+        # transform the grown splits
+        target = self.incremental_config.target_column
+        model = load_object(self.model_trainer_config.trained_model_file_path)
+        preprocessor = load_object(self.data_transformation_config.preprocessor_obj_file_path)
+        update_statistics = not isinstance(model, CONTINUED_MODELS)
+        reason = update_preprocessor(preprocessor, new_train.drop(columns=[target]), stats, update_statistics)
+        if reason:
+            report["reason"] = reason
+            return report, None
+        report["preprocessor"] = "updated" if update_statistics else "frozen"
+        x_train = preprocessor.transform(train_df.drop(columns=[target])).astype(config.FEATURE_DTYPE, copy=False)
+        x_test = preprocessor.transform(test_df.drop(columns=[target])).astype(config.FEATURE_DTYPE, copy=False)
+        y_train = train_df[target].to_numpy(dtype=np.float64)
+        y_test = test_df[target].to_numpy(dtype=np.float64)
+
+        # Model: continue from the previous best model
+        model, report["model"], reason = continue_training(model, x_train, y_train, len(new_train) / len(train_df))
+        if reason:
+            report["reason"] = reason
+            return report, None
+        report["r2_score"] = float(r2_score(y_test, model.predict(model_input(model, x_test))))
+        if report["r2_score"] < state["r2_score"] - config.INCREMENTAL_MAX_R2_DROP:
+            report["reason"] = f"test R² fell from {state['r2_score']:.4f} to {report['r2_score']:.4f}"
+            return report, None
+
+        # Commit: splits, preprocessor, model, then the state that points past the consumed rows
+        raw_df = load_frame(raw_path)
+        for df, file_path in ((pd.concat([raw_df, new_rows], ignore_index=True), raw_path),
+                              (train_df, train_path), (test_df, test_path)):
+            DataIngestion._save(apply_schema(df), file_path)
+        save_object(self.data_transformation_config.preprocessor_obj_file_path, preprocessor,
+                    metadata={"feature_dtype": config.FEATURE_DTYPE})
+        save_object(self.model_trainer_config.trained_model_file_path, model,
+                    metadata={"feature_dtype": config.FEATURE_DTYPE})
+        self._save_state(stats, len(train_df), len(test_df), model, report["r2_score"], mode="incremental",
+                         end=end)
+
+        report["mode"] = "incremental"
+        logger.info(f"Incremental update on {len(new_rows)} appended rows: test R² "
+                    f"{state['r2_score']:.4f} -> {report['r2_score']:.4f}.")
+        return report, x_test
+
+    def _read_appended_rows(self, dataset_file: str, state: dict):
+        """
+        Returns (rows appended after the recorded offset, new end offset), or (None, None) when the
+        bytes before the offset changed. A trailing line without a newline (a write in progress)
+        is left for the next run.
+        """
+        end = _complete_end(dataset_file)
+        if end < state["offset"] or _fingerprint(dataset_file, state["offset"]) != state["fingerprint"]:
+            return None, None
+        if end == state["offset"]:
+            return pd.DataFrame(columns=state["columns"]), end
+        with open(dataset_file, "rb") as file:
+            file.seek(state["offset"])
+            appended = file.read(end - state["offset"])
+        rows = pd.read_csv(io.BytesIO(appended), header=None, names=state["columns"])
+        return apply_schema(rows), end
+
+    def _save_state(self, stats: dict, train_rows: int, test_rows: int, model, r2_score: float, mode: str,
+                    end: int = None):
+        dataset_file = str(self.ingestion_config.dataset_file)
+        end = _complete_end(dataset_file) if end is None else end
+        save_json(self.incremental_config.state_file_path, {
+            "dataset_file": dataset_file,
+            "offset": end,
+            "fingerprint": _fingerprint(dataset_file, end),
+            "columns": list(pd.read_csv(dataset_file, nrows=0).columns),
+            "train_rows": train_rows,
+            "test_rows": test_rows,
+            "stats": stats,
+            "model": {"class": type(model).__name__, "estimators": _estimator_count(model)},
+            "r2_score": r2_score,
+            "mode": mode,
+            "updated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        })
+
+
+def update_preprocessor(preprocessor, rows: pd.DataFrame, stats: dict, update_statistics: bool = True):
+    """
+    Updates a fitted ColumnTransformer in place for appended training rows, without refitting.
+
+    First-step imputers take their statistics from the running column statistics (`stats`, which
+    already include `rows`), scalers add `rows` to their moments with `partial_fit`. One-hot
+    encoders are kept as they are, so an unseen category needs a full retrain. With
+    `update_statistics` False nothing is changed and the rows are only checked for unseen
+    categories (for a model continued from trees fitted on the current transform).
+
+    Returns:
+        str: Why the preprocessor cannot be updated, or None once it has been.
+    """
+    for name, transformer, columns in preprocessor.transformers_:
+        if transformer in ("drop", "passthrough"):
+            continue
+        steps = transformer.steps if isinstance(transformer, Pipeline) else [(name, transformer)]
+        x = rows[columns]
+        for position, (step_name, step) in enumerate(steps):
+            if isinstance(step, OneHotEncoder):
+                for categories, values, column in zip(step.categories_, np.asarray(x).T, columns):
+                    unseen = set(values) - set(categories)
+                    if unseen:
+                        return f"unseen categories in {column}: {sorted(map(str, unseen))}"
+            elif not update_statistics:
+                pass
+            elif isinstance(step, SimpleImputer) and position == 0:
+                step.statistics_ = np.array([_imputer_statistic(step.strategy, stats[column]) for column in columns],
+                                            dtype=step.statistics_.dtype)
+            elif isinstance(step, StandardScaler):
+                step.partial_fit(x)
+            elif not isinstance(step, SimpleImputer):
+                return f"{name}/{step_name} ({type(step).__name__}) cannot be updated incrementally"
+            x = step.transform(x)
+    return None
+
+
+def continue_training(model, x_train, y_train, new_share: float):
+    """
+    Continues the fitted `model` on the grown training set; `new_share` is the share of new rows.
+
+    Returns:
+        tuple: (model, summary of what was done, reason) where reason is None on success or says
+        why a full retrain is needed.
+    """
+    x = model_input(model, x_train)
+    before = _estimator_count(model)
+    if isinstance(model, CONTINUED_MODELS):
+        added = max(config.INCREMENTAL_MIN_NEW_ESTIMATORS, math.ceil(before * new_share))
+        if before + added > config.INCREMENTAL_MAX_ESTIMATORS:
+            return model, None, f"model would grow past {config.INCREMENTAL_MAX_ESTIMATORS} estimators"
+
+    if isinstance(model, WARM_START_MODELS):
+        model.set_params(warm_start=True, n_estimators=before + added).fit(x, y_train)
+        model.set_params(warm_start=False)
+        method = "warm_start"
+    elif isinstance(model, CatBoostRegressor):
+        continued = CatBoostRegressor(**dict(model.get_params(), iterations=added))
+        continued.fit(x, y_train, init_model=model)
+        model, method = continued, "init_model"
+    else:
+        model, method = clone(model).fit(x, y_train), "refit"
+
+    return model, {"class": type(model).__name__, "method": method, "estimators_before": before,
+                   "estimators_after": _estimator_count(model)}, None
+
+
+def _imputer_statistic(strategy: str, stats: dict):
+    """The imputer statistic for one column, from its running statistics (ties go to the smallest value)."""
+    if strategy == "most_frequent":
+        if "categories" in stats:
+            counts = stats["categories"]
+            return min(counts, key=lambda value: (-counts[value], value))
+        counts = {float(value): count for value, count in stats["values"].items()}
+        return min(counts, key=lambda value: (-counts[value], value))
+    if strategy == "mean":
+        return stats["mean"]
+    if strategy == "median":
+        return _median(stats["values"])
+    raise ValueError(f"Unsupported imputer strategy: {strategy}")
+
+
+def _median(value_counts: dict) -> float:
+    """Median of the values given by their counts (the mean of the two middle values for an even count)."""
+    values = sorted((float(value), count) for value, count in value_counts.items())
+    total = sum(count for _, count in values)
+    ranks, middle, seen = ((total - 1) // 2, total // 2), [], 0
+    for value, count in values:
+        seen += count
+        while len(middle) < 2 and seen > ranks[len(middle)]:
+            middle.append(value)
+    return (middle[0] + middle[1]) / 2
+
+
+def _add_counts(counts: dict, other: dict) -> dict:
+    return {key: counts.get(key, 0) + other.get(key, 0) for key in counts.keys() | other.keys()}
+
+
+def _estimator_count(model):
+    if isinstance(model, CatBoostRegressor):
+        return int(model.tree_count_)
+    return getattr(model, "n_estimators", None)
+
+
+def _complete_end(file_path: str) -> int:
+    """Offset just past the last newline of the file (its size, when it ends with one)."""
+    with open(file_path, "rb") as file:
+        size = file.seek(0, os.SEEK_END)
+        position = size
+        while position > 0:
+            step = min(FINGERPRINT_BYTES, position)
+            file.seek(position - step)
+            last_newline = file.read(step).rfind(b"\n")
+            if last_newline >= 0:
+                return position - step + last_newline + 1
+            position -= step
+    return 0
+
+
+def _fingerprint(file_path: str, end: int) -> str:
+    """Hash of the FINGERPRINT_BYTES bytes before `end` (and of `end` itself)."""
+    with open(file_path, "rb") as file:
+        file.seek(max(0, end - FINGERPRINT_BYTES))
+        return hashlib.sha256(file.read(end - max(0, end - FINGERPRINT_BYTES)) + str(end).encode()).hexdigest()
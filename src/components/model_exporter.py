@@ -0,0 +1,126 @@
+import os
+import numpy as np
+
+from src.configuration.model_trainer_config import ModelTrainerConfig
+from src.exception import CustomException
+from src.pipelines.portable_model import PortableModel, save_portable_model
+from src.utils import load_object, model_input
+from src.logger import Logger
+
+
+# Initialize the custom logger
+logger = Logger.get_logger()
+
+
+def _pack_trees(trees):
+    """Packs fitted sklearn trees into flat node arrays with one root offset per tree."""
+    left, right, feature, threshold, value, roots = [], [], [], [], [], []
+    offset = 0
+    for tree in trees:
+        tree_ = tree.tree_
+        is_leaf = tree_.children_left == -1
+        roots.append(offset)
+        left.append(np.where(is_leaf, -1, tree_.children_left + offset))
+        right.append(np.where(is_leaf, -1, tree_.children_right + offset))
+        feature.append(np.where(is_leaf, 0, tree_.feature))
+        threshold.append(tree_.threshold)
+        value.append(tree_.value[:, 0, 0])
+        offset += tree_.node_count
+    return {
+        "children_left": np.concatenate(left).astype(np.int32),
+        "children_right": np.concatenate(right).astype(np.int32),
+        "feature": np.concatenate(feature).astype(np.int32),
+        "threshold": np.concatenate(threshold).astype(np.float64),
+        "value": np.concatenate(value).astype(np.float64),
+        "roots": np.asarray(roots, dtype=np.int32),
+    }
+
+
+def to_portable_model(estimator) -> PortableModel:
+    """
+    Converts a fitted estimator into its compact portable form.
+
+    Raises:
+        ValueError: If the estimator type (or configuration) has no portable form.
+    """
+    name = type(estimator).__name__
+    n_features = int(getattr(estimator, "n_features_in_", 0))
+
+    if name == "LinearRegression":
+        coef = np.asarray(estimator.coef_)
+        if coef.ndim != 1:
+            raise ValueError("Only single-target linear models can be exported")
+        return PortableModel("linear", n_features, {"coef": coef, "intercept": np.asarray(estimator.intercept_)})
+
+    if name == "DecisionTreeRegressor":
+        return PortableModel("tree_mean", n_features, _pack_trees([estimator]))
+
+    if name == "RandomForestRegressor":
+        return PortableModel("tree_mean", n_features, _pack_trees(estimator.estimators_))
+
+    if name == "GradientBoostingRegressor":
+        if estimator.init_ == "zero":
+            constant = 0.0
+        elif type(estimator.init_).__name__ == "DummyRegressor":
+            constant = float(np.ravel(estimator.init_.constant_)[0])
+        else:
+            raise ValueError("Gradient boosting with a custom init estimator cannot be exported")
+        return PortableModel("tree_boosting", n_features, _pack_trees(estimator.estimators_[:, 0]),
+                             params={"constant": constant, "learning_rate": float(estimator.learning_rate)})
+
+    if name == "AdaBoostRegressor":
+        if any(type(tree).__name__ != "DecisionTreeRegressor" for tree in estimator.estimators_):
+            raise ValueError("Only AdaBoost over decision trees can be exported")
+        arrays = _pack_trees(estimator.estimators_)
+        arrays["weights"] = np.asarray(estimator.estimator_weights_[:len(estimator.estimators_)], dtype=np.float64)
+        return PortableModel("tree_median", n_features, arrays)
+
+    if name in ("CatBoostRegressor", "CatBoost"):
+        # CatBoost's native model format, as bytes
+        blob = estimator._serialize_model()
+        return PortableModel("catboost", n_features, {"model": np.frombuffer(blob, dtype=np.uint8)})
+
+    raise ValueError(f"No portable export for {name}")
+
+
+class ModelExporter:
+    def __init__(self):
+        self.model_trainer_config = ModelTrainerConfig()
+
+    def initiate_model_export(self, model_path: str, x_test):
+        """
+        Exports the trained model in the compact portable format used for serving.
+
+        The portable model is only saved if its predictions on the test features match the
+        fitted estimator's; otherwise serving keeps using the pickled model.
+
+        Returns:
+            str or None: Path to the saved portable model, or None if it was not exported.
+        """
+        try:
+            portable_path = self.model_trainer_config.portable_model_file_path
+
+            # A stale export must never outlive the model it was built from
+            if os.path.exists(portable_path):
+                os.remove(portable_path)
+
+            model = load_object(model_path)
+            try:
+                portable = to_portable_model(model)
+            except (ValueError, AttributeError) as e:
+                logger.warning(f"Model cannot be exported to the portable format: {e}")
+                return None
+
+            expected = model.predict(model_input(model, x_test))
+            actual = portable.predict(x_test)
+            if expected.shape != actual.shape or not np.allclose(expected, actual, rtol=1e-9, atol=1e-9):
+                logger.warning("Portable model does not match the fitted estimator; skipping export.")
+                return None
+
+            save_portable_model(portable, portable_path)
+            logger.info(f"Portable {portable.kind} model verified on {x_test.shape[0]} rows and saved "
+                        f"({os.path.getsize(portable_path)} bytes vs {os.path.getsize(model_path)} pickled).")
+            return portable_path
+
+        except Exception as e:
+            raise CustomException("Model export failed!", cause=e)
@@ -1,17 +1,22 @@
+import time
+import numpy as np
 from catboost import CatBoostRegressor
 from sklearn.ensemble import (
     AdaBoostRegressor,
     GradientBoostingRegressor,
     RandomForestRegressor,
 )
+from sklearn.base import clone
 from sklearn.linear_model import LinearRegression
 from sklearn.metrics import r2_score
+from sklearn.model_selection import ParameterGrid, ParameterSampler, cross_val_score
 from sklearn.tree import DecisionTreeRegressor
 # from xgboost import XGBRegressor
 
 from src.configuration.model_trainer_config import ModelTrainerConfig
 from src.exception import CustomException
-from src.utils import save_object, evaluate_models
+from src.instrumentation import stage
+from src.utils import save_object, save_json, evaluate_models, model_input
 from src.logger import Logger
 from src.configuration import config
 
@@ -32,28 +37,144 @@ class ModelTrainer:
             "AdaBoost Regressor": AdaBoostRegressor(),
         }
         self.model_config = config.MODEL_PARAMS
+        self.search_strategy = config.SEARCH_STRATEGY
+        self.tournament_mode = config.TOURNAMENT_MODE
+
+    def run_tournament(self, x_train, y_train):
+        """
+        Scores every model family on a cheap budget and keeps only the contenders.
+
+        Each family is cross-validated on a few sampled candidates from its grid. Families whose
+        best probe R² is within `config.TOURNAMENT_MARGIN` of the leader go on to the full search;
+        the rest are eliminated, and the budget spent and the reason are logged.
+
+        Returns:
+            tuple: (names of the surviving families, per-family probe results)
+        """
+        cv = min(3, x_train.shape[0])
+        probes = {}
+        for model_name, model in self.models.items():
+            start = time.perf_counter()
+            model_x_train = model_input(model, x_train)
+            grid = self.model_config.get(model_name, {})
+            n_candidates = min(config.TOURNAMENT_PROBE_CANDIDATES, len(ParameterGrid(grid)))
+            candidates = list(ParameterSampler(grid, n_iter=n_candidates, random_state=config.TOURNAMENT_RANDOM_STATE))
+
+            scores = []
+            for params in candidates:
+                try:
+                    fold_scores = cross_val_score(clone(model).set_params(**params), model_x_train, y_train, cv=cv,
+                                                  scoring="r2", n_jobs=-1)
+                    scores.append(np.mean(fold_scores))
+                except Exception as e:
+                    logger.warning(f"Tournament probe {model_name} {params} failed: {e}")
+                    scores.append(np.nan)
+            probes[model_name] = {
+                "score": float(np.nanmax(scores)) if not np.all(np.isnan(scores)) else float("nan"),
+                "fits": len(candidates) * cv,
+                "seconds": round(time.perf_counter() - start, 3),
+            }
+
+        scored = {name: probe["score"] for name, probe in probes.items() if not np.isnan(probe["score"])}
+        if not scored:
+            raise CustomException("Tournament failed: every model family failed its probe.")
+        leader = max(scored, key=scored.get)
+
+        survivors = []
+        for model_name, probe in probes.items():
+            gap = scored[leader] - probe["score"]
+            if np.isnan(probe["score"]):
+                probe["eliminated"] = "every probe fit failed"
+            elif gap > config.TOURNAMENT_MARGIN:
+                probe["eliminated"] = (f"probe R² {probe['score']:.4f} is {gap:.4f} behind {leader} "
+                                       f"({scored[leader]:.4f}), margin {config.TOURNAMENT_MARGIN}")
+            else:
+                probe["eliminated"] = None
+                survivors.append(model_name)
+
+            if probe["eliminated"]:
+                logger.info(f"Tournament: {model_name} eliminated after {probe['fits']} fits "
+                            f"({probe['seconds']}s): {probe['eliminated']}")
+            else:
+                logger.info(f"Tournament: {model_name} advances (probe R² {probe['score']:.4f}, "
+                            f"{probe['fits']} fits, {probe['seconds']}s)")
+
+        return survivors, probes
+
+    @staticmethod
+    def compare_precision(best_model, x_train, y_train, x_test, y_test):
+        """
+        Measures what reduced precision costs the best model.
+
+        Refits the best estimator on the same data in the reduced dtype and in float64 (with the
+        same random_state, so only the precision differs) and returns both test R² scores.
+        """
+        estimator = clone(best_model)
+        if "random_state" in estimator.get_params() and estimator.get_params()["random_state"] is None:
+            estimator.set_params(random_state=0)
+
+        scores = {}
+        for dtype in (x_train.dtype, np.float64):
+            x_fit, x_eval = x_train.astype(dtype), x_test.astype(dtype)
+            model = clone(estimator).fit(model_input(estimator, x_fit), y_train)
+            scores[np.dtype(dtype).name] = float(r2_score(y_test, model.predict(model_input(model, x_eval))))
+
+        reduced = scores[x_train.dtype.name]
+        logger.info(f"Precision check: R² {reduced:.6f} in {x_train.dtype.name} vs "
+                    f"{scores['float64']:.6f} in float64.")
+        return {
+            "refit_r2_score": reduced,
+            "float64_r2_score": scores["float64"],
+            "r2_difference": reduced - scores["float64"],
+        }
 
     def initiate_model_trainer(self, train_array, test_array):
+        """Trains on packed arrays whose last column is the target (see `train_models`)."""
+        logger.info("Splitting training and test input data")
+
+        # Ensure train/test arrays are not empty
+        if train_array.size == 0 or test_array.size == 0:
+            raise CustomException("Training or test dataset is empty. Please check data ingestion!")
+
+        return self.train_models(
+            x_train=train_array[:, :-1],
+            y_train=train_array[:, -1],
+            x_test=test_array[:, :-1],
+            y_test=test_array[:, -1],
+        )
+
+    def train_models(self, x_train, y_train, x_test, y_test):
+        """
+        Searches every model family, saves the best model and the training report.
+
+        `x_train`/`x_test` may be dense arrays or scipy sparse matrices; sparse features are
+        only densified for estimators that do not accept sparse input.
+
+        Returns:
+            float: R² of the best model on the test set.
+        """
         try:
-            logger.info("Splitting training and test input data")
-
-            # Ensure train/test arrays are not empty
-            if train_array.size == 0 or test_array.size == 0:
+            if x_train.shape[0] == 0 or x_test.shape[0] == 0:
                 raise CustomException("Training or test dataset is empty. Please check data ingestion!")
 
-            x_train, y_train, x_test, y_test = (
-                train_array[:, :-1],
-                train_array[:, -1],
-                test_array[:, :-1],
-                test_array[:, -1],
-            )
+            # Precision mode: train (and stamp the model) in the configured feature dtype
+            x_train = x_train.astype(config.FEATURE_DTYPE, copy=False)
+            x_test = x_test.astype(config.FEATURE_DTYPE, copy=False)
 
             parameters = self.model_config
 
+            models, tournament = self.models, None
+            if self.tournament_mode:
+                logger.info("Running model tournament...")
+                with stage("tournament", rows=x_train.shape[0]) as record:
+                    survivors, tournament = self.run_tournament(x_train, y_train)
+                    record["fits"] = sum(probe["fits"] for probe in tournament.values())
+                models = {name: self.models[name] for name in survivors}
+
             logger.info("Starting model evaluation...")
             model_report = evaluate_models(
                 x_train=x_train, y_train=y_train, x_test=x_test, y_test=y_test,
-                models=self.models, param_grid=parameters
+                models=models, param_grid=parameters, search_strategy=self.search_strategy
             )
 
             if not model_report:
@@ -65,7 +186,9 @@ class ModelTrainer:
             if best_model_name not in self.models:
                 raise CustomException(f"Best model {best_model_name} not found in models dictionary!")
 
+            # Keep only the fitted estimator, not the search object around it
             best_model = model_report[best_model_name]["model"]
+            best_model = getattr(best_model, "best_estimator_", best_model)
 
             if best_model_score < 0.6:
                 logger.warning("No sufficiently good model found. Check data quality and feature selection.")
@@ -74,22 +197,40 @@ class ModelTrainer:
             logger.info(f"Best model: {best_model_name} with R² score: {best_model_score:.4f}")
 
             # Save the trained model
-            save_object(file_path=self.model_trainer_config.trained_model_file_path, obj=best_model)
+            save_object(file_path=self.model_trainer_config.trained_model_file_path, obj=best_model,
+                        metadata={"feature_dtype": config.FEATURE_DTYPE})
 
             logger.info("Model saved successfully.")
 
             # Predict using the best model
             try:
-                predicted = best_model.predict(x_test)
+                predicted = best_model.predict(model_input(best_model, x_test))
                 r2_square = r2_score(y_test, predicted)
                 logger.info(f"Final R² Score on test data: {r2_square:.4f}")
             except Exception as e:
                 raise CustomException("Prediction failed after model training!", cause=e)
 
+            precision = {"feature_dtype": config.FEATURE_DTYPE}
+            if x_train.dtype != np.float64:
+                precision.update(self.compare_precision(best_model, x_train, y_train, x_test, y_test))
+
+            save_json(self.model_trainer_config.report_file_path, {
+                "search_strategy": self.search_strategy,
+                "best_model": best_model_name,
+                "r2_score": r2_square,
+                "total_fits": sum(result["search"]["fits"] for result in model_report.values())
+                + sum(probe["fits"] for probe in (tournament or {}).values()),
+                "tournament": tournament,
+                "precision": precision,
+                "models": {
+                    name: {"score": result["score"], "best_params": result["best_params"], "search": result["search"]}
+                    for name, result in model_report.items()
+                },
+            })
+
             return r2_square
 
         except Exception as e:
-            logger.error(f"Model training failed: {str(e)}")
             raise CustomException("Model training failed!", cause=e)
 
 
@@ -100,8 +241,8 @@ if __name__ == '__main__':
     data_ingestion = DataIngestion()
     train_path, test_path = data_ingestion.initiate_data_ingestion()
     data_transformation = DataTransformation()
-    train_array, test_array, _ = data_transformation.initiate_data_transformation(train_path, test_path)
+    x_train, y_train, x_test, y_test, _ = data_transformation.initiate_split_transformation(train_path, test_path)
 
     model_trainer = ModelTrainer()
-    output = model_trainer.initiate_model_trainer(train_array=train_array, test_array=test_array)
+    output = model_trainer.train_models(x_train, y_train, x_test, y_test)
     print(f"Final Model R² Score: {output:.4f}")
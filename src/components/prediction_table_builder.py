@@ -0,0 +1,100 @@
+import os
+from dataclasses import fields
+
+import numpy as np
+import pandas as pd
+
+from src.configuration import config
+from src.configuration.model_trainer_config import ModelTrainerConfig
+from src.configuration.predict_config import CustomData, PredictConfig
+from src.exception import CustomException
+from src.pipelines.predict_pipeline import PredictPipeline
+from src.pipelines.prediction_table import PredictionTable, save_prediction_table
+from src.utils import load_object
+from src.logger import Logger
+
+
+# Initialize the custom logger
+logger = Logger.get_logger()
+
+
+def categorical_domain(preprocessor) -> dict:
+    """Returns {column: categories} as learned by the encoders of a fitted ColumnTransformer."""
+    domain = {}
+    for name, transformer, columns in preprocessor.transformers_:
+        for _, step in getattr(transformer, "steps", [(name, transformer)]):
+            if hasattr(step, "categories_"):
+                for column, categories in zip(columns, step.categories_):
+                    domain[column] = categories.tolist()
+    return domain
+
+
+class PredictionTableBuilder:
+    def __init__(self):
+        self.model_trainer_config = ModelTrainerConfig()
+        self.score_range = config.PREDICTION_TABLE_SCORE_RANGE
+        self.batch_rows = config.PREDICTION_TABLE_BATCH_ROWS
+        self.max_cells = config.PREDICTION_TABLE_MAX_CELLS
+
+    def initiate_prediction_table(self, model_path: str, preprocessor_path: str):
+        """
+        Scores every combination of the known categories and integer scores, and saves the
+        results as a lookup table next to the model.
+
+        The grid is scored in batches through the regular serving path, so table lookups return
+        exactly what the model would, and the table is stamped with that model's version.
+
+        Returns:
+            str or None: Path to the saved table, or None if the domain is too large to tabulate.
+        """
+        try:
+            table_path = self.model_trainer_config.prediction_table_file_path
+
+            # A stale table must never outlive the model it was built from
+            if os.path.exists(table_path):
+                os.remove(table_path)
+
+            domain = categorical_domain(load_object(preprocessor_path))
+            categorical_columns = [f.name for f in fields(CustomData) if f.type is str]
+            score_columns = [f.name for f in fields(CustomData) if f.type is int]
+            missing = [column for column in categorical_columns if column not in domain]
+            if missing:
+                logger.warning(f"No fitted categories for {missing}; skipping the prediction table.")
+                return None
+
+            low, high = self.score_range
+            categories = [domain[column] for column in categorical_columns]
+            shape = tuple(len(c) for c in categories) + (high - low + 1,) * len(score_columns)
+            n_cells = int(np.prod(shape))
+            if n_cells > self.max_cells:
+                logger.warning(f"Prediction table would have {n_cells} cells (limit {self.max_cells}); skipping.")
+                return None
+
+            pipeline = PredictPipeline(PredictConfig(
+                model_path=model_path, preprocessor_path=preprocessor_path, use_prediction_table=False,
+                prediction_cache_max_entries=0, micro_batching=False,
+            ))
+            model_version = pipeline.model_version()
+            category_arrays = [np.asarray(c, dtype=object) for c in categories]
+
+            values = None
+            for start in range(0, n_cells, self.batch_rows):
+                stop = min(start + self.batch_rows, n_cells)
+                index = np.unravel_index(np.arange(start, stop), shape)
+                grid = {column: category_arrays[i][index[i]] for i, column in enumerate(categorical_columns)}
+                for k, column in enumerate(score_columns):
+                    grid[column] = index[len(categorical_columns) + k] + low
+
+                preds = np.asarray(pipeline.predict_batch(pd.DataFrame(grid)[[f.name for f in fields(CustomData)]]))
+                if values is None:
+                    values = np.empty(n_cells, dtype=preds.dtype)
+                values[start:stop] = preds
+
+            table = PredictionTable(categorical_columns, categories, score_columns, (low, high),
+                                    model_version, values.reshape(shape))
+            save_prediction_table(table, table_path)
+            logger.info(f"Prediction table with {n_cells} cells saved ({os.path.getsize(table_path)} bytes).")
+            return table_path
+
+        except Exception as e:
+            raise CustomException("Prediction table build failed!", cause=e)
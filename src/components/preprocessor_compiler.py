@@ -0,0 +1,60 @@
+import os
+import numpy as np
+
+from src.configuration.data_transformation_config import DataTransformationConfig
+from src.exception import CustomException
+from src.pipelines.compiled_preprocessor import CompiledPreprocessor
+from src.utils import load_frame, load_object, save_object
+from src.logger import Logger
+
+
+# Initialize the custom logger
+logger = Logger.get_logger()
+
+
+class PreprocessorCompiler:
+    def __init__(self):
+        self.data_transformation_config = DataTransformationConfig()
+
+    def initiate_preprocessor_compilation(self, preprocessor_path: str, test_path: str, target_column: str = "math_score"):
+        """
+        Compiles the fitted preprocessor into lookup tables for the single-record fast path.
+
+        The compiled form is only saved if it reproduces the sklearn output on the test set
+        bit for bit; otherwise serving keeps using the regular preprocessor.
+
+        Returns:
+            str or None: Path to the saved compiled preprocessor, or None if it was not exported.
+        """
+        try:
+            compiled_path = self.data_transformation_config.compiled_preprocessor_obj_file_path
+
+            # A stale compiled preprocessor must never outlive the preprocessor it was built from
+            if os.path.exists(compiled_path):
+                os.remove(compiled_path)
+
+            preprocessor = load_object(preprocessor_path)
+            try:
+                compiled = CompiledPreprocessor.from_column_transformer(preprocessor)
+            except (ValueError, AttributeError) as e:
+                logger.warning(f"Preprocessor cannot be compiled, skipping fast-path export: {e}")
+                return None
+
+            test_df = load_frame(test_path)
+            x_test = test_df.drop(columns=[target_column])
+
+            expected = preprocessor.transform(x_test)
+            actual = compiled.transform(x_test.to_dict(orient="records"))
+            if hasattr(expected, "toarray"):
+                expected, actual = expected.toarray(), actual.toarray()
+
+            if expected.shape != actual.shape or not np.array_equal(expected, actual):
+                logger.warning("Compiled preprocessor does not match the sklearn output; skipping export.")
+                return None
+
+            save_object(file_path=compiled_path, obj=compiled)
+            logger.info(f"Compiled preprocessor verified on {len(x_test)} rows and saved.")
+            return compiled_path
+
+        except Exception as e:
+            raise CustomException("Preprocessor compilation failed!", cause=e)
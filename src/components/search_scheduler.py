@@ -0,0 +1,204 @@
+import json
+import os
+import time
+
+import numpy as np
+from scipy import sparse
+from joblib import Parallel, delayed, hash as joblib_hash
+from sklearn.base import clone
+from sklearn.metrics import r2_score
+from sklearn.model_selection import KFold, ParameterGrid
+
+from src.logger import Logger
+from src.utils import accepts_sparse
+
+
+# Initialize the custom logger
+logger = Logger.get_logger()
+
+# Parameters whose value scales the cost of a fit; used to schedule the most expensive fits first
+COST_PARAMS = ("n_estimators", "iterations")
+# Parameters setting an estimator's own thread count; pinned to 1 while the pool runs fits in parallel
+THREAD_PARAMS = ("n_jobs", "thread_count")
+
+
+def _fit_and_score(key, model, params, x_train, y_train, train_idx, test_idx, single_threaded=False):
+    """Fits one (model, params, fold) candidate and returns its R² on the held-out fold."""
+    start = time.perf_counter()
+    try:
+        estimator = clone(model).set_params(**params)
+        if single_threaded:
+            estimator.set_params(**_thread_params(estimator))
+        estimator.fit(x_train[train_idx], y_train[train_idx])
+        score = float(r2_score(y_train[test_idx], estimator.predict(x_train[test_idx])))
+        error = None
+    except Exception as e:
+        score, error = float("nan"), f"{type(e).__name__}: {e}"
+    return key, score, time.perf_counter() - start, error
+
+
+def _thread_params(estimator) -> dict:
+    """Settings that make a multi-threaded estimator fit on one thread (it shares the pool's cores)."""
+    pinned = {name: 1 for name in THREAD_PARAMS if name in estimator.get_params()}
+    if type(estimator).__module__.startswith("catboost"):
+        pinned["thread_count"] = 1  # CatBoost's get_params lists only the parameters set explicitly
+    return pinned
+
+
+def _refit(model, params, x_train, y_train):
+    start = time.perf_counter()
+    estimator = clone(model).set_params(**params).fit(x_train, y_train)
+    return estimator, time.perf_counter() - start
+
+
+class SearchScheduler:
+    """
+    Exhaustive grid search over several models, with every (model, params, fold) fit in one pool.
+
+    Instead of running one GridSearchCV per model (which leaves cores idle while the last folds of
+    a model finish), all fits are submitted to a single joblib pool, most expensive first, and
+    estimators that parallelize themselves (n_jobs, thread_count) fit on one thread each. Each
+    successful fit is appended to an on-disk journal, so an interrupted run resumes where it
+    stopped; failed fits are not journaled and run again. There is one journal per training data
+    (`<journal stem>_<data hash>.jsonl`), removed once the search completes.
+    Folds, scoring and best-candidate selection match GridSearchCV(cv=KFold(cv), scoring='r2').
+
+    Since the fits of all models interleave in the pool, the time of each model family is the
+    wall time of its own fits summed over the workers (plus its refit), not a span of the run.
+    """
+
+    def __init__(self, journal_path, cv: int = 3, n_jobs: int = -1):
+        self.journal_path = str(journal_path)
+        self.cv = cv
+        self.n_jobs = n_jobs
+
+    def run(self, x_train, y_train, models: dict, param_grid: dict) -> dict:
+        """
+        Searches every model's grid and refits each model on its best parameters.
+
+        Returns:
+            dict: model name -> {"model": fitted best estimator, "best_params": dict,
+                  "cv_score": mean fold R², "fits": number of fits in the grid, "timing": fits run,
+                  fits resumed from the journal, their summed fit seconds, fits/s and refit seconds}.
+        """
+        if not sparse.issparse(x_train):
+            x_train = np.asarray(x_train)
+        y_train = np.asarray(y_train)
+        data_key = joblib_hash((x_train, y_train, self.cv))
+        folds = list(KFold(n_splits=self.cv).split(x_train))
+        # Sparse features are densified once, and only for the models that need it
+        inputs = {name: x_train for name in models}
+        dense = [name for name, model in models.items() if sparse.issparse(x_train) and not accepts_sparse(model)]
+        if dense:
+            x_dense = x_train.toarray()
+            inputs.update({name: x_dense for name in dense})
+
+        # Enumerate every (model, params, fold) fit of every grid
+        tasks, candidates = [], {}
+        for model_name, model in models.items():
+            model_key = joblib_hash((model_name, type(model).__name__, sorted(model.get_params().items(), key=str)))
+            candidates[model_name] = []
+            for params in ParameterGrid(param_grid.get(model_name, {})):
+                keys = []
+                for fold, (train_idx, test_idx) in enumerate(folds):
+                    key = joblib_hash((data_key, model_key, sorted(params.items()), fold))
+                    keys.append(key)
+                    tasks.append((key, model_name, params, train_idx, test_idx))
+                candidates[model_name].append((params, keys))
+
+        journal_path = self.journal_file(data_key)
+        scores = self._load_journal(journal_path)
+        pending = [task for task in tasks if task[0] not in scores]
+        timing = {name: {"fits_run": 0, "fits_resumed": 0, "fit_wall_s": 0.0} for name in models}
+        for key, model_name, *_ in tasks:
+            if key in scores:
+                timing[model_name]["fits_resumed"] += 1
+        task_models = {task[0]: task[1] for task in pending}
+        pending.sort(key=lambda task: self._cost(task[2]), reverse=True)
+        logger.info(f"Search scheduler: {len(tasks)} fits across {len(models)} models, "
+                    f"{len(tasks) - len(pending)} resumed from journal, {len(pending)} to run.")
+
+        if pending:
+            start = time.perf_counter()
+            single_threaded = self.n_jobs != 1
+            results = Parallel(n_jobs=self.n_jobs, return_as="generator_unordered")(
+                delayed(_fit_and_score)(key, models[name], params, inputs[name], y_train, train_idx, test_idx,
+                                        single_threaded)
+                for key, name, params, train_idx, test_idx in pending
+            )
+            with open(journal_path, "a") as journal:
+                for key, score, seconds, error in results:
+                    scores[key] = score
+                    family = timing[task_models[key]]
+                    family["fits_run"] += 1
+                    family["fit_wall_s"] += seconds
+                    if error is not None:
+                        # Not journaled: a resumed run tries it again
+                        logger.warning(f"Search fit failed ({error}); scored as NaN.")
+                        continue
+                    journal.write(json.dumps({"key": key, "score": score, "seconds": round(seconds, 4)}) + "\n")
+                    journal.flush()
+            elapsed = time.perf_counter() - start
+            logger.info(f"Search scheduler: {len(pending)} fits in {elapsed:.1f}s "
+                        f"({len(pending) / elapsed:.1f} fits/s).")
+
+        # Every fit is scored: the journal has nothing left to resume
+        if os.path.exists(journal_path):
+            os.remove(journal_path)
+
+        # Pick each model's best candidate (first of ties, as GridSearchCV does) and refit it
+        best = {}
+        for model_name, model_candidates in candidates.items():
+            means = [np.mean([scores[key] for key in keys]) for _, keys in model_candidates]
+            if not means or np.all(np.isnan(means)):
+                logger.warning(f"All candidates failed for {model_name}. Skipping...")
+                continue
+            best_index = int(np.nanargmax(means))
+            best[model_name] = {
+                "best_params": model_candidates[best_index][0],
+                "cv_score": float(means[best_index]),
+                "fits": len(model_candidates) * self.cv,
+                "timing": timing[model_name],
+            }
+
+        refitted = Parallel(n_jobs=self.n_jobs)(
+            delayed(_refit)(models[name], result["best_params"], inputs[name], y_train) for name, result in best.items()
+        )
+        for (model_name, result), (estimator, seconds) in zip(best.items(), refitted):
+            result["model"] = estimator
+            family = result["timing"]
+            family["fit_wall_s"] = round(family["fit_wall_s"], 4)
+            if family["fits_run"] and family["fit_wall_s"] > 0:
+                family["fits_per_s"] = round(family["fits_run"] / family["fit_wall_s"], 2)
+            family["refit_wall_s"] = round(seconds, 4)
+
+        return best
+
+    def journal_file(self, data_key: str) -> str:
+        """Path of the journal of the search on the training data hashed to `data_key`."""
+        stem, extension = os.path.splitext(self.journal_path)
+        return f"{stem}_{data_key[:16]}{extension or '.jsonl'}"
+
+    @staticmethod
+    def _load_journal(journal_path: str) -> dict:
+        """Returns {fit key: score} for every fit recorded in the journal."""
+        scores = {}
+        if not os.path.exists(journal_path):
+            os.makedirs(os.path.dirname(journal_path) or ".", exist_ok=True)
+            return scores
+        with open(journal_path) as journal:
+            for line in journal:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Partially written last line of an interrupted run
+                scores[entry["key"]] = entry["score"]
+        return scores
+
+    @staticmethod
+    def _cost(params: dict) -> float:
+        cost = 1.0
+        for name in COST_PARAMS:
+            if isinstance(params.get(name), (int, float)):
+                cost *= params[name]
+        return cost
@@ -7,6 +7,153 @@ DATASET_FILE = BASE_DIR / "data/rawData.csv"
 LOG_DIR = BASE_DIR / "logs"
 TEMPLATES_DIR = BASE_DIR / "templates"
 
+# Logging: "async" hands records to a bounded queue drained by a background writer thread (a full
+# queue drops records rather than blocking the caller), "sync" writes from the calling thread.
+# Lines are "text" or "json"; per-request INFO messages are capped per call site per second (0 = off)
+LOG_MODE = "async"
+LOG_FORMAT = "text"
+LOG_QUEUE_SIZE = 10_000
+LOG_HOT_PATH_RATE = 1.0
+# CustomException: format the detailed trace only when rendered, and log each failure once per
+# exception chain (False restores eager formatting and logging on every construction)
+EXCEPTION_LAZY = True
+
+# Explicit dtypes for the dataset columns (categoricals are stored as category codes)
+DATASET_DTYPES = {
+    "gender": "category",
+    "race_ethnicity": "category",
+    "parental_level_of_education": "category",
+    "lunch": "category",
+    "test_preparation_course": "category",
+    "math_score": "int64",
+    "reading_score": "int64",
+    "writing_score": "int64",
+}
+
+# Format of the data.csv/train.csv/test.csv intermediates passed between stages:
+# "csv", "parquet", "feather" or "npy" (one .npy per column, memory-mappable)
+INTERMEDIATE_FORMAT = "csv"
+# Memory-map intermediates on read where the format allows it (npy, feather, parquet)
+INTERMEDIATE_MMAP = False
+# With a non-CSV intermediate format, also export CSV copies of the splits
+EXPORT_CSV = False
+
+# Train/test split used by data ingestion
+TEST_SIZE = 0.2
+SPLIT_RANDOM_STATE = 4
+
+# Streaming ingestion: read the dataset in chunks and assign rows to train/test by a seeded hash of
+# the row key columns (None = all columns), so the dataset never has to fit in memory
+INGESTION_STREAMING = False
+INGESTION_CHUNK_SIZE = 100_000
+INGESTION_ROW_KEY = None
+
+# Transformed feature layout: "dense", "sparse" (CSR, kept sparse through training for estimators
+# that accept it) or "auto" (sparse only when the one-hot output is mostly zeros)
+FEATURE_LAYOUT = "auto"
+# Precision mode: dtype of the features from transformation through training and serving
+# ("float32" halves feature memory; the training report records the R² change vs float64).
+# The target is kept as a separate float64 vector.
+FEATURE_DTYPE = "float64"
+
+# Training: reuse a stage's stored outputs when its inputs and config are unchanged
+STAGE_CACHE_ENABLED = True
+STAGE_CACHE_DIR = BASE_DATA_DIR / "stage_cache"
+STAGE_CACHE_MAX_ENTRIES_PER_STAGE = 5
+
+# Serving: seconds between on-disk change checks of cached model/preprocessor files
+ARTIFACT_CACHE_CHECK_INTERVAL = 1.0
+# Confirm a changed file signature with a content hash before reloading it
+ARTIFACT_CACHE_HASH_CONTENT = True
+# Memory-map artifact arrays read-only, so all worker processes on a host share one copy
+ARTIFACT_MMAP = True
+# Serving: upper bound on records accepted by one /predict/batch request
+PREDICT_BATCH_MAX_RECORDS = 10000
+# Serving: coalesce concurrent single-row predictions into one vectorized call
+PREDICT_MICRO_BATCHING = False
+PREDICT_MICRO_BATCH_MAX_SIZE = 32
+PREDICT_MICRO_BATCH_MAX_WAIT_MS = 5.0
+# Serving: score single records through the compiled preprocessor when it has been exported
+PREDICT_USE_COMPILED_PREPROCESSOR = True
+# Serving: use the compact portable model export (numpy arrays / CatBoost native format) instead of model.pkl
+PREDICT_USE_PORTABLE_MODEL = True
+# Serving: LRU cache of single-record predictions (0 entries disables it; TTL None = no expiry)
+PREDICTION_CACHE_MAX_ENTRIES = 10_000
+PREDICTION_CACHE_TTL_SECONDS = 3600
+# Serving: answer in-domain requests from the precomputed prediction table when it matches the model
+PREDICT_USE_PREDICTION_TABLE = True
+# Serving startup: load every artifact and score a warm-up record before accepting traffic
+SERVING_PREWARM = True
+STARTUP_REPORT_FILE = BASE_DATA_DIR / "startup_report.json"
+PREDICT_WARMUP_RECORD = {
+    "gender": "female",
+    "race_ethnicity": "group B",
+    "parental_level_of_education": "bachelor's degree",
+    "lunch": "standard",
+    "test_preparation_course": "none",
+    "reading_score": 72,
+    "writing_score": 74,
+}
+
+# Optional post-training step: score every in-domain input (all fitted categories x integer scores)
+# into a lookup table next to model.pkl, in batches of PREDICTION_TABLE_BATCH_ROWS rows
+PREDICTION_TABLE = False
+PREDICTION_TABLE_SCORE_RANGE = (0, 100)
+PREDICTION_TABLE_BATCH_ROWS = 200_000
+PREDICTION_TABLE_MAX_CELLS = 50_000_000
+
+# Production server (gunicorn.conf.py): bind address, worker processes (None = 2 x CPUs + 1),
+# threads per worker, preloading the warmed app in the master so workers share its pages,
+# request/graceful-shutdown timeouts and worker recycling (0 = never)
+SERVER_BIND = "0.0.0.0:5001"
+SERVER_WORKERS = None
+SERVER_THREADS = 4
+SERVER_PRELOAD = True
+SERVER_TIMEOUT = 60
+SERVER_GRACEFUL_TIMEOUT = 30
+SERVER_MAX_REQUESTS = 0
+# Serving metrics (/metrics): each server process writes its totals to METRICS_DIR every
+# METRICS_FLUSH_INTERVAL seconds and a scrape sums them over all worker processes (other processes,
+# e.g. batch runs, keep theirs in memory). Latency buckets in seconds, batch sizes in rows
+METRICS_DIR = BASE_DATA_DIR / "metrics"
+METRICS_FLUSH_INTERVAL = 1.0
+METRICS_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+METRICS_BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Offline bulk scoring: rows per chunk read from the input file, and worker processes
+BATCH_PREDICT_CHUNK_SIZE = 100_000
+BATCH_PREDICT_WORKERS = 1
+
+# Training: "grid" runs one GridSearchCV per model; "pooled" schedules every (model, params, fold)
+# fit of all models in one worker pool and journals finished fits so interrupted runs resume;
+# "halving" runs successive halving and drops weak candidates on a small budget
+SEARCH_STRATEGY = "pooled"
+SEARCH_JOURNAL_FILE = BASE_DATA_DIR / "search_journal.jsonl"
+# Successive halving: budget by "estimators" (n_estimators/iterations where a model has one) or "n_samples"
+HALVING_RESOURCE = "estimators"
+HALVING_FACTOR = 3
+HALVING_RANDOM_STATE = 42
+# Tournament: probe every model family on a few sampled candidates and give the full search
+# only to families whose probe R² is within TOURNAMENT_MARGIN of the leader
+TOURNAMENT_MODE = False
+TOURNAMENT_MARGIN = 0.05
+TOURNAMENT_PROBE_CANDIDATES = 3
+TOURNAMENT_RANDOM_STATE = 42
+# Training mode: "full" searches every model family on the whole dataset; "incremental" ingests only the
+# rows appended to the dataset since the last run, updates the preprocessor statistics and continues the
+# previous best model. It falls back to a full retrain on the first run, when the dataset was rewritten
+# rather than appended to, when the appended rows drift or when the test R² drops by more than allowed
+TRAIN_MODE = "full"
+# Drift: a numeric column's mean shift (in standard deviations) or a categorical column's total variation
+# distance beyond the threshold plus the sampling noise of the appended rows; any unseen category drifts
+INCREMENTAL_DRIFT_THRESHOLD = 0.25
+INCREMENTAL_CATEGORY_DRIFT_THRESHOLD = 0.10
+# Trees added per increment: the previous count times the share of new training rows, at least
+# INCREMENTAL_MIN_NEW_ESTIMATORS; a model that would grow past INCREMENTAL_MAX_ESTIMATORS is retrained
+INCREMENTAL_MIN_NEW_ESTIMATORS = 10
+INCREMENTAL_MAX_ESTIMATORS = 2000
+INCREMENTAL_MAX_R2_DROP = 0.02
+
 MODEL_PARAMS = {
     "Decision Tree": {
         "criterion": ["squared_error", "friedman_mse", "absolute_error", "poisson"],
@@ -29,3 +176,13 @@ MODEL_PARAMS = {
         "n_estimators": [8, 16, 32, 64, 128, 256],
     },
 }
+
+# Training run report: wall/CPU time, peak RSS (sampled every TRAIN_RSS_SAMPLE_INTERVAL seconds)
+# and rows/fits per second for every stage and model search. Optional cProfile of the whole run and
+# tracemalloc per-stage Python allocation peaks (both slow training down; off by default)
+TRAIN_RUN_REPORT_FILE = BASE_DATA_DIR / "train_run_report.json"
+TRAIN_RSS_SAMPLE_INTERVAL = 0.05
+TRAIN_PROFILE = False
+TRAIN_TRACEMALLOC = False
+TRAIN_PROFILE_FILE = BASE_DATA_DIR / "train_profile.prof"
+TRAIN_PROFILE_TOP = 25
@@ -11,3 +11,4 @@ class DataIngestionConfig:
     train_data_path: str = os.path.join(base_dir, "train.csv")
     test_data_path: str = os.path.join(base_dir, "test.csv")
     raw_data_path: str = os.path.join(base_dir, "data.csv")
+    report_file_path: str = os.path.join(base_dir, "ingestion_report.json")
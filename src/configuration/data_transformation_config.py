@@ -9,3 +9,6 @@ class DataTransformationConfig:
     preprocessor_obj_file_path: str = field(
         default_factory=lambda: os.path.join(config.BASE_DATA_DIR, "preprocessor.pkl")
     )
+    compiled_preprocessor_obj_file_path: str = field(
+        default_factory=lambda: os.path.join(config.BASE_DATA_DIR, "compiled_preprocessor.pkl")
+    )
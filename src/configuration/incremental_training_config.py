@@ -0,0 +1,10 @@
+import os
+from dataclasses import dataclass
+from . import config
+
+
+@dataclass
+class IncrementalTrainingConfig:
+    state_file_path: str = os.path.join(config.BASE_DATA_DIR, "incremental_state.json")
+    report_file_path: str = os.path.join(config.BASE_DATA_DIR, "incremental_report.json")
+    target_column: str = "math_score"
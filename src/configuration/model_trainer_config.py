@@ -6,3 +6,6 @@ from . import config
 @dataclass
 class ModelTrainerConfig:
     trained_model_file_path = os.path.join(config.BASE_DATA_DIR, "model.pkl")
+    report_file_path = os.path.join(config.BASE_DATA_DIR, "model_report.json")
+    portable_model_file_path = os.path.join(config.BASE_DATA_DIR, "model_portable.npz")
+    prediction_table_file_path = os.path.join(config.BASE_DATA_DIR, "model_prediction_table.npz")
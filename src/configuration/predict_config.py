@@ -1,8 +1,10 @@
 import os
 import pandas as pd
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields
+from numbers import Real
+from typing import List
 from . import config
-from src.exception import CustomException
+from src.exception import CustomException, ValidationError
 
 
 @dataclass
@@ -10,6 +12,33 @@ class PredictConfig:
     """Configuration for the prediction pipeline."""
     model_path: str = os.path.join(config.BASE_DATA_DIR, "model.pkl")
     preprocessor_path: str = os.path.join(config.BASE_DATA_DIR, "preprocessor.pkl")
+    compiled_preprocessor_path: str = os.path.join(config.BASE_DATA_DIR, "compiled_preprocessor.pkl")
+    use_compiled_preprocessor: bool = config.PREDICT_USE_COMPILED_PREPROCESSOR
+    portable_model_path: str = None  # Defaults to "<model>_portable.npz" next to model_path
+    use_portable_model: bool = config.PREDICT_USE_PORTABLE_MODEL
+    prediction_table_path: str = None  # Defaults to "<model>_prediction_table.npz" next to model_path
+    use_prediction_table: bool = config.PREDICT_USE_PREDICTION_TABLE
+    max_batch_records: int = config.PREDICT_BATCH_MAX_RECORDS
+    micro_batching: bool = config.PREDICT_MICRO_BATCHING
+    micro_batch_max_size: int = config.PREDICT_MICRO_BATCH_MAX_SIZE
+    micro_batch_max_wait_ms: float = config.PREDICT_MICRO_BATCH_MAX_WAIT_MS
+    prediction_cache_max_entries: int = config.PREDICTION_CACHE_MAX_ENTRIES
+    prediction_cache_ttl_seconds: float = config.PREDICTION_CACHE_TTL_SECONDS
+    warmup_record: dict = field(default_factory=lambda: dict(config.PREDICT_WARMUP_RECORD))
+
+    def __post_init__(self):
+        if self.portable_model_path is None:
+            self.portable_model_path = f"{os.path.splitext(self.model_path)[0]}_portable.npz"
+        if self.prediction_table_path is None:
+            self.prediction_table_path = f"{os.path.splitext(self.model_path)[0]}_prediction_table.npz"
+
+
+@dataclass
+class BatchPredictConfig:
+    """Configuration for offline bulk scoring of large files."""
+    chunk_size: int = config.BATCH_PREDICT_CHUNK_SIZE
+    workers: int = config.BATCH_PREDICT_WORKERS
+    prediction_column: str = "math_score_prediction"
 
 
 @dataclass
@@ -27,4 +56,68 @@ class CustomData:
         try:
             return pd.DataFrame([self.__dict__])
         except Exception as e:
-            raise CustomException("Failed to create DataFrame", cause=e)
\ No newline at end of file
+            raise CustomException("Failed to create DataFrame", cause=e)
+
+    @classmethod
+    def from_form(cls, form) -> "CustomData":
+        """
+        Builds a record from the submitted form fields.
+
+        Raises:
+            ValidationError: If any field is missing or invalid (all problems are listed in `details`).
+        """
+        record = {field.name: form.get(field.name, "") for field in fields(cls)}
+        record["race_ethnicity"] = form.get("ethnicity", "")
+        for name in ("reading_score", "writing_score"):
+            try:
+                record[name] = int(form.get(name, 0))
+            except (TypeError, ValueError):
+                pass  # Reported by validate_records
+
+        errors = [error.replace("record 0: ", "", 1) for error in cls.validate_records([record])]
+        if errors:
+            raise ValidationError("Invalid input.", details=errors)
+        return cls(**{name: value.strip() if isinstance(value, str) else value for name, value in record.items()})
+
+    @classmethod
+    def validate_records(cls, records) -> List[str]:
+        """
+        Validates a batch of raw records (dicts keyed by field name) in one pass.
+
+        Returns:
+            list: Error messages prefixed with the offending record index; empty if all records are valid.
+        """
+        if not isinstance(records, list):
+            return ["Expected a list of records."]
+
+        errors = []
+        for index, record in enumerate(records):
+            if not isinstance(record, dict):
+                errors.append(f"record {index}: expected an object")
+                continue
+            for field in fields(cls):
+                value = record.get(field.name)
+                if value is None:
+                    errors.append(f"record {index}: missing '{field.name}'")
+                elif field.type is int:
+                    if isinstance(value, bool) or not isinstance(value, Real):
+                        errors.append(f"record {index}: '{field.name}' must be a number")
+                    elif not 0 <= value <= 100:
+                        errors.append(f"record {index}: '{field.name}' must be between 0 and 100")
+                elif not isinstance(value, str) or not value.strip():
+                    errors.append(f"record {index}: '{field.name}' must be a non-empty string")
+        return errors
+
+    @classmethod
+    def records_to_dataframe(cls, records: List[dict]) -> pd.DataFrame:
+        """Converts validated records into a single DataFrame, built column by column."""
+        try:
+            columns = {}
+            for field in fields(cls):
+                if field.type is int:
+                    columns[field.name] = [record[field.name] for record in records]
+                else:
+                    columns[field.name] = [record[field.name].strip() for record in records]
+            return pd.DataFrame(columns)
+        except Exception as e:
+            raise CustomException("Failed to create DataFrame", cause=e)
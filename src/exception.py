@@ -1,6 +1,8 @@
 import sys
 import traceback
 import threading
+import weakref
+from src.configuration import config
 from src.logger import Logger
 
 
@@ -9,7 +11,14 @@ logger = Logger.get_logger()
 
 
 class CustomException(Exception):
-    """Custom exception class that provides detailed error messages and automatic logging."""
+    """
+    Custom exception class that provides detailed error messages and automatic logging.
+
+    In lazy mode (config.EXCEPTION_LAZY) construction only keeps references to the active
+    traceback and the cause; the detailed message is formatted the first time it is rendered.
+    Only the exception that wraps the root cause logs it: wrapping a CustomException again
+    (e.g. a pipeline re-raising a loader failure) does not log the same failure twice.
+    """
 
     _local = threading.local()  # Thread-local storage for safe exception handling
 
@@ -22,19 +31,54 @@ class CustomException(Exception):
             cause (Exception, optional): The original exception causing this error.
         """
         super().__init__(error_message)
+        self.message = error_message
+        self.cause = cause
+        self._error_message = None
 
-        # Capture full stack trace
-        self.error_message = self._get_detailed_error_message(error_message, cause)
+        if not config.EXCEPTION_LAZY:
+            # Capture full stack trace
+            self._error_message = self._get_detailed_error_message(error_message, cause)
+        else:
+            exc_type, _, exc_tb = sys.exc_info()
+            self._exc_type, self._exc_tb = exc_type, exc_tb
 
-        # Store in thread-local storage for debugging in multi-threaded apps
-        self._local.last_error = self.error_message
+        # Store in thread-local storage for debugging in multi-threaded apps; a weak reference, so
+        # the exception and the frames of its traceback are not kept alive after it was handled
+        self._local.last_error = weakref.ref(self)
 
-        # Auto-log the error
-        logger.error(self.error_message)
+        # Auto-log the error (lazy mode: once per exception chain, formatted only if emitted)
+        if not config.EXCEPTION_LAZY:
+            logger.error(self.error_message)
+        elif not isinstance(cause, CustomException):
+            logger.error("%s", self)
 
     def __str__(self):
         return self.error_message
 
+    @property
+    def error_message(self) -> str:
+        """The detailed message (location, message and cause trace), formatted on first access."""
+        if self._error_message is None:
+            self._error_message = self._format_lazy_message()
+        return self._error_message
+
+    def _format_lazy_message(self) -> str:
+        tb = self._exc_tb
+        if tb is not None:
+            while tb.tb_next is not None:  # Last traceback entry, without reading source lines
+                tb = tb.tb_next
+            detailed_message = (f"[{self._exc_type.__name__}] Error in {tb.tb_frame.f_code.co_filename}, "
+                                f"line {tb.tb_lineno}: {self.message}")
+        else:
+            detailed_message = f"[{self.message}]"
+
+        if self.cause:
+            cause_trace = "".join(traceback.format_exception(type(self.cause), self.cause,
+                                                             self.cause.__traceback__))
+            detailed_message += f"\nCaused by:\n{cause_trace}"
+        self._exc_tb = None  # Release the frames once formatted
+        return detailed_message
+
     @staticmethod
     def _get_detailed_error_message(error_message, cause):
         """
@@ -66,8 +110,24 @@ class CustomException(Exception):
 
     @classmethod
     def get_last_error(cls):
-        """Returns the last recorded error for the current thread (useful in multi-threaded environments)."""
-        return getattr(cls._local, "last_error", None)
+        """Returns the last error recorded by the current thread while it is still referenced (None after it was freed)."""
+        last_error = getattr(cls._local, "last_error", None)
+        last_error = last_error() if last_error is not None else None
+        return last_error.error_message if last_error is not None else None
+
+
+class ValidationError(CustomException):
+    """
+    Invalid request input. Expected on the request path, so it captures no traceback, formats
+    nothing and is not logged; `details` lists the individual problems.
+    """
+
+    def __init__(self, error_message, details=None):
+        Exception.__init__(self, error_message)
+        self.message = error_message
+        self.cause = None
+        self.details = list(details or [])
+        self._error_message = error_message if not self.details else f"{error_message} {'; '.join(self.details)}"
 
 
 # Testing
@@ -0,0 +1,216 @@
+import contextvars
+import cProfile
+import io
+import os
+import pstats
+import resource
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from src.configuration import config
+from src.logger import Logger
+from src.utils import save_json
+
+
+# Initialize the custom logger
+logger = Logger.get_logger()
+
+_active_run = contextvars.ContextVar("training_run", default=None)
+_active_stage = contextvars.ContextVar("training_stage", default=None)
+
+
+def _current_rss() -> int:
+    """Resident set size of this process in bytes (0 where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _max_rss() -> int:
+    """High-water RSS of this process in bytes (ru_maxrss is in KiB on Linux, bytes on macOS)."""
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if os.uname().sysname == "Darwin" else max_rss * 1024
+
+
+class RunInstrumentation:
+    """
+    Records wall time, CPU time, peak RSS and throughput for the stages of a training run.
+
+    Stages are opened with the module-level `stage()` context manager, from anywhere in the
+    call stack, while the run is active (`with instrumentation.activate(): ...`); outside an
+    active run `stage()` does nothing. A background thread samples RSS every
+    `sample_interval` seconds to get each stage's own peak.
+
+    CPU and memory figures cover this process only: the worker processes of `n_jobs=-1`
+    searches are not included (their work shows up as wall time).
+
+    `profile` runs cProfile over the whole run; `trace_memory` runs tracemalloc and reports
+    each stage's peak of Python allocations plus the top allocation sites.
+    """
+
+    def __init__(self, profile: bool = None, trace_memory: bool = None, sample_interval: float = None):
+        self.profile = config.TRAIN_PROFILE if profile is None else profile
+        self.trace_memory = config.TRAIN_TRACEMALLOC if trace_memory is None else trace_memory
+        self.sample_interval = config.TRAIN_RSS_SAMPLE_INTERVAL if sample_interval is None else sample_interval
+        self.stages = []
+        self.started_at = None
+        self.wall_s = None
+        self._open = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._profiler = None
+        self._memory_top = None
+
+    @contextmanager
+    def activate(self):
+        """Makes this the active run for `stage()` calls in this context, and starts the samplers."""
+        token = _active_run.set(self)
+        self.started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        start = time.perf_counter()
+        sampler = threading.Thread(target=self._sample_rss, name="rss-sampler", daemon=True)
+        sampler.start()
+        if self.trace_memory:
+            tracemalloc.start()
+        if self.profile:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        try:
+            yield self
+        finally:
+            if self._profiler is not None:
+                self._profiler.disable()
+            if self.trace_memory:
+                snapshot = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+                self._memory_top = [
+                    {"site": str(stat.traceback), "size_mb": round(stat.size / 2 ** 20, 3), "count": stat.count}
+                    for stat in snapshot.statistics("lineno")[:config.TRAIN_PROFILE_TOP]
+                ]
+            self._stop.set()
+            sampler.join()
+            self.wall_s = round(time.perf_counter() - start, 4)
+            _active_run.reset(token)
+
+    def open_stage(self, name: str, fields: dict) -> dict:
+        parent = _active_stage.get()
+        record = {"name": name, "parent": parent["name"] if parent else None, **fields}
+        rss = _current_rss()
+        record["_start"] = (time.perf_counter(), time.process_time(), os.times(), rss)
+        record["_peak_rss"] = rss
+        with self._lock:
+            if self.trace_memory:
+                # Fold the peak so far into the enclosing stages before restarting it for this one
+                self._fold_traced_peak()
+                tracemalloc.reset_peak()
+                record["_traced_peak"] = tracemalloc.get_traced_memory()[0]
+            self._open.append(record)
+        return record
+
+    def close_stage(self, record: dict, error: BaseException = None):
+        wall_start, cpu_start, times_start, rss_start = record.pop("_start")
+        wall = time.perf_counter() - wall_start
+        times_end = os.times()
+        rss_end = _current_rss()
+        with self._lock:
+            if self.trace_memory:
+                self._fold_traced_peak()
+            self._open.remove(record)
+            peak_rss = max(record.pop("_peak_rss"), rss_end)
+
+        record.update({
+            "wall_s": round(wall, 4),
+            "cpu_s": round(time.process_time() - cpu_start, 4),
+            "children_cpu_s": round((times_end.children_user - times_start.children_user)
+                                    + (times_end.children_system - times_start.children_system), 4),
+            "rss_start_mb": round(rss_start / 2 ** 20, 1),
+            "rss_end_mb": round(rss_end / 2 ** 20, 1),
+            "peak_rss_mb": round(peak_rss / 2 ** 20, 1),
+        })
+        if self.trace_memory:
+            record["traced_peak_mb"] = round(record.pop("_traced_peak") / 2 ** 20, 3)
+        for count, rate in (("rows", "rows_per_s"), ("fits", "fits_per_s")):
+            if record.get(count) and wall > 0:
+                record[rate] = round(record[count] / wall, 2)
+        if error is not None:
+            record["error"] = f"{type(error).__name__}: {error}"
+        self.stages.append(record)
+
+    def report(self) -> dict:
+        """Returns the run report: per-stage metrics, process peak RSS and any profiles."""
+        report = {
+            "started_at": self.started_at,
+            "wall_s": self.wall_s,
+            "max_rss_mb": round(_max_rss() / 2 ** 20, 1),
+            "stages": self.stages,
+        }
+        if self._profiler is not None:
+            output = io.StringIO()
+            pstats.Stats(self._profiler, stream=output).sort_stats("cumulative").print_stats(config.TRAIN_PROFILE_TOP)
+            report["profile"] = {"file": str(config.TRAIN_PROFILE_FILE), "top_cumulative": output.getvalue()}
+        if self._memory_top is not None:
+            report["tracemalloc_top"] = self._memory_top
+        return report
+
+    def save(self, report_path=None) -> dict:
+        """Writes the run report (and the raw cProfile stats, when profiling) next to the artifacts."""
+        report_path = config.TRAIN_RUN_REPORT_FILE if report_path is None else report_path
+        report = self.report()
+        if self._profiler is not None:
+            os.makedirs(os.path.dirname(str(config.TRAIN_PROFILE_FILE)), exist_ok=True)
+            self._profiler.dump_stats(str(config.TRAIN_PROFILE_FILE))
+        save_json(report_path, report)
+        for record in self.stages:
+            logger.info(f"Stage {record['name']}: {record['wall_s']}s wall, {record['cpu_s']}s CPU, "
+                        f"peak RSS {record['peak_rss_mb']} MB")
+        return report
+
+    def _fold_traced_peak(self):
+        peak = tracemalloc.get_traced_memory()[1]
+        for record in self._open:
+            record["_traced_peak"] = max(record["_traced_peak"], peak)
+
+    def _sample_rss(self):
+        while not self._stop.wait(self.sample_interval):
+            rss = _current_rss()
+            with self._lock:
+                for record in self._open:
+                    if rss > record["_peak_rss"]:
+                        record["_peak_rss"] = rss
+
+
+@contextmanager
+def stage(name: str, **fields):
+    """
+    Measures the enclosed block as a stage of the active training run.
+
+    Yields the stage record; extra counters (rows, fits, cached, ...) can be set on it, or from
+    deeper in the call stack with `annotate()`. Without an active run this does nothing.
+    """
+    run = _active_run.get()
+    if run is None:
+        yield {}
+        return
+
+    record = run.open_stage(name, fields)
+    token = _active_stage.set(record)
+    try:
+        yield record
+    except BaseException as e:
+        run.close_stage(record, error=e)
+        raise
+    else:
+        run.close_stage(record)
+    finally:
+        _active_stage.reset(token)
+
+
+def annotate(**fields):
+    """Adds counters (e.g. rows=...) to the innermost open stage, if any."""
+    record = _active_stage.get()
+    if record is not None:
+        record.update(fields)
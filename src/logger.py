@@ -1,19 +1,108 @@
+import atexit
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import threading
+import time
 from datetime import datetime
 from src.configuration import config
 
+TEXT_FORMAT = "[%(asctime)s] %(lineno)d %(name)s - %(levelname)s - %(message)s"
+
+# Attributes every LogRecord has; anything else was passed through `extra=` and goes into JSON output
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats each record as one JSON object per line, including any `extra=` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "line": record.lineno,
+            "process": record.process,
+            "message": record.getMessage(),
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES})
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets through at most `rate` INFO/DEBUG records per second from each call site.
+
+    Warnings and errors always pass. The number of records dropped since the last one that
+    passed is attached to it as `suppressed`.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_allowed = {}
+        self._suppressed = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.interval:
+            return True
+        site = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            if now < self._next_allowed.get(site, 0.0):
+                self._suppressed[site] = self._suppressed.get(site, 0) + 1
+                return False
+            self._next_allowed[site] = now + self.interval
+            suppressed = self._suppressed.pop(site, 0)
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops (and counts) records when the queue is full instead of blocking."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
 
 class Logger:
     """Singleton Logger for consistent logging across the project."""
 
     _logger = None  # Static instance
+    _hot_path_logger = None
+    _listener = None  # Background writer in async mode
+    _writer = None  # (queue handler, output handlers) it serves
 
     @staticmethod
-    def get_logger(log_dir=config.LOG_DIR, log_level=logging.INFO, logger_name='ml_project_logger'):
-        """Returns a configured logger instance (singleton)."""
+    def get_logger(log_dir=config.LOG_DIR, log_level=logging.INFO, logger_name='ml_project_logger',
+                   mode=None, log_format=None):
+        """
+        Returns a configured logger instance (singleton).
+
+        In "async" mode the caller only puts the record on a bounded queue; a background thread
+        writes it to the file and console handlers, so request threads never wait on I/O.
+        `mode` and `log_format` default to config.LOG_MODE and config.LOG_FORMAT, read when the
+        logger is first created.
+        """
 
         if Logger._logger is None:
+            mode = config.LOG_MODE if mode is None else mode
+            log_format = config.LOG_FORMAT if log_format is None else log_format
+
             # Create logs directory if not exists
             os.makedirs(log_dir, exist_ok=True)
 
@@ -25,27 +114,75 @@ class Logger:
             logger = logging.getLogger(logger_name)
             logger.setLevel(log_level)
 
-            # File handler
-            file_handler = logging.FileHandler(log_file_path)
-            file_handler.setFormatter(
-                logging.Formatter("[%(asctime)s] %(lineno)d %(name)s - %(levelname)s - %(message)s")
-            )
+            formatter = JsonFormatter() if log_format == "json" else logging.Formatter(TEXT_FORMAT)
+
+            # File handler (the file is only opened on the first record)
+            file_handler = logging.FileHandler(log_file_path, delay=True)
+            file_handler.setFormatter(formatter)
 
             # Console handler
             console_handler = logging.StreamHandler()
-            console_handler.setFormatter(
-                logging.Formatter("[%(asctime)s] %(lineno)d %(name)s - %(levelname)s - %(message)s")
-            )
+            console_handler.setFormatter(formatter)
 
             # Add handlers
-            logger.addHandler(file_handler)
-            logger.addHandler(console_handler)
+            if mode == "async":
+                queue_handler = DroppingQueueHandler(queue.Queue(config.LOG_QUEUE_SIZE))
+                logger.addHandler(queue_handler)
+                Logger._start_listener(queue_handler, file_handler, console_handler)
+            else:
+                logger.addHandler(file_handler)
+                logger.addHandler(console_handler)
 
             # Store singleton instance
             Logger._logger = logger
 
         return Logger._logger
 
+    @staticmethod
+    def get_hot_path_logger():
+        """
+        Returns the logger for per-request messages: a child of the project logger whose
+        INFO/DEBUG records are rate limited per call site (config.LOG_HOT_PATH_RATE).
+        """
+        if Logger._hot_path_logger is None:
+            logger = Logger.get_logger().getChild("hot_path")
+            logger.addFilter(RateLimitFilter(config.LOG_HOT_PATH_RATE))
+            Logger._hot_path_logger = logger
+        return Logger._hot_path_logger
+
+    @staticmethod
+    def flush():
+        """Blocks until every queued record has been written (async mode)."""
+        if Logger._listener is not None:
+            Logger._listener.queue.join()
+
+    @staticmethod
+    def shutdown():
+        """Writes the remaining queued records and stops the background writer."""
+        if Logger._listener is not None:
+            Logger._listener.stop()
+            Logger._listener = Logger._writer = None
+
+    @staticmethod
+    def _start_listener(queue_handler, *handlers):
+        # A fresh queue: one inherited through fork may have been locked by a thread that no longer exists
+        queue_handler.queue = queue.Queue(config.LOG_QUEUE_SIZE)
+        listener = logging.handlers.QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+        listener.start()
+        Logger._listener = listener
+        Logger._writer = (queue_handler, handlers)
+
+    @staticmethod
+    def _restart_after_fork():
+        # The writer thread does not survive fork (e.g. preloading server workers)
+        if Logger._writer is not None:
+            queue_handler, handlers = Logger._writer
+            Logger._start_listener(queue_handler, *handlers)
+
+
+os.register_at_fork(after_in_child=Logger._restart_after_fork)
+atexit.register(Logger.shutdown)
+
 
 # Testing
 if __name__ == "__main__":
@@ -0,0 +1,404 @@
+import atexit
+import json
+import math
+import os
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from typing import Callable, Dict, Sequence
+
+from src.configuration import config
+from src.logger import Logger
+
+
+# Initialize the custom logger
+logger = Logger.get_logger()
+
+SNAPSHOT_PREFIX = "metrics_"
+
+
+class _Timer:
+    """Observes the seconds spent in a `with` block into a histogram."""
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+
+
+class Counter:
+    def __init__(self, registry, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def inc(self, *labels, amount: float = 1.0):
+        shard = self.registry._shard()
+        key = (self.name, labels)
+        shard[key] = shard.get(key, 0.0) + amount
+
+
+class Histogram:
+    """Counts observations per bucket (upper bounds, inclusive) and keeps their sum."""
+
+    def __init__(self, registry, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = None):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(config.METRICS_LATENCY_BUCKETS if buckets is None else buckets))
+
+    def observe(self, value: float, *labels):
+        shard = self.registry._shard()
+        key = (self.name, labels)
+        values = shard.get(key)
+        if values is None:
+            # One count per bucket plus +Inf (not cumulative), then the sum of the observations
+            values = shard[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        values[bisect_left(self.buckets, value)] += 1
+        values[-1] += value
+
+    def time(self, *labels) -> _Timer:
+        return _Timer(self, labels)
+
+
+class Gauge:
+    """A value computed at scrape time by `callback(values)`, from the aggregated counters and histograms."""
+
+    def __init__(self, registry, name: str, documentation: str, labelnames: Sequence[str],
+                 callback: Callable[[dict], Dict[tuple, float]]):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+
+
+class _ShardOwner:
+    """Kept in a thread's local storage only; when the thread ends it is freed and its shard retired."""
+    __slots__ = ("__weakref__",)
+
+
+class MetricsRegistry:
+    """
+    Counters and histograms shared by every thread and every worker process of the server.
+
+    Each thread records into its own shard (a dict only that thread writes), so recording takes
+    no lock. When a thread ends, its shard is folded into the retired totals, so threads started
+    per request do not accumulate shards.
+
+    Values stay in memory unless `enable_snapshots()` was called, which only the server does (a
+    batch run or a training script records into the same metrics and must not add to the
+    server's totals). Then a background thread sums the shards every `flush_interval` seconds
+    and, when they changed, writes the totals of this process to `<directory>/metrics_<pid>.json`.
+    `collect()` adds the snapshots of the other processes to the live totals of this one, so a
+    scrape answered by any worker covers the whole server (to within one flush interval).
+
+    `retire(pid)` folds the snapshot of an exited worker into `metrics_retired.json`, so counters
+    never go backwards while the server runs and the directory holds one file per live worker;
+    `clear()` empties the directory when the server starts. `directory` and `flush_interval`
+    default to config.METRICS_DIR and config.METRICS_FLUSH_INTERVAL, read when they are used.
+    """
+
+    def __init__(self, directory=None, flush_interval: float = None, snapshots: bool = False):
+        self._directory = directory
+        self._flush_interval = flush_interval
+        self.snapshots = snapshots
+        self.metrics = {}
+        self._shards = []
+        self._retired = {}  # Totals of the shards of ended threads
+        self._ended = []  # Shards of ended threads, not yet folded into the retired totals
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._written = {}
+        self._writer = None
+        self._stop = threading.Event()
+
+    @property
+    def directory(self) -> str:
+        return str(config.METRICS_DIR if self._directory is None else self._directory)
+
+    @directory.setter
+    def directory(self, directory):
+        self._directory = directory
+
+    @property
+    def flush_interval(self) -> float:
+        return config.METRICS_FLUSH_INTERVAL if self._flush_interval is None else self._flush_interval
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(self, name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = None) -> Histogram:
+        return self._register(Histogram(self, name, documentation, labelnames, buckets))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str],
+              callback: Callable[[dict], Dict[tuple, float]]) -> Gauge:
+        return self._register(Gauge(self, name, documentation, labelnames, callback))
+
+    def snapshot(self) -> dict:
+        """Returns this process's totals, keyed by (metric name, label values)."""
+        with self._lock:
+            self._retire_ended()
+            shards = [shard.copy() for shard in self._shards]
+            values = _merge({}, self._retired.items())
+        return _merge(values, (item for shard in shards for item in shard.items()))
+
+    def collect(self) -> dict:
+        """Returns the totals of every process: this one's live values plus the other processes' snapshots."""
+        values = self.snapshot()
+        if not self.snapshots:
+            return values
+        own_file = self._snapshot_path(os.getpid())
+        try:
+            file_names = os.listdir(self.directory)
+        except FileNotFoundError:
+            file_names = []
+        for file_name in file_names:
+            file_path = os.path.join(self.directory, file_name)
+            if not (file_name.startswith(SNAPSHOT_PREFIX) and file_name.endswith(".json")) or file_path == own_file:
+                continue
+            try:
+                _merge(values, _read_snapshot(file_path).items())
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Skipping metrics snapshot {file_path}: {e}")
+        return values
+
+    def render(self) -> str:
+        """Renders the aggregated metrics in the Prometheus text exposition format."""
+        values = self.collect()
+        by_metric = {}
+        for (name, labels), value in values.items():
+            by_metric.setdefault(name, []).append((labels, value))
+
+        lines = []
+        for metric in self.metrics.values():
+            if isinstance(metric, Gauge):
+                try:
+                    samples = list(metric.callback(values).items())
+                except Exception as e:
+                    logger.warning(f"Metric {metric.name} unavailable: {e}")
+                    continue
+                kind = "gauge"
+            else:
+                samples = sorted(by_metric.get(metric.name, []))
+                kind = "histogram" if isinstance(metric, Histogram) else "counter"
+
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {kind}")
+            for labels, value in samples:
+                label_pairs = list(zip(metric.labelnames, labels))
+                if kind != "histogram":
+                    lines.append(f"{metric.name}{_format_labels(label_pairs)} {_format_value(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(metric.buckets + (math.inf,), value):
+                    cumulative += count
+                    lines.append(f"{metric.name}_bucket{_format_labels(label_pairs + [('le', bound)])} {cumulative}")
+                lines.append(f"{metric.name}_sum{_format_labels(label_pairs)} {_format_value(value[-1])}")
+                lines.append(f"{metric.name}_count{_format_labels(label_pairs)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+    def enable_snapshots(self):
+        """Shares this process's totals through snapshot files (the server, before it forks its workers)."""
+        with self._lock:
+            self.snapshots = True
+            if self._shards and self._writer is None:
+                self._start_writer()
+
+    def flush(self):
+        """Writes this process's totals to its snapshot file, if they changed since the last write."""
+        if not self.snapshots:
+            return
+        with self._lock:
+            self._retire_ended()
+            values = _merge(_merge({}, self._retired.items()),
+                            (item for shard in self._shards for item in shard.copy().items()))
+            if values == self._written:
+                return
+            _write_snapshot(self._snapshot_path(os.getpid()), values)
+            self._written = values
+
+    def retire(self, pid: int):
+        """Folds the snapshot of an exited process into the retired totals file and removes it."""
+        file_path = self._snapshot_path(pid)
+        try:
+            values = _read_snapshot(file_path)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Could not retire metrics snapshot {file_path}: {e}")
+            return
+        with self._lock:
+            retired_path = self._snapshot_path("retired")
+            try:
+                values = _merge(_read_snapshot(retired_path), values.items())
+            except FileNotFoundError:
+                pass
+            _write_snapshot(retired_path, values)
+            os.remove(file_path)
+
+    def clear(self):
+        """Resets this process's values and removes every snapshot file (at server start)."""
+        with self._lock:
+            for shard in self._shards:
+                shard.clear()
+            self._retired.clear()
+            self._written = {}
+            try:
+                file_names = os.listdir(self.directory)
+            except FileNotFoundError:
+                return
+            for file_name in file_names:
+                if file_name.startswith(SNAPSHOT_PREFIX):
+                    try:
+                        os.remove(os.path.join(self.directory, file_name))
+                    except FileNotFoundError:
+                        pass
+
+    def _register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def _shard(self) -> dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            owner = self._local.owner = _ShardOwner()
+            weakref.finalize(owner, self._ended.append, shard)
+            with self._lock:
+                self._retire_ended()
+                self._shards.append(shard)
+                if self.snapshots and self._writer is None:
+                    self._start_writer()
+            return shard
+
+    def _retire_ended(self):
+        # Called with the lock held. The finalizers only append (they may run in any thread, also
+        # one holding the lock), the shards are folded here.
+        if not self._ended:
+            return
+        ended = []
+        while self._ended:
+            ended.append(self._ended.pop())
+        ended_ids = {id(shard) for shard in ended}
+        self._shards = [shard for shard in self._shards if id(shard) not in ended_ids]
+        _merge(self._retired, (item for shard in ended for item in shard.items()))
+
+    def _start_writer(self):
+        self._stop = threading.Event()
+        self._writer = threading.Thread(target=self._write_periodically, name="metrics-writer", daemon=True)
+        self._writer.start()
+
+    def _write_periodically(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except OSError as e:
+                logger.warning(f"Could not write metrics snapshot: {e}")
+
+    def _snapshot_path(self, pid) -> str:
+        return os.path.join(self.directory, f"{SNAPSHOT_PREFIX}{pid}.json")
+
+    def _reset_after_fork(self):
+        # Values recorded before the fork belong to the parent, and its writer thread is not copied
+        self._lock = threading.Lock()
+        for shard in self._shards:
+            shard.clear()
+        self._retired.clear()
+        self._ended.clear()
+        self._written = {}
+        if self._writer is not None:
+            self._start_writer()
+
+
+def _merge(totals: dict, items) -> dict:
+    for key, value in items:
+        if isinstance(value, list):
+            current = totals.get(key)
+            totals[key] = list(value) if current is None else [a + b for a, b in zip(current, value)]
+        else:
+            totals[key] = totals.get(key, 0.0) + value
+    return totals
+
+
+def _read_snapshot(file_path: str) -> dict:
+    with open(file_path) as file:
+        entries = json.load(file)["values"]
+    return {(name, tuple(labels)): value for name, labels, value in entries}
+
+
+def _write_snapshot(file_path: str, values: dict):
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, "w") as file:
+        json.dump({"pid": os.getpid(),
+                   "values": [[name, list(labels), value] for (name, labels), value in values.items()]}, file)
+    os.replace(tmp_path, file_path)
+
+
+def _format_labels(pairs) -> str:
+    if not pairs:
+        return ""
+    escaped = (f'{name}="{_format_label_value(value)}"' for name, value in pairs)
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_label_value(value) -> str:
+    if isinstance(value, float):
+        return "+Inf" if value == math.inf else repr(value)
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _hit_ratios(values: dict) -> Dict[tuple, float]:
+    lookups = {}
+    for (name, labels), value in values.items():
+        if name == LOOKUPS.name:
+            source, result = labels
+            hits, total = lookups.get(source, (0.0, 0.0))
+            lookups[source] = (hits + (value if result == "hit" else 0.0), total + value)
+    return {(source,): hits / total for source, (hits, total) in lookups.items() if total}
+
+
+# Process-wide registry of the serving metrics, in memory until the server enables its snapshots
+registry = MetricsRegistry()
+os.register_at_fork(after_in_child=registry._reset_after_fork)
+atexit.register(registry.flush)
+
+REQUESTS = registry.counter(
+    "prediction_http_requests_total", "HTTP requests handled, by endpoint and status code.", ("endpoint", "status"))
+ERRORS = registry.counter(
+    "prediction_errors_total", "Rejected (validation) and failed (prediction) requests, by endpoint.",
+    ("endpoint", "kind"))
+REQUEST_LATENCY = registry.histogram(
+    "prediction_request_duration_seconds", "End-to-end request latency, by endpoint.", ("endpoint",))
+PHASE_LATENCY = registry.histogram(
+    "prediction_phase_duration_seconds",
+    "Latency of each request phase: parse, validate, build_frame (batch requests), transform, predict, render.",
+    ("phase",))
+BATCH_SIZE = registry.histogram(
+    "prediction_batch_size", "Records per batch request, and rows per model call (after micro-batching).",
+    ("stage",), buckets=config.METRICS_BATCH_SIZE_BUCKETS)
+LOOKUPS = registry.counter(
+    "prediction_lookups_total", "Prediction table and prediction cache lookups, by result.", ("source", "result"))
+HIT_RATIO = registry.gauge(
+    "prediction_lookup_hit_ratio", "Share of lookups answered by the prediction table or cache.", ("source",),
+    _hit_ratios)
@@ -0,0 +1,197 @@
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields
+from typing import Iterator
+
+import pandas as pd
+
+from src.configuration.predict_config import BatchPredictConfig, CustomData, PredictConfig
+from src.exception import CustomException
+from src.logger import Logger
+from src.pipelines.predict_pipeline import PredictPipeline
+
+
+# Initialize the custom logger
+logger = Logger.get_logger()
+
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+FEATURE_COLUMNS = [field.name for field in fields(CustomData)]
+# Parquet column types of the features, so a chunk with missing values keeps the file's schema
+_ARROW_TYPES = {str: "string", int: "int64", float: "double"}
+FEATURE_ARROW_TYPES = {field.name: _ARROW_TYPES[field.type] for field in fields(CustomData)}
+
+# Per-process pipeline used by worker processes (set by the pool initializer)
+_worker_pipeline = None
+
+
+def _init_worker(predict_config: PredictConfig):
+    global _worker_pipeline
+    _worker_pipeline = PredictPipeline(predict_config)
+
+
+def _score_chunk(features: pd.DataFrame):
+    return _worker_pipeline.predict_batch(features)
+
+
+class BatchPredictPipeline:
+    """
+    Scores a large CSV or Parquet file chunk by chunk and streams predictions to an output file.
+
+    Only `chunk_size` rows (times the number of in-flight chunks when using workers) are held in
+    memory at any time, so memory stays flat regardless of the input size.
+    """
+
+    def __init__(self, config: BatchPredictConfig = None, predict_config: PredictConfig = None):
+        self.config = config or BatchPredictConfig()
+        self.predict_config = predict_config or PredictConfig()
+
+    def run(self, input_path: str, output_path: str) -> dict:
+        """
+        Scores `input_path` and writes every input row plus its prediction to `output_path`.
+
+        Returns:
+            dict: Rows scored, chunks processed, elapsed seconds and rows per second.
+        """
+        try:
+            if not os.path.exists(input_path):
+                raise FileNotFoundError(f"Input file not found: {input_path}")
+
+            logger.info(f"Batch scoring {input_path} -> {output_path} "
+                        f"(chunk size {self.config.chunk_size}, workers {self.config.workers})")
+            start = time.perf_counter()
+            rows = chunks = 0
+
+            with self._open_writer(output_path) as write:
+                for chunk, preds in self._score_chunks(self._read_chunks(input_path)):
+                    chunk[self.config.prediction_column] = preds
+                    write(chunk)
+                    rows += len(chunk)
+                    chunks += 1
+
+            elapsed = time.perf_counter() - start
+            report = {
+                "rows": rows,
+                "chunks": chunks,
+                "seconds": round(elapsed, 3),
+                "rows_per_second": round(rows / elapsed, 1) if elapsed > 0 else 0.0,
+            }
+            logger.info(f"Batch scoring completed: {report}")
+            return report
+
+        except Exception as e:
+            raise CustomException("Batch scoring failed!", cause=e)
+
+    def _read_chunks(self, input_path: str) -> Iterator[pd.DataFrame]:
+        """Yields the input file in DataFrames of at most `chunk_size` rows."""
+        if str(input_path).endswith(PARQUET_EXTENSIONS):
+            import pyarrow.parquet as pq
+
+            parquet_file = pq.ParquetFile(input_path)
+            for batch in parquet_file.iter_batches(batch_size=self.config.chunk_size):
+                yield batch.to_pandas()
+        else:
+            yield from pd.read_csv(input_path, chunksize=self.config.chunk_size)
+
+    def _score_chunks(self, chunks: Iterator[pd.DataFrame]):
+        """Yields (chunk, predictions) in input order, in-process or across a bounded worker pool."""
+        if self.config.workers <= 1:
+            pipeline = PredictPipeline(self.predict_config)
+            for chunk in chunks:
+                yield chunk, pipeline.predict_batch(self._features(chunk))
+            return
+
+        max_in_flight = 2 * self.config.workers
+        in_flight = deque()
+        with ProcessPoolExecutor(max_workers=self.config.workers, initializer=_init_worker,
+                                 initargs=(self.predict_config,)) as executor:
+            for chunk in chunks:
+                in_flight.append((chunk, executor.submit(_score_chunk, self._features(chunk))))
+                # Back-pressure: stop reading until the oldest chunk is written out
+                if len(in_flight) >= max_in_flight:
+                    chunk, future = in_flight.popleft()
+                    yield chunk, future.result()
+            while in_flight:
+                chunk, future = in_flight.popleft()
+                yield chunk, future.result()
+
+    @staticmethod
+    def _features(chunk: pd.DataFrame) -> pd.DataFrame:
+        missing = [column for column in FEATURE_COLUMNS if column not in chunk.columns]
+        if missing:
+            raise ValueError(f"Input is missing feature columns: {missing}")
+        return chunk[FEATURE_COLUMNS]
+
+    def _open_writer(self, output_path: str):
+        """Returns a context manager yielding a function that appends one chunk to `output_path`."""
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        if str(output_path).endswith(PARQUET_EXTENSIONS):
+            return _ParquetChunkWriter(output_path, {**FEATURE_ARROW_TYPES, self.config.prediction_column: "double"})
+        return _CsvChunkWriter(output_path)
+
+
+class _CsvChunkWriter:
+    def __init__(self, output_path: str):
+        self.output_path = output_path
+        self.file = None
+        self.header = True
+
+    def __enter__(self):
+        self.file = open(self.output_path, "w", newline="")
+        return self.write
+
+    def write(self, chunk: pd.DataFrame):
+        chunk.to_csv(self.file, index=False, header=self.header)
+        self.header = False
+
+    def __exit__(self, *exc):
+        self.file.close()
+
+
+class _ParquetChunkWriter:
+    """
+    Writes every chunk with the schema of the first one, with the columns in `types` (Arrow type
+    names) fixed, so a later chunk whose inferred dtypes differ (e.g. ints turned float by a
+    missing value) is converted instead of failing halfway through the file.
+    """
+
+    def __init__(self, output_path: str, types: dict = None):
+        self.output_path = output_path
+        self.types = types or {}
+        self.schema = None
+        self.writer = None
+
+    def __enter__(self):
+        return self.write
+
+    def write(self, chunk: pd.DataFrame):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self.writer is None:
+            schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+            for name, type_name in self.types.items():
+                index = schema.get_field_index(name)
+                if index >= 0:
+                    schema = schema.set(index, pa.field(name, pa.type_for_alias(type_name)))
+            self.schema = schema
+            self.writer = pq.ParquetWriter(self.output_path, schema)
+        self.writer.write_table(pa.Table.from_pandas(chunk, schema=self.schema, preserve_index=False))
+
+    def __exit__(self, *exc):
+        if self.writer is not None:
+            self.writer.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Score a large CSV/Parquet file with the trained model.")
+    parser.add_argument("input_path", help="Input .csv or .parquet file with the CustomData feature columns")
+    parser.add_argument("output_path", help="Output .csv or .parquet file (input columns + prediction)")
+    parser.add_argument("--chunk-size", type=int, default=BatchPredictConfig.chunk_size)
+    parser.add_argument("--workers", type=int, default=BatchPredictConfig.workers)
+    args = parser.parse_args()
+
+    pipeline = BatchPredictPipeline(BatchPredictConfig(chunk_size=args.chunk_size, workers=args.workers))
+    print(pipeline.run(args.input_path, args.output_path))
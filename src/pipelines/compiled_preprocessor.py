@@ -0,0 +1,144 @@
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+
+def _is_missing(value) -> bool:
+    return value is None or (isinstance(value, float) and value != value)
+
+
+@dataclass
+class CompiledPreprocessor:
+    """
+    Lookup-table form of the fitted ColumnTransformer used for single-record scoring.
+
+    Holds only plain Python/NumPy data (imputer fill values, scaler means and scales, and a
+    category -> (output index, scaled value) table per categorical column), so transforming a
+    record is a dict -> NumPy vector step without pandas or sklearn input validation. Outputs
+    are bit-for-bit identical to the sklearn path (see `PreprocessorCompiler`).
+    """
+    n_features: int
+    numeric_columns: List[str]
+    numeric_positions: np.ndarray
+    numeric_fill: np.ndarray
+    numeric_mean: np.ndarray
+    numeric_scale: np.ndarray
+    categorical_columns: List[str]
+    categorical_fill: List[object]
+    categorical_lookup: List[Dict[object, Tuple[int, float]]]
+    handle_unknown: str = "ignore"
+    sparse_output: bool = False
+
+    def transform(self, records: Sequence[Mapping]) -> np.ndarray:
+        """Transforms a list of records (dicts keyed by column name) into the model's feature matrix."""
+        n_rows = len(records)
+        x = np.zeros((n_rows, self.n_features), dtype=np.float64)
+
+        numeric = np.empty((n_rows, len(self.numeric_columns)), dtype=np.float64)
+        for i, record in enumerate(records):
+            for j, column in enumerate(self.numeric_columns):
+                value = record.get(column)
+                numeric[i, j] = self.numeric_fill[j] if _is_missing(value) else value
+
+            for column, fill, lookup in zip(self.categorical_columns, self.categorical_fill,
+                                            self.categorical_lookup):
+                value = record.get(column)
+                hit = lookup.get(fill if _is_missing(value) else value)
+                if hit is not None:
+                    x[i, hit[0]] = hit[1]
+                elif self.handle_unknown == "error":
+                    raise ValueError(f"Found unknown category {value!r} in column {column!r}")
+
+        # Same operation order as StandardScaler.transform: subtract the mean, then divide by the scale
+        numeric -= self.numeric_mean
+        numeric /= self.numeric_scale
+        x[:, self.numeric_positions] = numeric
+
+        if self.sparse_output:
+            from scipy import sparse
+            return sparse.csr_matrix(x)
+        return x
+
+    def transform_record(self, record: Mapping) -> np.ndarray:
+        """Transforms a single record into a (1, n_features) feature matrix."""
+        return self.transform([record])
+
+    @classmethod
+    def from_column_transformer(cls, preprocessor) -> "CompiledPreprocessor":
+        """
+        Builds the lookup tables from a fitted ColumnTransformer.
+
+        Supports per-column pipelines of [SimpleImputer] -> [StandardScaler] for numerical
+        columns and [SimpleImputer] -> OneHotEncoder -> [StandardScaler(with_mean=False)] for
+        categorical columns. Raises ValueError for anything else.
+        """
+        numeric_columns, numeric_positions, numeric_fill, numeric_mean, numeric_scale = [], [], [], [], []
+        categorical_columns, categorical_fill, categorical_lookup = [], [], []
+        handle_unknown = "ignore"
+        position = 0
+
+        for name, transformer, columns in preprocessor.transformers_:
+            if name == "remainder" or transformer == "drop":
+                if transformer != "drop":
+                    raise ValueError("Remainder passthrough is not supported by the compiled preprocessor.")
+                continue
+
+            steps = [step for _, step in getattr(transformer, "steps", [(name, transformer)])]
+            kinds = [type(step).__name__ for step in steps]
+            imputer = steps[kinds.index("SimpleImputer")] if "SimpleImputer" in kinds else None
+            scaler = steps[kinds.index("StandardScaler")] if "StandardScaler" in kinds else None
+            unsupported = set(kinds) - {"SimpleImputer", "OneHotEncoder", "StandardScaler"}
+            if unsupported:
+                raise ValueError(f"Unsupported steps for the compiled preprocessor: {sorted(unsupported)}")
+            if imputer is not None and kinds.index("SimpleImputer") != 0:
+                raise ValueError("SimpleImputer must be the first step of a compiled pipeline.")
+            if imputer is not None and getattr(imputer, "add_indicator", False):
+                raise ValueError("SimpleImputer(add_indicator=True) is not supported.")
+
+            if "OneHotEncoder" in kinds:
+                encoder = steps[kinds.index("OneHotEncoder")]
+                if getattr(encoder, "drop_idx_", None) is not None or getattr(encoder, "_infrequent_enabled", False):
+                    raise ValueError("OneHotEncoder with drop or infrequent categories is not supported.")
+                if scaler is not None and (kinds.index("StandardScaler") < kinds.index("OneHotEncoder")
+                                           or scaler.with_mean):
+                    raise ValueError("Only StandardScaler(with_mean=False) after OneHotEncoder is supported.")
+                handle_unknown = encoder.handle_unknown
+
+                width = sum(len(categories) for categories in encoder.categories_)
+                # StandardScaler on sparse one-hot output multiplies by 1 / scale_
+                values = 1.0 / scaler.scale_ if scaler is not None and scaler.scale_ is not None else np.ones(width)
+                offset = position
+                for k, (column, categories) in enumerate(zip(columns, encoder.categories_)):
+                    categorical_columns.append(column)
+                    categorical_fill.append(imputer.statistics_[k] if imputer is not None else None)
+                    categorical_lookup.append({
+                        category: (offset + c, float(1.0 * values[offset - position + c]))
+                        for c, category in enumerate(categories.tolist())
+                    })
+                    offset += len(categories)
+                position += width
+            else:
+                for k, column in enumerate(columns):
+                    numeric_columns.append(column)
+                    numeric_positions.append(position + k)
+                    numeric_fill.append(imputer.statistics_[k] if imputer is not None else np.nan)
+                    mean = scaler.mean_ if scaler is not None and scaler.with_mean else None
+                    scale = scaler.scale_ if scaler is not None and scaler.with_std else None
+                    numeric_mean.append(mean[k] if mean is not None else 0.0)
+                    numeric_scale.append(scale[k] if scale is not None else 1.0)
+                position += len(columns)
+
+        return cls(
+            n_features=position,
+            numeric_columns=numeric_columns,
+            numeric_positions=np.asarray(numeric_positions, dtype=np.intp),
+            numeric_fill=np.asarray(numeric_fill, dtype=np.float64),
+            numeric_mean=np.asarray(numeric_mean, dtype=np.float64),
+            numeric_scale=np.asarray(numeric_scale, dtype=np.float64),
+            categorical_columns=categorical_columns,
+            categorical_fill=categorical_fill,
+            categorical_lookup=categorical_lookup,
+            handle_unknown=handle_unknown,
+            sparse_output=bool(getattr(preprocessor, "sparse_output_", False)),
+        )
@@ -0,0 +1,134 @@
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+from src.logger import Logger
+
+
+# Initialize the custom logger
+logger = Logger.get_logger()
+
+
+class MicroBatcher:
+    """
+    Collects concurrent small prediction requests and scores them in one vectorized call.
+
+    A background thread takes the first queued request, then keeps collecting until either
+    `max_batch_size` rows are gathered or `max_wait_ms` has passed. The rows are concatenated,
+    scored once through `predict_fn`, and each caller receives the slice for its own rows.
+    Requests are DataFrames, or lists of records.
+    """
+
+    def __init__(self, predict_fn: Callable[[pd.DataFrame], Any], max_batch_size: int = 32,
+                 max_wait_ms: float = 5.0):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._worker_pid = None
+
+        # Metrics
+        self._batch_sizes = Counter()
+        self._batches = 0
+        self._rows = 0
+
+    def predict(self, features: pd.DataFrame):
+        """Queues `features` for the next batch and blocks until its predictions are ready."""
+        return self.submit(features).result()
+
+    def submit(self, features: pd.DataFrame) -> Future:
+        """Queues `features` for the next batch and returns a future for its predictions."""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((features, future))
+        return future
+
+    def stats(self) -> dict:
+        """Returns the batch sizes actually achieved so far."""
+        with self._lock:
+            return {
+                "batches": self._batches,
+                "rows": self._rows,
+                "mean_batch_size": self._rows / self._batches if self._batches else 0.0,
+                "max_batch_size": max(self._batch_sizes, default=0),
+                "batch_size_counts": dict(sorted(self._batch_sizes.items())),
+            }
+
+    def _ensure_worker(self):
+        """Starts the batching thread on first use (and again in a forked worker process)."""
+        if self._worker is not None and self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker is None or self._worker_pid != os.getpid():
+                self._queue = queue.Queue()
+                self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+                self._worker_pid = os.getpid()
+                self._worker.start()
+
+    def _run(self):
+        pending = self._queue
+        while True:
+            batch = [pending.get()]
+            rows = len(batch[0][0])
+            deadline = time.monotonic() + self.max_wait
+
+            # Gather more requests until the batch is full or the wait budget is spent
+            while rows < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = pending.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                rows += len(item[0])
+
+            self._score(batch, rows)
+
+    def _score(self, batch, rows: int):
+        with self._lock:
+            self._batch_sizes[rows] += 1
+            self._batches += 1
+            self._rows += rows
+
+        if len(batch) == 1:
+            self._score_one(*batch[0])
+            return
+
+        try:
+            features = _concat([features for features, _ in batch])
+            preds = np.asarray(self.predict_fn(features))
+        except Exception:
+            # One bad request must not fail its neighbours: score them one by one
+            logger.warning(f"Batch of {rows} rows failed; retrying {len(batch)} requests individually.")
+            for features, future in batch:
+                self._score_one(features, future)
+            return
+
+        offset = 0
+        for features, future in batch:
+            future.set_result(preds[offset:offset + len(features)])
+            offset += len(features)
+
+    def _score_one(self, features: pd.DataFrame, future: Future):
+        try:
+            future.set_result(self.predict_fn(features))
+        except Exception as e:
+            future.set_exception(e)
+
+
+def _concat(parts):
+    if isinstance(parts[0], pd.DataFrame):
+        return pd.concat(parts, ignore_index=True)
+    return [item for part in parts for item in part]
@@ -0,0 +1,159 @@
+import json
+import os
+import struct
+import zipfile
+from dataclasses import dataclass, field
+from typing import Dict
+
+import numpy as np
+
+
+@dataclass
+class PortableModel:
+    """
+    Compact, numpy-only form of the trained model used for serving.
+
+    `kind` selects how `predict` combines the stored arrays:
+
+    - "linear": `x @ coef + intercept`
+    - "tree_mean": average of decision trees (DecisionTreeRegressor, RandomForestRegressor)
+    - "tree_boosting": constant + learning_rate * sum of trees (GradientBoostingRegressor)
+    - "tree_median": weighted median of trees (AdaBoostRegressor)
+    - "catboost": the model in CatBoost's native format, scored by catboost itself
+
+    Trees of an ensemble are packed into flat node arrays (children, feature, threshold, value)
+    with one root offset per tree, and are traversed level by level for all trees and rows at
+    once. Loading it needs neither sklearn nor the pickled search objects.
+    """
+    kind: str
+    n_features: int
+    arrays: Dict[str, np.ndarray]
+    params: dict = field(default_factory=dict)
+
+    def predict(self, x) -> np.ndarray:
+        """Predicts a (n_samples, n_features) feature matrix (dense or scipy sparse)."""
+        if self.kind == "catboost":
+            return self._catboost().predict(x)
+
+        x = np.asarray(x.toarray() if hasattr(x, "toarray") else x)
+        if x.ndim != 2 or x.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got shape {x.shape}")
+
+        if self.kind == "linear":
+            coef = self.arrays["coef"]
+            return x.astype(coef.dtype, copy=False) @ coef + self.arrays["intercept"]
+
+        values = self._tree_values(x)
+        if self.kind == "tree_mean":
+            # Same accumulation order as sklearn's forest: add tree by tree, then divide
+            total = np.zeros(x.shape[0], dtype=np.float64)
+            for tree_values in values:
+                total += tree_values
+            total /= len(values)
+            return total
+        if self.kind == "tree_boosting":
+            total = np.full(x.shape[0], self.params["constant"], dtype=np.float64)
+            for tree_values in values:
+                total += self.params["learning_rate"] * tree_values
+            return total
+        if self.kind == "tree_median":
+            return self._weighted_median(values.T, self.arrays["weights"])
+        raise ValueError(f"Unknown portable model kind: {self.kind}")
+
+    def _tree_values(self, x: np.ndarray) -> np.ndarray:
+        """Returns the (n_trees, n_samples) leaf values reached by every row in every tree."""
+        left, right = self.arrays["children_left"], self.arrays["children_right"]
+        feature, threshold, value = self.arrays["feature"], self.arrays["threshold"], self.arrays["value"]
+
+        # sklearn trees compare float32 features against float64 thresholds
+        x = x.astype(np.float32, copy=False)
+        rows = np.arange(x.shape[0])
+        nodes = np.repeat(self.arrays["roots"][:, np.newaxis], x.shape[0], axis=1)
+        while True:
+            internal = left[nodes] != -1
+            if not internal.any():
+                return value[nodes]
+            go_left = x[rows, feature[nodes]] <= threshold[nodes]
+            nodes = np.where(internal, np.where(go_left, left[nodes], right[nodes]), nodes)
+
+    @staticmethod
+    def _weighted_median(predictions: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        """AdaBoostRegressor's weighted median of the per-tree predictions."""
+        sorted_idx = np.argsort(predictions, axis=1)
+        weight_cdf = np.cumsum(weights[sorted_idx], axis=1)
+        median_or_above = weight_cdf >= 0.5 * weight_cdf[:, -1][:, np.newaxis]
+        median_idx = median_or_above.argmax(axis=1)
+        rows = np.arange(predictions.shape[0])
+        return predictions[rows, sorted_idx[rows, median_idx]]
+
+    def _catboost(self):
+        model = getattr(self, "_catboost_model", None)
+        if model is None:
+            from catboost import CatBoost
+
+            model = CatBoost()
+            model.load_model(blob=self.arrays["model"].tobytes())
+            self._catboost_model = model
+        return model
+
+
+def save_portable_model(model: PortableModel, file_path) -> str:
+    """Saves a portable model as a single uncompressed .npz (written atomically)."""
+    os.makedirs(os.path.dirname(str(file_path)), exist_ok=True)
+    header = json.dumps({"kind": model.kind, "n_features": model.n_features, "params": model.params})
+    tmp_path = f"{file_path}.tmp.{os.getpid()}"
+    with open(tmp_path, "wb") as file:
+        np.savez(file, __header__=np.array(header), **model.arrays)
+    os.replace(tmp_path, file_path)
+    return str(file_path)
+
+
+def load_portable_model(file_path, mmap: bool = None) -> PortableModel:
+    """
+    Loads a portable model saved by `save_portable_model`.
+
+    With `mmap` (default: config.ARTIFACT_MMAP), the arrays are memory-mapped read-only straight
+    out of the uncompressed .npz, so every worker process on a host shares one page-cache copy.
+    """
+    if mmap is None:
+        from src.configuration import config
+        mmap = config.ARTIFACT_MMAP
+
+    arrays = _mmap_npz(file_path) if mmap else None
+    if arrays is None:
+        with np.load(file_path, allow_pickle=False) as data:
+            arrays = {name: data[name] for name in data.files}
+
+    header = json.loads(str(arrays.pop("__header__")))
+    return PortableModel(kind=header["kind"], n_features=header["n_features"], arrays=arrays,
+                         params=header["params"])
+
+
+def _mmap_npz(file_path):
+    """
+    Memory-maps every array stored (uncompressed) in an .npz archive.
+
+    Returns None if a member is compressed, so the caller can fall back to a regular load.
+    """
+    arrays = {}
+    with zipfile.ZipFile(file_path) as archive, open(file_path, "rb") as file:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                return None
+            # The member data follows its local header: 30 fixed bytes, then the name and extra field
+            file.seek(info.header_offset + 26)
+            name_length, extra_length = struct.unpack("<HH", file.read(4))
+            file.seek(info.header_offset + 30 + name_length + extra_length)
+
+            version = np.lib.format.read_magic(file)
+            read_header = (np.lib.format.read_array_header_1_0 if version == (1, 0)
+                           else np.lib.format.read_array_header_2_0)
+            shape, fortran_order, dtype = read_header(file)
+            name = info.filename[:-len(".npy")]
+            if dtype.hasobject or 0 in shape or not shape:
+                file.seek(info.header_offset + 30 + name_length + extra_length)
+                arrays[name] = np.lib.format.read_array(file, allow_pickle=False)
+            else:
+                arrays[name] = np.memmap(file_path, dtype=dtype, mode="r", offset=file.tell(), shape=shape,
+                                         order="F" if fortran_order else "C")
+    return arrays
@@ -1,37 +1,274 @@
-import sys
+import threading
+import time
+import numpy as np
 import pandas as pd
-import os
+from dataclasses import dataclass
 from typing import Any, Union
+from src.artifact_cache import ArtifactCache
 from src.exception import CustomException
-from src.utils import load_object
 from src.configuration.predict_config import PredictConfig
 from src.logger import Logger
+from src.metrics import BATCH_SIZE, LOOKUPS, PHASE_LATENCY
+from src.pipelines.micro_batcher import MicroBatcher
+from src.pipelines.portable_model import load_portable_model
+from src.pipelines.prediction_cache import PredictionCache
+from src.pipelines.prediction_table import load_prediction_table
+from src.utils import load_json, manifest_path, metadata_path, model_input
+
+
+@dataclass(frozen=True)
+class ServingArtifacts:
+    """Model and preprocessors published together, so one request never mixes two versions."""
+    model: Any
+    preprocessor: Any
+    compiled_preprocessor: Any  # None when disabled or not exported
+    version: str  # "<model version>:<preprocessor version>"
 
 
 class PredictPipeline:
-    def __init__(self):
-        self.config = PredictConfig()
+    def __init__(self, config: PredictConfig = None):
+        self.config = config or PredictConfig()
         self.logger = Logger.get_logger()
+        # Per-request progress messages, rate limited so they cannot dominate request latency
+        self.request_logger = Logger.get_hot_path_logger()
+        self.artifact_cache = ArtifactCache.get_cache()
+        self.metadata_cache = ArtifactCache(loader=load_json)
+        self.portable_cache = ArtifactCache(loader=load_portable_model)
+        self.table_cache = ArtifactCache(loader=load_prediction_table)
 
-    def predict(self, features: pd.DataFrame) -> Union[pd.Series, Any]:
-        """Loads the trained model and preprocessor, then makes predictions."""
+        self.prediction_cache = None
+        if self.config.prediction_cache_max_entries > 0:
+            self.prediction_cache = PredictionCache(
+                max_entries=self.config.prediction_cache_max_entries,
+                ttl_seconds=self.config.prediction_cache_ttl_seconds,
+            )
+
+        self._artifacts = None
+        self._artifacts_lock = threading.Lock()
+        self._pending_version = None  # Loaded set waiting for the serving manifest (logged once)
+
+        # Single records on the compiled preprocessor path are batched as lists of records
+        self.batcher = None
+        self.record_batcher = None
+        if self.config.micro_batching:
+            self.batcher = MicroBatcher(
+                self.predict_batch,
+                max_batch_size=self.config.micro_batch_max_size,
+                max_wait_ms=self.config.micro_batch_max_wait_ms,
+            )
+            self.record_batcher = MicroBatcher(
+                self._predict_records,
+                max_batch_size=self.config.micro_batch_max_size,
+                max_wait_ms=self.config.micro_batch_max_wait_ms,
+            )
+
+    def load_artifacts(self):
+        """Returns the (model, preprocessor) pair, loaded once per process and reloaded when changed on disk."""
+        artifacts = self.serving_artifacts()
+        return artifacts.model, artifacts.preprocessor
+
+    def serving_artifacts(self) -> ServingArtifacts:
+        """
+        Returns the current model and preprocessors as one set.
+
+        The files are checked (and reloaded when changed) together under one lock and published
+        as one versioned set, so a request that takes its model and preprocessor from one set
+        never pairs a retrained preprocessor with the previous model. When the trainer's serving
+        manifest is present, a new set is published only once the manifest lists the content
+        hashes of its files: while a retrain is still writing them, the previous set keeps serving.
+        """
+        with self._artifacts_lock:
+            try:
+                model_name, model_entry = self._model_entry()
+                preprocessor_entry = self.artifact_cache.get_entry(self.config.preprocessor_path)
+            except FileNotFoundError as e:
+                raise CustomException("Model or preprocessor file not found!", cause=e)
+            compiled_entry = self._compiled_preprocessor_entry()
+            compiled = compiled_entry.obj if compiled_entry is not None else None
+
+            current = self._artifacts
+            if (current is not None and current.model is model_entry.obj
+                    and current.preprocessor is preprocessor_entry.obj and current.compiled_preprocessor is compiled):
+                return current
+
+            mismatched = self._manifest_mismatches(
+                {model_name: model_entry, "preprocessor": preprocessor_entry, "compiled_preprocessor": compiled_entry})
+            version = f"{model_entry.version}:{preprocessor_entry.version}"
+            if mismatched and current is not None:
+                if self._pending_version != version:
+                    self._pending_version = version
+                    self.logger.info(f"Artifacts {mismatched} changed but are not in the serving manifest yet; "
+                                     f"still serving version {current.version}")
+                return current
+            if mismatched:
+                self.logger.warning(f"Artifacts {mismatched} do not match the serving manifest; "
+                                    "loading them anyway, nothing was serving yet.")
+            self._artifacts = ServingArtifacts(model_entry.obj, preprocessor_entry.obj, compiled, version)
+            return self._artifacts
+
+    def predict_record(self, record: dict) -> Union[pd.Series, Any]:
+        """
+        Predicts a single record (dict keyed by CustomData field names).
+
+        In-domain records are looked up in the precomputed prediction table when there is one for
+        the current model. Repeated inputs are answered from the prediction cache, keyed on the
+        normalized record and the model version. Otherwise uses the compiled preprocessor when it
+        has been exported, skipping DataFrame construction and sklearn input validation, or falls
+        back to the regular DataFrame path.
+        """
+        table = self._prediction_table()
+        if table is not None:
+            preds = table.lookup(record)
+            LOOKUPS.inc("table", "miss" if preds is None else "hit")
+            if preds is not None:
+                return preds
+
+        if self.prediction_cache is None:
+            return self._predict_record(record)
+
+        version = self.model_version()
+        key = PredictionCache.make_key(record)
+        preds = self.prediction_cache.get(version, key)
+        LOOKUPS.inc("cache", "miss" if preds is None else "hit")
+        if preds is None:
+            preds = np.asarray(self._predict_record(record))
+            preds.setflags(write=False)  # Shared by every later hit
+            self.prediction_cache.put(version, key, preds)
+        return preds
+
+    def model_version(self) -> str:
+        """Returns the version of the artifacts that score requests (model and preprocessor)."""
+        return self.serving_artifacts().version
+
+    def _predict_record(self, record: dict) -> Union[pd.Series, Any]:
+        if self.serving_artifacts().compiled_preprocessor is None:
+            return self.predict(pd.DataFrame([record]))
+
+        try:
+            if self.record_batcher is not None:
+                return self.record_batcher.predict([record])
+            return self._predict_records([record])
+        except Exception as e:
+            raise CustomException("Prediction failed: ", cause=e)
+
+    def _predict_records(self, records: list) -> Union[pd.Series, Any]:
+        """Scores records with the compiled preprocessor and the model of one artifact set."""
+        artifacts = self.serving_artifacts()
+        if artifacts.compiled_preprocessor is None:
+            return self._score(pd.DataFrame(records))  # Compiled export removed since the check
+
+        BATCH_SIZE.observe(len(records), "model")
+        with PHASE_LATENCY.time("transform"):
+            features = self._as_feature_dtype(artifacts.compiled_preprocessor.transform(records))
+        with PHASE_LATENCY.time("predict"):
+            return artifacts.model.predict(model_input(artifacts.model, features))
+
+    def prewarm(self) -> dict:
+        """
+        Loads every serving artifact and scores the warm-up record through the single-record and
+        batch paths, so the first real request pays for neither loading nor lazy initialization.
+
+        Returns:
+            dict: Seconds spent in each step.
+        """
+        steps = [
+            ("load_artifacts", self.serving_artifacts),
+            ("load_prediction_table", self._prediction_table),
+            ("warm_record_prediction", lambda: self.predict_record(self.config.warmup_record)),
+            ("warm_batch_prediction", lambda: self.predict_batch(pd.DataFrame([self.config.warmup_record]))),
+        ]
+        timings = {}
+        for name, step in steps:
+            start = time.perf_counter()
+            step()
+            timings[name] = round(time.perf_counter() - start, 4)
+        return timings
+
+    def _model_entry(self):
+        """
+        Returns the portable model export when it is enabled and present, otherwise the pickled
+        model, as (name in the serving manifest, cache entry).
+        """
+        if self.config.use_portable_model:
+            try:
+                return "portable_model", self.portable_cache.get_entry(self.config.portable_model_path)
+            except FileNotFoundError:
+                pass
+        return "model", self.artifact_cache.get_entry(self.config.model_path)
+
+    def _as_feature_dtype(self, features):
+        """Casts transformed features to the dtype stamped on the model (its precision mode)."""
         try:
-            if not os.path.exists(self.config.model_path) or not os.path.exists(self.config.preprocessor_path):
-                raise CustomException("Model or preprocessor file not found!")
+            feature_dtype = self.metadata_cache.get(metadata_path(self.config.model_path)).get("feature_dtype")
+        except FileNotFoundError:
+            return features  # Model saved without a precision stamp
+        return features.astype(feature_dtype, copy=False) if feature_dtype else features
 
-            self.logger.info("Loading model and preprocessor...")
-            model = load_object(file_path=self.config.model_path)
-            preprocessor = load_object(file_path=self.config.preprocessor_path)
+    def _prediction_table(self):
+        """Returns the prediction table if it is enabled, present and scored with the current model."""
+        if not self.config.use_prediction_table:
+            return None
+        try:
+            table = self.table_cache.get(self.config.prediction_table_path)
+        except FileNotFoundError:
+            return None
+        return table if table.model_version == self.model_version() else None
 
-            self.logger.info("Transforming input features...")
-            data_scaled = preprocessor.transform(features)
+    def _compiled_preprocessor_entry(self):
+        """Returns the cache entry of the compiled preprocessor, or None when it is disabled or was not exported."""
+        if not self.config.use_compiled_preprocessor:
+            return None
+        try:
+            return self.artifact_cache.get_entry(self.config.compiled_preprocessor_path)
+        except FileNotFoundError:
+            return None
 
-            self.logger.info("Making predictions...")
-            preds = model.predict(data_scaled)
+    def _manifest_mismatches(self, entries: dict) -> list:
+        """Names of the loaded artifacts whose content hash differs from the one listed in the serving manifest."""
+        if not self.artifact_cache.hash_content:
+            return []  # Versions are file signatures, not comparable with the manifest's hashes
+        try:
+            manifest = self.metadata_cache.get(manifest_path(self.config.model_path))
+        except FileNotFoundError:
+            return []  # Artifacts saved without a manifest (e.g. by hand): published as they change
+        return [name for name, entry in entries.items()
+                if entry is not None and name in manifest and manifest[name] != entry.version]
+
+    def predict(self, features: pd.DataFrame) -> Union[pd.Series, Any]:
+        """Makes predictions, coalescing small requests through the micro-batcher when it is enabled."""
+        if self.batcher is not None and len(features) < self.batcher.max_batch_size:
+            return self.batcher.predict(features)
+        return self.predict_batch(features)
+
+    def predict_batch(self, features: pd.DataFrame) -> Union[pd.Series, Any]:
+        """Makes predictions, taking in-domain rows from the prediction table and scoring only the rest."""
+        table = self._prediction_table()
+        if table is None:
+            return self._score(features)
+
+        preds, in_domain = table.lookup_frame(features)
+        hits = int(in_domain.sum())
+        LOOKUPS.inc("table", "hit", amount=hits)
+        LOOKUPS.inc("table", "miss", amount=len(in_domain) - hits)
+        if hits < len(in_domain):
+            preds[~in_domain] = self._score(features[~in_domain])
+        return preds
+
+    def _score(self, features: pd.DataFrame) -> Union[pd.Series, Any]:
+        """Transforms the features with the cached preprocessor, then makes predictions with the cached model."""
+        try:
+            model, preprocessor = self.load_artifacts()
+            BATCH_SIZE.observe(len(features), "model")
+
+            self.request_logger.info("Transforming input features...")
+            with PHASE_LATENCY.time("transform"):
+                data_scaled = self._as_feature_dtype(preprocessor.transform(features))
+
+            self.request_logger.info("Making predictions...")
+            with PHASE_LATENCY.time("predict"):
+                preds = model.predict(model_input(model, data_scaled))
 
             return preds
 
         except Exception as e:
-            self.logger.error(f"Prediction failed: {e}")
             raise CustomException("Prediction failed: ", cause=e)
-
@@ -0,0 +1,90 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import fields
+from typing import Any, Hashable
+
+from src.configuration.predict_config import CustomData
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache of predictions, with an optional time-to-live per entry.
+
+    Keys are the normalized `CustomData` fields of a record, and every lookup carries the
+    version of the model that would score it. When the version changes (the model or
+    preprocessor was replaced on disk) the cache drops everything, so a stale prediction is
+    never served.
+    """
+
+    def __init__(self, max_entries: int = 10_000, ttl_seconds: float = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+        # Metrics
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    @staticmethod
+    def make_key(record: dict) -> tuple:
+        """Normalizes a record into a hashable key: stripped strings and numeric scores."""
+        return tuple(
+            record[field.name].strip() if field.type is str else float(record[field.name])
+            for field in fields(CustomData)
+        )
+
+    def get(self, version: str, key: Hashable) -> Any:
+        """Returns the cached prediction for `key` under model `version`, or None on a miss."""
+        with self._lock:
+            self._check_version(version)
+            item = self._entries.get(key)
+            if item is not None and self.ttl_seconds is not None \
+                    and time.monotonic() - item[1] > self.ttl_seconds:
+                del self._entries[key]
+                item = None
+            if item is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return item[0]
+
+    def put(self, version: str, key: Hashable, value: Any):
+        """Stores the prediction for `key`, evicting the least recently used entry when full."""
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Returns hit/miss counters and the current size."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+            }
+
+    def _check_version(self, version: str):
+        if version != self._version:
+            if self._version is not None:
+                self._entries.clear()
+                self._invalidations += 1
+            self._version = version
@@ -0,0 +1,119 @@
+import json
+import operator
+import os
+from dataclasses import dataclass, field
+from typing import List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.pipelines.portable_model import _mmap_npz
+
+
+@dataclass
+class PredictionTable:
+    """
+    Every prediction of the model over its finite input domain, as one dense array.
+
+    `values` has one axis per categorical column (indexed by position in `categories`) and
+    one per integer score column (indexed by score - score_min), so an in-domain record is
+    answered by a direct index lookup. `model_version` is the `PredictPipeline.model_version()`
+    the table was scored with; serving ignores a table whose stamp no longer matches.
+    """
+    categorical_columns: List[str]
+    categories: List[List[str]]
+    score_columns: List[str]
+    score_range: Tuple[int, int]
+    model_version: str
+    values: np.ndarray
+    _positions: List[dict] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._positions = [{category: i for i, category in enumerate(categories)}
+                           for categories in self.categories]
+
+    def lookup(self, record: Mapping) -> Optional[np.ndarray]:
+        """Returns the (1,) prediction for an in-domain record, or None if it is outside the table."""
+        index = []
+        for column, positions in zip(self.categorical_columns, self._positions):
+            position = positions.get(record.get(column))
+            if position is None:
+                return None
+            index.append(position)
+
+        low, high = self.score_range
+        for column in self.score_columns:
+            value = record.get(column)
+            try:
+                score = operator.index(value)
+            except TypeError:
+                if not (isinstance(value, float) and value.is_integer()):
+                    return None
+                score = int(value)
+            if not low <= score <= high:
+                return None
+            index.append(score - low)
+
+        return np.array([self.values[tuple(index)]])
+
+    def lookup_frame(self, features: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Looks up every row of `features` at once.
+
+        Returns:
+            tuple: (predictions, in_domain mask); predictions of rows outside the domain are arbitrary.
+        """
+        in_domain = np.ones(len(features), dtype=bool)
+        index = []
+        for column, categories in zip(self.categorical_columns, self.categories):
+            codes = pd.Index(categories).get_indexer(features[column])
+            in_domain &= codes >= 0
+            index.append(np.maximum(codes, 0))
+
+        low, high = self.score_range
+        for column in self.score_columns:
+            scores = pd.to_numeric(features[column], errors="coerce").to_numpy(dtype=np.float64)
+            valid = (scores == np.floor(scores)) & (scores >= low) & (scores <= high)  # NaN is never valid
+            in_domain &= valid
+            index.append(np.where(valid, scores - low, 0).astype(np.intp))
+
+        return np.asarray(self.values[tuple(index)]), in_domain
+
+
+def save_prediction_table(table: PredictionTable, file_path) -> str:
+    """Saves a prediction table as a single uncompressed .npz (written atomically)."""
+    os.makedirs(os.path.dirname(str(file_path)), exist_ok=True)
+    header = json.dumps({
+        "categorical_columns": table.categorical_columns,
+        "categories": table.categories,
+        "score_columns": table.score_columns,
+        "score_range": list(table.score_range),
+        "model_version": table.model_version,
+    })
+    tmp_path = f"{file_path}.tmp.{os.getpid()}"
+    with open(tmp_path, "wb") as file:
+        np.savez(file, __header__=np.array(header), values=table.values)
+    os.replace(tmp_path, file_path)
+    return str(file_path)
+
+
+def load_prediction_table(file_path, mmap: bool = None) -> PredictionTable:
+    """Loads a prediction table, memory-mapping the values read-only (default: config.ARTIFACT_MMAP)."""
+    if mmap is None:
+        from src.configuration import config
+        mmap = config.ARTIFACT_MMAP
+
+    arrays = _mmap_npz(file_path) if mmap else None
+    if arrays is None:
+        with np.load(file_path, allow_pickle=False) as data:
+            arrays = {name: data[name] for name in data.files}
+
+    header = json.loads(str(arrays["__header__"]))
+    return PredictionTable(
+        categorical_columns=header["categorical_columns"],
+        categories=header["categories"],
+        score_columns=header["score_columns"],
+        score_range=tuple(header["score_range"]),
+        model_version=header["model_version"],
+        values=arrays["values"],
+    )
@@ -0,0 +1,41 @@
+import os
+import sys
+import time
+
+from src.configuration import config
+from src.logger import Logger
+from src.utils import save_json
+
+
+# Initialize the custom logger
+logger = Logger.get_logger()
+
+# Modules only training needs; the startup report flags any that serving imported anyway
+TRAINING_ONLY_MODULES = ("catboost", "xgboost", "matplotlib", "seaborn", "sklearn.model_selection")
+
+
+def prewarm_and_report(predict_pipeline, import_seconds: float, report_path=None) -> dict:
+    """
+    Warms the prediction pipeline before the worker accepts traffic and writes a startup report
+    (to `report_path`, by default config.STARTUP_REPORT_FILE).
+
+    A failed warm-up (e.g. no trained model yet) is logged and recorded in the report; the
+    worker still starts and loads artifacts lazily on the first request.
+
+    Returns:
+        dict: Import and warm-up timings, plus any training-only modules that were imported.
+    """
+    start = time.perf_counter()
+    report = {"pid": os.getpid(), "import_seconds": round(import_seconds, 4)}
+    try:
+        report["prewarm"] = predict_pipeline.prewarm()
+    except Exception as e:
+        logger.warning(f"Serving warm-up failed, artifacts will load on the first request: {e}")
+        report["prewarm_error"] = str(e)
+    report["prewarm_seconds"] = round(time.perf_counter() - start, 4)
+    report["total_seconds"] = round(import_seconds + report["prewarm_seconds"], 4)
+    report["training_only_modules_loaded"] = [name for name in TRAINING_ONLY_MODULES if name in sys.modules]
+
+    logger.info(f"Serving startup: {report}")
+    save_json(config.STARTUP_REPORT_FILE if report_path is None else report_path, report)
+    return report
@@ -2,38 +2,187 @@ from src.exception import CustomException
 from src.logger import Logger
 from src.components.data_ingestion import DataIngestion
 from src.components.data_transformation import DataTransformation
+from src.components.incremental_trainer import IncrementalTrainer
+from src.components.model_exporter import ModelExporter
 from src.components.model_trainer import ModelTrainer
+from src.components.prediction_table_builder import PredictionTableBuilder
+from src.components.preprocessor_compiler import PreprocessorCompiler
+from src.configuration import config
+from src.instrumentation import RunInstrumentation, stage
+from src.stage_cache import StageCache
+from src.utils import frame_path, manifest_path, metadata_path, save_json
+
+# Arrays passed from the transformation stage to training
+SPLIT_ARRAYS = ("x_train", "y_train", "x_test", "y_test")
 
 
 class TrainPipeline:
     def __init__(self):
         self.logger = Logger.get_logger()
+        self.stage_cache = StageCache()
 
     def run_pipeline(self):
-        """Executes the full training pipeline: Data Ingestion → Transformation → Model Training."""
+        """
+        Executes the full training pipeline: Data Ingestion → Transformation → Model Training → Compilation →
+        Export → Manifest (→ optional Prediction Table).
+
+        Each stage is keyed by a hash of its inputs and config (chained through the keys of the
+        stages before it); a stage whose key is already in the stage cache is restored, not rerun.
+
+        With `config.TRAIN_MODE = "incremental"`, rows appended to the dataset since the last run
+        update the previous model instead (see IncrementalTrainer); the full pipeline runs only when
+        that is not possible, and then records the state the next incremental run starts from.
+
+        Every stage is measured (wall and CPU time, peak RSS, rows/fits per second) and the run
+        report is written to `config.TRAIN_RUN_REPORT_FILE`, also when the run fails.
+        """
+        instrumentation = RunInstrumentation()
         try:
             self.logger.info("Starting Training Pipeline...")
+            with instrumentation.activate():
+                r2_score = self._run_incremental() if config.TRAIN_MODE == "incremental" else None
+                if r2_score is None:
+                    r2_score = self._run_stages()
+                    if config.TRAIN_MODE == "incremental":
+                        with stage("incremental_state"):
+                            IncrementalTrainer().record_state(r2_score)
+
+            self.logger.info(f"Training Pipeline Completed. Final R² Score: {r2_score:.4f}")
+            return r2_score
+
+        except Exception as e:
+            raise CustomException("Training Pipeline execution failed!", cause=e)
 
-            # Step 1: Data Ingestion
-            self.logger.info("Running Data Ingestion...")
+        finally:
+            instrumentation.save(config.TRAIN_RUN_REPORT_FILE)
+
+    def _run_incremental(self):
+        """Updates the model with the appended rows; returns its R², or None when a full retrain is needed."""
+        incremental_trainer = IncrementalTrainer()
+        with stage("incremental") as record:
+            report, x_test = incremental_trainer.initiate_incremental_training()
+            record["mode"] = report["mode"]
+
+        if report["mode"] == "full":
+            self.logger.info(f"Incremental training not possible ({report['reason']}), running full training...")
+            return None
+        if report["mode"] == "incremental":
+            self._build_serving_artifacts(
+                incremental_trainer.data_transformation_config.preprocessor_obj_file_path,
+                frame_path(incremental_trainer.ingestion_config.test_data_path),
+                incremental_trainer.model_trainer_config.trained_model_file_path, x_test)
+        return report["r2_score"]
+
+    def _run_stages(self):
+        # Step 1: Data Ingestion
+        with stage("ingestion") as record:
             data_ingestion = DataIngestion()
-            train_path, test_path = data_ingestion.initiate_data_ingestion()
+            ingestion_config = data_ingestion.ingestion_config
+            ingestion_outputs = {
+                "train": frame_path(ingestion_config.train_data_path),
+                "test": frame_path(ingestion_config.test_data_path),
+                "raw": frame_path(ingestion_config.raw_data_path),
+            }
+            ingestion_key = StageCache.make_key(
+                "ingestion",
+                dataset=StageCache.file_hash(ingestion_config.dataset_file),
+                test_size=config.TEST_SIZE,
+                random_state=config.SPLIT_RANDOM_STATE,
+                intermediate_format=config.INTERMEDIATE_FORMAT,
+                streaming=(config.INGESTION_STREAMING, config.INGESTION_ROW_KEY),
+                schema=config.DATASET_DTYPES,
+            )
+            cached = self.stage_cache.restore("ingestion", ingestion_key, files=ingestion_outputs)
+            record["cached"] = cached is not None
+            if cached is not None:
+                self.logger.info("Data Ingestion unchanged, reusing cached splits.")
+                train_path, test_path = ingestion_outputs["train"], ingestion_outputs["test"]
+            else:
+                self.logger.info("Running Data Ingestion...")
+                train_path, test_path = data_ingestion.initiate_data_ingestion()
+                self.stage_cache.store("ingestion", ingestion_key, files=ingestion_outputs)
 
-            # Step 2: Data Transformation
-            self.logger.info("Running Data Transformation...")
+        # Step 2: Data Transformation
+        with stage("transformation") as record:
             data_transformation = DataTransformation()
-            train_array, test_array, _ = data_transformation.initiate_data_transformation(train_path, test_path)
+            preprocessor_path = data_transformation.data_transformation_config.preprocessor_obj_file_path
+            transformation_key = StageCache.make_key(
+                "transformation",
+                ingestion=ingestion_key,
+                transformer=StageCache.make_key("transformer", obj=data_transformation.get_data_transformer_object()),
+                feature_dtype=config.FEATURE_DTYPE,
+            )
+            transformation_outputs = {
+                "preprocessor": preprocessor_path,
+                "preprocessor_metadata": metadata_path(preprocessor_path),
+            }
+            cached = self.stage_cache.restore("transformation", transformation_key, files=transformation_outputs)
+            record["cached"] = cached is not None
+            if cached is not None:
+                self.logger.info("Data Transformation unchanged, reusing cached preprocessor and arrays.")
+                x_train, y_train, x_test, y_test = (cached.arrays[name] for name in SPLIT_ARRAYS)
+            else:
+                self.logger.info("Running Data Transformation...")
+                x_train, y_train, x_test, y_test, preprocessor_path = \
+                    data_transformation.initiate_split_transformation(train_path, test_path)
+                self.stage_cache.store("transformation", transformation_key, files=transformation_outputs,
+                                       arrays=dict(zip(SPLIT_ARRAYS, (x_train, y_train, x_test, y_test))))
 
-            # Step 3: Model Training
-            self.logger.info("Running Model Training...")
+        # Step 3: Model Training
+        with stage("training", rows=x_train.shape[0]) as record:
             model_trainer = ModelTrainer()
-            r2_score = model_trainer.initiate_model_trainer(train_array=train_array, test_array=test_array)
+            trainer_config = model_trainer.model_trainer_config
+            training_outputs = {
+                "model": trainer_config.trained_model_file_path,
+                "model_metadata": metadata_path(trainer_config.trained_model_file_path),
+                "report": trainer_config.report_file_path,
+            }
+            training_key = StageCache.make_key(
+                "training",
+                transformation=transformation_key,
+                models=StageCache.make_key("models", obj=model_trainer.models),
+                params=model_trainer.model_config,
+                search_strategy=model_trainer.search_strategy,
+                halving=(config.HALVING_RESOURCE, config.HALVING_FACTOR, config.HALVING_RANDOM_STATE),
+                tournament=(model_trainer.tournament_mode, config.TOURNAMENT_MARGIN,
+                            config.TOURNAMENT_PROBE_CANDIDATES, config.TOURNAMENT_RANDOM_STATE),
+            )
+            cached = self.stage_cache.restore("training", training_key, files=training_outputs)
+            record["cached"] = cached is not None
+            if cached is not None:
+                self.logger.info("Model Training unchanged, reusing cached model.")
+                r2_score = cached.metadata["r2_score"]
+            else:
+                self.logger.info("Running Model Training...")
+                r2_score = model_trainer.train_models(x_train, y_train, x_test, y_test)
+                self.stage_cache.store("training", training_key, files=training_outputs,
+                                       metadata={"r2_score": r2_score})
 
-            self.logger.info(f"Training Pipeline Completed. Final R² Score: {r2_score:.4f}")
+        self._build_serving_artifacts(preprocessor_path, test_path, trainer_config.trained_model_file_path, x_test)
+        return r2_score
 
-        except Exception as e:
-            self.logger.error(f"Training Pipeline failed: {str(e)}")
-            raise CustomException("Training Pipeline execution failed!", cause=e)
+    def _build_serving_artifacts(self, preprocessor_path, test_path, model_path, x_test):
+        # Step 4: Compiled preprocessor for the single-record serving fast path
+        with stage("compilation"):
+            self.logger.info("Running Preprocessor Compilation...")
+            compiled_path = PreprocessorCompiler().initiate_preprocessor_compilation(preprocessor_path, test_path)
+
+        # Step 5: Portable model export for serving
+        with stage("export"):
+            self.logger.info("Running Model Export...")
+            portable_path = ModelExporter().initiate_model_export(model_path, x_test)
+
+        # Step 6: Serving manifest, written last: servers switch to the new artifacts once it lists them
+        artifacts = {"model": model_path, "portable_model": portable_path,
+                     "preprocessor": preprocessor_path, "compiled_preprocessor": compiled_path}
+        save_json(manifest_path(model_path),
+                  {name: StageCache.file_hash(path) for name, path in artifacts.items() if path is not None})
+
+        # Step 7: Optional precomputed prediction table for the finite input domain
+        if config.PREDICTION_TABLE:
+            with stage("prediction_table"):
+                self.logger.info("Running Prediction Table build...")
+                PredictionTableBuilder().initiate_prediction_table(model_path, preprocessor_path)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+import numpy as np
+from scipy import sparse
+from joblib import hash as joblib_hash
+
+from src.configuration import config
+from src.logger import Logger
+
+
+# Initialize the custom logger
+logger = Logger.get_logger()
+
+
+@dataclass
+class CachedStage:
+    """Outputs of a pipeline stage restored from the stage cache."""
+    key: str
+    arrays: Dict[str, np.ndarray] = field(default_factory=dict)  # Dense arrays or scipy sparse matrices
+    metadata: dict = field(default_factory=dict)
+
+
+class StageCache:
+    """
+    Content-addressed store of pipeline stage outputs.
+
+    A stage's key is a hash of everything that determines its output (input file bytes, config
+    values, estimator definitions and the keys of upstream stages). When a stage runs with a key
+    that is already stored, its output files are copied back into place and it is skipped.
+    """
+
+    def __init__(self, cache_dir=config.STAGE_CACHE_DIR, enabled: bool = config.STAGE_CACHE_ENABLED,
+                 max_entries_per_stage: int = config.STAGE_CACHE_MAX_ENTRIES_PER_STAGE):
+        self.cache_dir = str(cache_dir)
+        self.enabled = enabled
+        self.max_entries_per_stage = max_entries_per_stage
+
+    @staticmethod
+    def make_key(stage: str, **inputs) -> str:
+        """Hashes the stage name and all of its inputs into a cache key."""
+        return joblib_hash((stage, sorted(inputs.items())), hash_name="sha1")
+
+    @staticmethod
+    def file_hash(file_path, chunk_size: int = 1 << 20) -> str:
+        """Returns the SHA-256 of a file's bytes."""
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as file:
+            for chunk in iter(lambda: file.read(chunk_size), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def restore(self, stage: str, key: str, files: Dict[str, str] = None) -> Optional[CachedStage]:
+        """
+        Copies a stored stage's files to their destinations and loads its arrays.
+
+        Args:
+            files (dict): Output name -> destination path.
+
+        Returns:
+            CachedStage or None: None on a cache miss (or when the cache is disabled).
+        """
+        if not self.enabled:
+            return None
+
+        entry_dir = self._entry_dir(stage, key)
+        manifest_path = os.path.join(entry_dir, "manifest.json")
+        if not os.path.exists(manifest_path):
+            return None
+
+        with open(manifest_path) as manifest_file:
+            manifest = json.load(manifest_file)
+        if set(files or {}) - set(manifest["files"]):
+            return None
+
+        for name, destination in (files or {}).items():
+            os.makedirs(os.path.dirname(str(destination)), exist_ok=True)
+            tmp_path = f"{destination}.tmp.{os.getpid()}"
+            self._copy(os.path.join(entry_dir, manifest["files"][name]), tmp_path)
+            if os.path.isdir(destination):
+                shutil.rmtree(destination)
+            os.replace(tmp_path, destination)
+
+        arrays = {name: self._load_array(os.path.join(entry_dir, name)) for name in manifest["arrays"]}
+        os.utime(manifest_path)  # Mark as recently used
+        logger.info(f"Stage cache hit: {stage} ({key[:12]})")
+        return CachedStage(key=key, arrays=arrays, metadata=manifest["metadata"])
+
+    def store(self, stage: str, key: str, files: Dict[str, str] = None, arrays: Dict[str, np.ndarray] = None,
+              metadata: dict = None):
+        """Stores a stage's output files, arrays and metadata under its key."""
+        if not self.enabled:
+            return
+
+        entry_dir = self._entry_dir(stage, key)
+        tmp_dir = f"{entry_dir}.tmp.{os.getpid()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        stored_files = {}
+        for name, source in (files or {}).items():
+            stored_files[name] = f"{name}{os.path.splitext(str(source))[1]}"
+            self._copy(source, os.path.join(tmp_dir, stored_files[name]))
+        for name, array in (arrays or {}).items():
+            if sparse.issparse(array):
+                sparse.save_npz(os.path.join(tmp_dir, f"{name}.npz"), array, compressed=False)
+            else:
+                np.save(os.path.join(tmp_dir, f"{name}.npy"), array)
+
+        with open(os.path.join(tmp_dir, "manifest.json"), "w") as manifest_file:
+            json.dump({
+                "stage": stage,
+                "key": key,
+                "created_at": time.time(),
+                "files": stored_files,
+                "arrays": sorted(arrays or {}),
+                "metadata": metadata or {},
+            }, manifest_file, indent=2, default=str)
+
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        os.replace(tmp_dir, entry_dir)
+        logger.info(f"Stage cache stored: {stage} ({key[:12]})")
+        self._prune(stage)
+
+    @staticmethod
+    def _load_array(path_prefix):
+        """Loads a stored dense (.npy) or sparse (.npz) array."""
+        if os.path.exists(f"{path_prefix}.npz"):
+            return sparse.load_npz(f"{path_prefix}.npz").tocsr()
+        return np.load(f"{path_prefix}.npy")
+
+    @staticmethod
+    def _copy(source, destination):
+        """Copies a file, or a directory output such as an npy intermediate."""
+        if os.path.isdir(source):
+            shutil.rmtree(destination, ignore_errors=True)
+            shutil.copytree(source, destination)
+        else:
+            shutil.copyfile(source, destination)
+
+    def _entry_dir(self, stage: str, key: str) -> str:
+        return os.path.join(self.cache_dir, stage, key)
+
+    def _prune(self, stage: str):
+        """Keeps only the most recently used entries of a stage."""
+        stage_dir = os.path.join(self.cache_dir, stage)
+        entries = [
+            os.path.join(stage_dir, name) for name in os.listdir(stage_dir)
+            if os.path.exists(os.path.join(stage_dir, name, "manifest.json"))
+        ]
+        entries.sort(key=lambda entry: os.path.getmtime(os.path.join(entry, "manifest.json")), reverse=True)
+        for entry in entries[self.max_entries_per_stage:]:
+            shutil.rmtree(entry, ignore_errors=True)
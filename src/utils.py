@@ -1,8 +1,10 @@
+import json
 import os
+import shutil
 import joblib
-from sklearn.exceptions import NotFittedError
-from sklearn.metrics import r2_score
-from sklearn.model_selection import GridSearchCV
+import numpy as np
+import pandas as pd
+from src.configuration import config
 from src.exception import CustomException
 from src.logger import Logger
 
@@ -11,35 +13,391 @@ from src.logger import Logger
 logger = Logger.get_logger()
 
 
-def save_object(file_path, obj):
-    """Saves an object using joblib (optimized for ML models)."""
+def metadata_path(file_path):
+    """Path of the JSON metadata stamped next to a saved artifact."""
+    return f"{file_path}.meta.json"
+
+
+def manifest_path(model_path):
+    """Path of the serving manifest, written next to the model once every serving artifact is saved."""
+    return f"{model_path}.manifest.json"
+
+
+def save_object(file_path, obj, metadata=None):
+    """
+    Saves an object using joblib (optimized for ML models).
+
+    `metadata` (e.g. the feature dtype the artifact expects) is stamped next to it in
+    `<file_path>.meta.json`.
+    """
     try:
         os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        joblib.dump(obj, file_path)
+        if metadata is not None:
+            save_json(metadata_path(file_path), metadata)
+        # Write to a temporary file and rename, so readers never see a half-written artifact
+        tmp_path = f"{file_path}.tmp.{os.getpid()}"
+        joblib.dump(obj, tmp_path)
+        os.replace(tmp_path, file_path)
         logger.info(f"Object saved successfully at: {file_path}")
     except Exception as e:
-        logger.error(f"Error saving object: {str(e)}")
         raise CustomException("Failed to save object!", cause=e)
 
 
-def load_object(file_path):
-    """Loads an object using joblib."""
+def save_json(file_path, data):
+    """Saves a JSON-serializable report (non-serializable values are written as strings)."""
+    try:
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        tmp_path = f"{file_path}.tmp.{os.getpid()}"
+        with open(tmp_path, "w") as file:
+            json.dump(data, file, indent=2, default=str)
+        os.replace(tmp_path, file_path)
+        logger.info(f"Report saved successfully at: {file_path}")
+    except Exception as e:
+        raise CustomException("Failed to save report!", cause=e)
+
+
+FRAME_SUFFIXES = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather", "npy": ".npy"}
+
+# Estimator classes whose sparse support could not be read from their tags (logged once each)
+_UNKNOWN_SPARSE_SUPPORT = set()
+
+
+def frame_path(file_path, file_format=None):
+    """Returns `file_path` with the suffix of the given intermediate format (default: config.INTERMEDIATE_FORMAT)."""
+    suffix = FRAME_SUFFIXES[file_format or config.INTERMEDIATE_FORMAT]
+    return os.path.splitext(str(file_path))[0] + suffix
+
+
+def apply_schema(df, dtypes=None):
+    """Casts the columns listed in the schema (default: config.DATASET_DTYPES) to their explicit dtypes."""
+    dtypes = config.DATASET_DTYPES if dtypes is None else dtypes
+    return df.astype({column: dtype for column, dtype in dtypes.items() if column in df.columns})
+
+
+def save_frame(df, file_path, file_format=None):
+    """
+    Saves a DataFrame in the configured intermediate format and returns the path written.
+
+    "csv" writes a plain CSV; "parquet" and "feather" keep dtypes (categoricals as dictionary
+    codes); "npy" writes a directory with one .npy file per column (categoricals as integer codes)
+    plus a schema.json, which `load_frame` can memory-map.
+    """
+    file_format = file_format or config.INTERMEDIATE_FORMAT
+    file_path = frame_path(file_path, file_format)
+    try:
+        if file_format == "csv":
+            df.to_csv(file_path, index=False, header=True)
+        elif file_format == "parquet":
+            df.to_parquet(file_path, index=False)
+        elif file_format == "feather":
+            df.reset_index(drop=True).to_feather(file_path)
+        elif file_format == "npy":
+            tmp_dir = f"{file_path}.tmp.{os.getpid()}"
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            os.makedirs(tmp_dir)
+            schema = {"columns": list(df.columns), "categories": {}}
+            for column in df.columns:
+                values = df[column]
+                if isinstance(values.dtype, pd.CategoricalDtype):
+                    schema["categories"][column] = values.cat.categories.tolist()
+                    values = values.cat.codes
+                np.save(os.path.join(tmp_dir, f"{column}.npy"), values.to_numpy())
+            with open(os.path.join(tmp_dir, "schema.json"), "w") as file:
+                json.dump(schema, file)
+            shutil.rmtree(file_path, ignore_errors=True)
+            os.replace(tmp_dir, file_path)
+        else:
+            raise ValueError(f"Unknown intermediate format: {file_format}")
+        return file_path
+    except Exception as e:
+        raise CustomException("Failed to save frame!", cause=e)
+
+
+class FrameWriter:
+    """
+    Writes a DataFrame chunk by chunk in an intermediate format, without holding it in memory.
+
+    Used as a context manager; the file only appears at `file_path` once the writer closes
+    cleanly. Categoricals are written as strings for csv/parquet/feather (restored by the schema
+    in `load_frame`) and as integer codes over a growing category list for npy.
+    """
+
+    def __init__(self, file_path, file_format=None):
+        self.file_format = file_format or config.INTERMEDIATE_FORMAT
+        self.file_path = frame_path(file_path, self.file_format)
+        self.tmp_path = f"{self.file_path}.tmp.{os.getpid()}"
+        self.rows = 0
+        self._writer = None
+        self._schema = None
+        self._columns = {}
+        self._categories = {}
+
+    def __enter__(self):
+        shutil.rmtree(self.tmp_path, ignore_errors=True)
+        if self.file_format == "npy":
+            os.makedirs(self.tmp_path)
+        elif self.file_format not in FRAME_SUFFIXES:
+            raise ValueError(f"Unknown intermediate format: {self.file_format}")
+        return self
+
+    def write(self, chunk):
+        if self.file_format == "csv":
+            if self._writer is None:
+                self._writer = open(self.tmp_path, "w", newline="")
+            chunk.to_csv(self._writer, index=False, header=self.rows == 0)
+        elif self.file_format == "npy":
+            self._write_npy(chunk)
+        else:
+            self._write_arrow(chunk)
+        self.rows += len(chunk)
+
+    def _write_arrow(self, chunk):
+        import pyarrow as pa
+
+        categorical = [column for column in chunk.columns if isinstance(chunk[column].dtype, pd.CategoricalDtype)]
+        table = pa.Table.from_pandas(chunk.astype({column: str for column in categorical}), preserve_index=False)
+        if self._writer is None:
+            self._schema = table.schema.remove_metadata()
+            if self.file_format == "parquet":
+                import pyarrow.parquet as pq
+                self._writer = pq.ParquetWriter(self.tmp_path, self._schema)
+            else:
+                self._writer = pa.ipc.new_file(self.tmp_path, self._schema)
+        self._writer.write_table(table.cast(self._schema))
+
+    def _write_npy(self, chunk):
+        for column in chunk.columns:
+            values = chunk[column]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                known = self._categories.setdefault(column, [])
+                known.extend(category for category in values.cat.categories if category not in known)
+                values = values.cat.set_categories(known).cat.codes
+            values = values.to_numpy()
+            # Chunks are appended to a raw segment file in their own dtype, and a new segment starts
+            # whenever it changes (codes past int8 as the categories grow, ints that became float
+            # because a chunk has NaN); `_finish_npy` widens all segments to their common type
+            segments = self._columns.setdefault(column, [])
+            if not segments or segments[-1][1] != values.dtype:
+                if segments:
+                    segments[-1][0].close()
+                raw_path = os.path.join(self.tmp_path, f"{column}.{len(segments)}.bin")
+                segments.append([open(raw_path, "wb"), values.dtype, 0])
+            values.tofile(segments[-1][0])
+            segments[-1][2] += len(values)
+
+    def _finish_npy(self):
+        """Turns each column's raw segment files into a .npy without loading them into memory."""
+        for column, segments in self._columns.items():
+            dtype = np.result_type(*(segment_dtype for _, segment_dtype, _ in segments))
+            array = np.lib.format.open_memmap(os.path.join(self.tmp_path, f"{column}.npy"), mode="w+",
+                                              dtype=dtype, shape=(self.rows,))
+            start = 0
+            for file, segment_dtype, rows in segments:
+                file.close()
+                if rows:
+                    array[start:start + rows] = np.memmap(file.name, dtype=segment_dtype, mode="r", shape=(rows,))
+                start += rows
+                os.remove(file.name)
+            array.flush()
+            del array
+        with open(os.path.join(self.tmp_path, "schema.json"), "w") as file:
+            json.dump({"columns": list(self._columns), "categories": self._categories}, file)
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None and self.rows == 0:
+            exc_type = ValueError
+        if self.file_format == "npy":
+            if exc_type is None:
+                self._finish_npy()
+            else:
+                for segments in self._columns.values():
+                    for file, _, _ in segments:
+                        file.close()
+        elif self._writer is not None:
+            self._writer.close()
+
+        if exc_type is not None:
+            if os.path.isdir(self.tmp_path):
+                shutil.rmtree(self.tmp_path)
+            elif os.path.exists(self.tmp_path):
+                os.remove(self.tmp_path)
+            if exc is None:
+                raise ValueError(f"No rows written to {self.file_path}")
+            return False
+
+        shutil.rmtree(self.file_path, ignore_errors=True)
+        os.replace(self.tmp_path, self.file_path)
+        return False
+
+
+def load_frame(file_path, mmap=None):
+    """Loads a DataFrame written by `save_frame`; the format is taken from the file suffix."""
+    mmap = config.INTERMEDIATE_MMAP if mmap is None else mmap
+    file_path = str(file_path)
     try:
-        obj = joblib.load(file_path)
+        if file_path.endswith(".parquet"):
+            return apply_schema(pd.read_parquet(file_path, memory_map=mmap))
+        if file_path.endswith(".feather"):
+            import pyarrow.feather as feather
+            return apply_schema(feather.read_table(file_path, memory_map=mmap).to_pandas())
+        if file_path.endswith(".npy"):
+            with open(os.path.join(file_path, "schema.json")) as file:
+                schema = json.load(file)
+            columns = {}
+            for column in schema["columns"]:
+                values = np.load(os.path.join(file_path, f"{column}.npy"), mmap_mode="r" if mmap else None,
+                                 allow_pickle=not mmap)
+                if column in schema["categories"]:
+                    values = pd.Categorical.from_codes(values, categories=schema["categories"][column])
+                columns[column] = values
+            return pd.DataFrame(columns, copy=False)
+        # CSV: pandas infers types, then the explicit schema is applied
+        return apply_schema(pd.read_csv(file_path))
+    except Exception as e:
+        raise CustomException("Failed to load frame!", cause=e)
+
+
+def load_json(file_path):
+    """Loads a JSON file (reports, artifact metadata)."""
+    with open(file_path) as file:
+        return json.load(file)
+
+
+def load_object(file_path, mmap_mode=None):
+    """
+    Loads an object using joblib.
+
+    With `mmap_mode` (e.g. "r"), NumPy arrays inside the file are memory-mapped instead of
+    copied, so processes loading the same file share one page-cache copy of them.
+    """
+    try:
+        obj = joblib.load(file_path, mmap_mode=mmap_mode)
         logger.info(f"Object loaded successfully from: {file_path}")
         return obj
     except Exception as e:
-        logger.error(f"Error loading object from {file_path}: {str(e)}")
         raise CustomException("Object load failed!", cause=e)
 
 
-def evaluate_models(x_train, y_train, x_test, y_test, models, param_grid):
+def accepts_sparse(estimator) -> bool:
+    """
+    Whether an estimator can fit and predict on scipy sparse input, from its sklearn tags:
+    `get_tags` on scikit-learn >= 1.6, the `X_types` of `_get_tags()` / `_more_tags()` before.
+    Estimators whose tags cannot be read are treated as dense-only (logged once per class).
+    """
+    try:
+        from sklearn.utils import get_tags
+        return bool(get_tags(estimator).input_tags.sparse)
+    except (ImportError, AttributeError):
+        pass
+
+    for tags_method in ("_get_tags", "_more_tags"):
+        try:
+            x_types = getattr(estimator, tags_method)()["X_types"]
+        except (AttributeError, KeyError):
+            continue
+        return "sparse" in x_types
+
+    estimator_class = type(estimator).__name__
+    if estimator_class not in _UNKNOWN_SPARSE_SUPPORT:
+        _UNKNOWN_SPARSE_SUPPORT.add(estimator_class)
+        logger.warning(f"Cannot tell whether {estimator_class} accepts sparse input; densifying its input.")
+    return False
+
+
+def model_input(estimator, x):
+    """Returns `x`, densified if it is sparse and the estimator does not accept sparse input."""
+    if hasattr(x, "toarray") and not accepts_sparse(estimator):
+        return x.toarray()
+    return x
+
+
+def _grid_search(model_name, model, params, x_train, y_train, cv):
+    """Runs GridSearchCV for one model; returns (search object, best estimator, best params, budget) or None."""
+    from sklearn.model_selection import GridSearchCV
+    logger.info(f"Training model: {model_name}")
+
+    # Hyperparameter tuning
+    gs = GridSearchCV(model, params, cv=cv, scoring='r2', n_jobs=-1, verbose=1)
+
+    gs.fit(x_train, y_train)
+
+    # Ensure GridSearchCV returned a valid model
+    if not hasattr(gs, "best_estimator_") or gs.best_estimator_ is None:
+        logger.warning(f"GridSearchCV failed to find a valid model for {model_name}. Skipping...")
+        return None
+
+    n_candidates = len(gs.cv_results_["params"])
+    budget = {"strategy": "grid", "candidates": n_candidates, "fits": n_candidates * cv}
+    return gs, gs.best_estimator_, gs.best_params_, budget
+
+
+def _halving_search(model_name, model, params, x_train, y_train, cv):
+    """
+    Runs successive halving for one model; returns (search object, best estimator, best params, budget) or None.
+
+    With `config.HALVING_RESOURCE = "estimators"`, models that have an estimator-count parameter
+    (n_estimators / iterations) are budgeted by that parameter: its grid values are replaced by a
+    halving schedule whose last iteration trains the survivors at the grid's largest value. Other
+    models (and "n_samples") are budgeted by the number of training samples.
+    """
+    from sklearn.base import clone
+    from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+    from sklearn.model_selection import HalvingGridSearchCV, ParameterGrid
+    from src.components.search_scheduler import COST_PARAMS
+
+    logger.info(f"Training model (successive halving): {model_name}")
+
+    full_grid, params = params, dict(params)
+    resource, max_resources = "n_samples", "auto"
+    if config.HALVING_RESOURCE == "estimators":
+        resource_param = next((name for name in COST_PARAMS if name in params), None)
+        if resource_param is not None:
+            resource, max_resources = resource_param, max(params.pop(resource_param))
+            # Estimators such as CatBoost only expose parameters that were set explicitly
+            model = clone(model).set_params(**{resource_param: max_resources})
+
+    hs = HalvingGridSearchCV(
+        model, params, factor=config.HALVING_FACTOR, resource=resource, min_resources="exhaust",
+        max_resources=max_resources, cv=cv, scoring='r2', n_jobs=-1, random_state=config.HALVING_RANDOM_STATE,
+    )
+    hs.fit(x_train, y_train)
+
+    if not hasattr(hs, "best_estimator_") or hs.best_estimator_ is None:
+        logger.warning(f"HalvingGridSearchCV failed to find a valid model for {model_name}. Skipping...")
+        return None
+
+    exhaustive_candidates = len(ParameterGrid(full_grid))
+    budget = {
+        "strategy": "halving",
+        "resource": resource,
+        "factor": config.HALVING_FACTOR,
+        "iterations": int(hs.n_iterations_),
+        "candidates_per_iteration": [int(n) for n in hs.n_candidates_],
+        "resources_per_iteration": [int(n) for n in hs.n_resources_],
+        "fits": int(sum(hs.n_candidates_)) * cv,
+        "exhaustive_fits": exhaustive_candidates * cv,
+    }
+    logger.info(f"{model_name}: {budget['fits']} fits instead of {budget['exhaustive_fits']} "
+                f"({budget['iterations']} halving iterations over {resource}).")
+    return hs, hs.best_estimator_, hs.best_params_, budget
+
+
+def evaluate_models(x_train, y_train, x_test, y_test, models, param_grid, search_strategy=None):
     """
-    Trains multiple models using GridSearchCV, selects the best hyperparameters,
+    Trains multiple models with a hyperparameter search, selects the best hyperparameters,
     and evaluates their performance.
 
-    Returns a dictionary with model names and their R² scores.
+    `search_strategy` is "grid" (one GridSearchCV per model), "pooled" (all fits of all
+    models in one shared, resumable pool) or "halving" (successive halving that drops weak
+    candidates early); it defaults to `config.SEARCH_STRATEGY`.
+
+    Returns a dictionary with model names, their R² scores, best parameters and search budget.
     """
+    # Training-only imports are deferred so serving (which imports this module) starts faster
+    from sklearn.exceptions import NotFittedError
+    from sklearn.metrics import r2_score
+    from src.instrumentation import stage
+
     try:
         # Check if training data is valid
         if x_train is None or y_train is None or x_test is None or y_test is None:
@@ -48,25 +406,42 @@ def evaluate_models(x_train, y_train, x_test, y_test, models, param_grid):
         if x_train.shape[0] == 0 or y_train.shape[0] == 0:
             raise CustomException("Training data is empty. Check data preprocessing!")
 
+        search_strategy = search_strategy or config.SEARCH_STRATEGY
+        if search_strategy not in ("grid", "pooled", "halving"):
+            raise CustomException(f"Unknown search strategy: {search_strategy}")
+
         report = {}
+        cv = min(3, x_train.shape[0])
 
-        for model_name, model in models.items():
-            logger.info(f"Training model: {model_name}")
+        if search_strategy == "pooled":
+            from src.components.search_scheduler import SearchScheduler
 
-            # Hyperparameter tuning
-            gs = GridSearchCV(
-                model, param_grid.get(model_name, {}), cv=min(3, len(x_train)), scoring='r2', n_jobs=-1, verbose=1
-            )
+            scheduler = SearchScheduler(journal_path=config.SEARCH_JOURNAL_FILE, cv=cv)
+            with stage("search/pooled", rows=x_train.shape[0]) as record:
+                pooled = scheduler.run(x_train, y_train, models, param_grid)
+                searched = {
+                    model_name: (result["model"], result["model"], result["best_params"],
+                                 {"strategy": "pooled", "candidates": result["fits"] // cv, "fits": result["fits"]})
+                    for model_name, result in pooled.items()
+                }
+                record["fits"] = sum(budget["fits"] for *_, budget in searched.values())
+                # The fits of all families interleave in one pool: per-family fit time and fits/s
+                record["models"] = {model_name: result["timing"] for model_name, result in pooled.items()}
 
-            gs.fit(x_train, y_train)
+        search = _halving_search if search_strategy == "halving" else _grid_search
+        for model_name, model in models.items():
+            model_x_train, model_x_test = model_input(model, x_train), model_input(model, x_test)
+            if search_strategy == "pooled":
+                result = searched.get(model_name)
+            else:
+                with stage(f"search/{model_name}", rows=model_x_train.shape[0]) as record:
+                    result = search(model_name, model, param_grid.get(model_name, {}), model_x_train, y_train, cv)
+                    if result is not None:
+                        record["fits"] = result[3]["fits"]
 
-            # Ensure GridSearchCV returned a valid model
-            if not hasattr(gs, "best_estimator_") or gs.best_estimator_ is None:
-                logger.warning(f"GridSearchCV failed to find a valid model for {model_name}. Skipping...")
+            if result is None:
                 continue
-
-            best_model = gs.best_estimator_
-            best_params = gs.best_params_
+            fitted, best_model, best_params, budget = result
 
             logger.info(f"{model_name} Best Params: {best_params}")
 
@@ -76,14 +451,16 @@ def evaluate_models(x_train, y_train, x_test, y_test, models, param_grid):
                     raise NotFittedError(f"{model_name} model is not fitted yet!")
 
                 # Predictions
-                y_train_pred = best_model.predict(x_train)
-                y_test_pred = best_model.predict(x_test)
+                y_train_pred = best_model.predict(model_x_train)
+                y_test_pred = best_model.predict(model_x_test)
 
                 # Model evaluation
                 train_score = r2_score(y_train, y_train_pred)
                 test_score = r2_score(y_test, y_test_pred)
 
-                report[model_name] = {'score': test_score, 'model': gs}
+                report[model_name] = {
+                    'score': test_score, 'model': fitted, 'best_params': best_params, 'search': budget
+                }
 
                 logger.info(f"{model_name}: Train R² = {train_score:.4f}, Test R² = {test_score:.4f}")
 
@@ -100,5 +477,4 @@ def evaluate_models(x_train, y_train, x_test, y_test, models, param_grid):
         return report
 
     except Exception as e:
-        logger.error(f"Error in evaluating models: {str(e)}")
         raise CustomException("Model evaluation failed!", cause=e)
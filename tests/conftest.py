@@ -0,0 +1,30 @@
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from src.configuration import config
+from src.metrics import registry
+
+# Runtime outputs of the serving code go to a temporary directory for the whole session, from
+# before the test modules are imported (importing app prewarms the pipeline and records metrics)
+ARTIFACTS_DIR = tempfile.mkdtemp(prefix="test_artifacts_")
+_patches = [
+    patch.object(config, "METRICS_DIR", os.path.join(ARTIFACTS_DIR, "metrics")),
+    patch.object(config, "STARTUP_REPORT_FILE", os.path.join(ARTIFACTS_DIR, "startup_report.json")),
+]
+
+
+def pytest_configure():
+    for patcher in _patches:
+        patcher.start()
+    # `registry.directory` follows METRICS_DIR
+    assert registry.directory == config.METRICS_DIR
+
+
+def pytest_unconfigure():
+    # Nothing is left for the exit-time flush to write once the paths are restored
+    registry.clear()
+    for patcher in reversed(_patches):
+        patcher.stop()
+    shutil.rmtree(ARTIFACTS_DIR, ignore_errors=True)
@@ -0,0 +1,121 @@
+import json
+import os
+import numpy as np
+import pytest
+from unittest.mock import MagicMock, patch
+import app as app_module
+from src.configuration.predict_config import PredictConfig
+from src.pipelines.predict_pipeline import PredictPipeline
+from src.pipelines.serving_startup import prewarm_and_report
+
+
+@pytest.fixture
+def client():
+    """Flask test client for the prediction app."""
+    app_module.app.config["TESTING"] = True
+    with app_module.app.test_client() as client:
+        yield client
+
+
+@pytest.fixture
+def record():
+    """A single valid prediction record."""
+    return {
+        "gender": "female",
+        "race_ethnicity": "group B",
+        "parental_level_of_education": "bachelor's degree",
+        "lunch": "standard",
+        "test_preparation_course": "none",
+        "reading_score": 72,
+        "writing_score": 74,
+    }
+
+
+@patch.object(app_module.predict_pipeline, "predict")
+def test_predict_batch_single_vectorized_call(mock_predict, client, record):
+    """The whole batch is scored with one predict call."""
+    mock_predict.return_value = np.array([70.0, 71.0, 72.0])
+
+    response = client.post("/predict/batch", json={"records": [record, record, record]})
+
+    assert response.status_code == 200
+    assert response.get_json() == {"predictions": [70.0, 71.0, 72.0], "count": 3}
+    mock_predict.assert_called_once()
+    batch_df = mock_predict.call_args[0][0]
+    assert len(batch_df) == 3
+    assert list(batch_df.columns)[0] == "gender"
+
+
+@patch.object(app_module.predict_pipeline, "predict")
+def test_predict_batch_reports_all_invalid_records(mock_predict, client, record):
+    """Validation errors for every bad record are returned together and nothing is scored."""
+    bad_score = dict(record, reading_score=150)
+    missing_field = {k: v for k, v in record.items() if k != "lunch"}
+
+    response = client.post("/predict/batch", json=[record, bad_score, missing_field])
+
+    assert response.status_code == 400
+    details = response.get_json()["details"]
+    assert "record 1: 'reading_score' must be between 0 and 100" in details
+    assert "record 2: missing 'lunch'" in details
+    mock_predict.assert_not_called()
+
+
+def test_predict_batch_rejects_oversized_batch(client, record):
+    """Batches above the configured limit are rejected."""
+    limit = app_module.predict_pipeline.config.max_batch_records
+    response = client.post("/predict/batch", json=[record] * (limit + 1))
+    assert response.status_code == 413
+
+
+def test_predict_batch_rejects_non_json(client):
+    """A body that is not a JSON list of records is a validation error."""
+    response = client.post("/predict/batch", data="gender=male")
+    assert response.status_code == 400
+
+
+@patch.object(app_module.predict_pipeline, "predict")
+def test_metrics_endpoint_reports_requests_and_phases(mock_predict, client, record, tmpdir, monkeypatch):
+    """/metrics exposes request counters, per-phase latency and batch sizes in the Prometheus text format."""
+    monkeypatch.setattr(app_module.registry, "directory", str(tmpdir))
+    mock_predict.return_value = np.array([70.0, 71.0])
+    client.post("/predict/batch", json=[record, record])
+    client.post("/predict/batch", json=[dict(record, lunch="")])
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    text = response.get_data(as_text=True)
+    assert 'prediction_http_requests_total{endpoint="predict_batch",status="200"}' in text
+    assert 'prediction_errors_total{endpoint="predict_batch",kind="validation"}' in text
+    for phase in ("parse", "validate", "build_frame", "render"):
+        assert f'prediction_phase_duration_seconds_count{{phase="{phase}"}}' in text
+    assert 'prediction_batch_size_bucket{stage="request",le="2"}' in text
+    assert 'prediction_request_duration_seconds_bucket{endpoint="predict_batch",le="+Inf"}' in text
+
+
+def test_startup_report_records_prewarm_timings(tmpdir):
+    """Warm-up timings and import time are written to the startup report."""
+    pipeline = MagicMock()
+    pipeline.prewarm.return_value = {"load_model": 0.01, "warm_record_prediction": 0.002}
+    report_path = os.path.join(tmpdir, "startup_report.json")
+
+    report = prewarm_and_report(pipeline, import_seconds=0.5, report_path=report_path)
+
+    with open(report_path) as f:
+        assert json.load(f) == report
+    assert report["prewarm"]["load_model"] == 0.01
+    assert report["total_seconds"] >= 0.5
+    assert "prewarm_error" not in report
+
+
+def test_failed_prewarm_does_not_block_startup(tmpdir):
+    """Missing artifacts are reported, and the worker falls back to loading on the first request."""
+    pipeline = PredictPipeline(PredictConfig(model_path=os.path.join(tmpdir, "missing_model.pkl"),
+                                             preprocessor_path=os.path.join(tmpdir, "missing_preprocessor.pkl")))
+
+    report = prewarm_and_report(pipeline, import_seconds=0.1, report_path=os.path.join(tmpdir, "report.json"))
+
+    assert "missing_model.pkl" in report["prewarm_error"]
+    assert "prewarm" not in report
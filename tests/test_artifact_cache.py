@@ -0,0 +1,119 @@
+import os
+import threading
+import numpy as np
+import pytest
+from unittest.mock import MagicMock, patch
+from src.artifact_cache import ArtifactCache
+from src.utils import save_object, load_object
+
+
+@pytest.fixture
+def artifact_path(tmpdir):
+    """Saves a small artifact and returns its path."""
+    file_path = os.path.join(tmpdir, "model.pkl")
+    save_object(file_path, {"version": 1})
+    return file_path
+
+
+def test_artifact_loaded_once(artifact_path):
+    """Repeated lookups of an unchanged file reuse the loaded object."""
+    loader = MagicMock(side_effect=load_object)
+    cache = ArtifactCache(loader=loader, check_interval=0)
+
+    first = cache.get(artifact_path)
+    second = cache.get(artifact_path)
+
+    assert first is second
+    assert first == {"version": 1}
+    loader.assert_called_once_with(artifact_path)
+
+
+def test_artifact_reloaded_when_changed(artifact_path):
+    """A changed file is reloaded and gets a new version."""
+    cache = ArtifactCache(check_interval=0)
+    old_obj = cache.get(artifact_path)
+    old_version = cache.version(artifact_path)
+
+    save_object(artifact_path, {"version": 2})
+
+    assert cache.get(artifact_path) == {"version": 2}
+    assert cache.version(artifact_path) != old_version
+    assert old_obj == {"version": 1}  # In-flight holders keep the old object
+
+
+def test_identical_rewrite_does_not_reload(artifact_path):
+    """Rewriting identical bytes only refreshes the file signature."""
+    loader = MagicMock(side_effect=load_object)
+    cache = ArtifactCache(loader=loader, check_interval=0)
+    cache.get(artifact_path)
+
+    with open(artifact_path, "rb") as f:
+        content = f.read()
+    os.remove(artifact_path)
+    with open(artifact_path, "wb") as f:
+        f.write(content)
+
+    cache.get(artifact_path)
+    loader.assert_called_once()
+
+
+def test_failed_reload_keeps_previous_object(artifact_path):
+    """A corrupt replacement does not drop the object being served."""
+    cache = ArtifactCache(check_interval=0)
+    cache.get(artifact_path)
+
+    with open(artifact_path, "wb") as f:
+        f.write(b"not a pickle")
+
+    assert cache.get(artifact_path) == {"version": 1}
+
+
+def test_failed_reload_is_retried_only_after_the_file_changes(artifact_path):
+    """A corrupt file is not hashed and unpickled again on every request."""
+    loader = MagicMock(side_effect=load_object)
+    cache = ArtifactCache(loader=loader, check_interval=0)
+    cache.get(artifact_path)
+    with open(artifact_path, "wb") as f:
+        f.write(b"not a pickle")
+
+    for _ in range(3):
+        assert cache.get(artifact_path) == {"version": 1}
+    assert loader.call_count == 2
+
+    save_object(artifact_path, {"version": 2})
+    assert cache.get(artifact_path) == {"version": 2}
+    assert loader.call_count == 3
+
+
+def test_concurrent_first_load_loads_once(artifact_path):
+    """Threads racing on a cold cache trigger a single load."""
+    loader = MagicMock(side_effect=load_object)
+    cache = ArtifactCache(loader=loader, check_interval=0)
+
+    threads = [threading.Thread(target=cache.get, args=(artifact_path,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    loader.assert_called_once()
+
+
+def test_missing_artifact_raises(tmpdir):
+    """A missing artifact that was never loaded raises FileNotFoundError."""
+    cache = ArtifactCache(check_interval=0)
+    with pytest.raises(FileNotFoundError):
+        cache.get(os.path.join(tmpdir, "missing.pkl"))
+
+
+def test_default_loader_memory_maps_arrays(tmpdir):
+    """Arrays in cached artifacts are memory-mapped read-only, so worker processes share them."""
+    file_path = os.path.join(tmpdir, "arrays.pkl")
+    save_object(file_path, {"coef": np.arange(100_000, dtype=np.float64)})
+
+    with patch("src.artifact_cache.config.ARTIFACT_MMAP", True):
+        coef = ArtifactCache(check_interval=0).get(file_path)["coef"]
+
+    assert isinstance(coef, np.memmap)
+    assert not coef.flags.writeable
+    np.testing.assert_array_equal(coef, np.arange(100_000, dtype=np.float64))
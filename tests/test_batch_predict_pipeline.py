@@ -0,0 +1,94 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import patch
+from sklearn.linear_model import LinearRegression
+from src.components.data_transformation import DataTransformation
+from src.configuration import config
+from src.configuration.predict_config import BatchPredictConfig, PredictConfig
+from src.exception import CustomException
+from src.pipelines.batch_predict_pipeline import BatchPredictPipeline, FEATURE_COLUMNS
+from src.utils import save_object
+
+
+@pytest.fixture
+def trained_artifacts(tmpdir):
+    """Fits a small preprocessor + model on the raw dataset and saves them to a temp directory."""
+    df = pd.read_csv(config.DATASET_FILE)
+    preprocessor = DataTransformation().get_data_transformer_object()
+    x = preprocessor.fit_transform(df[FEATURE_COLUMNS])
+    model = LinearRegression().fit(x, df["math_score"])
+
+    predict_config = PredictConfig(
+        model_path=os.path.join(tmpdir, "model.pkl"),
+        preprocessor_path=os.path.join(tmpdir, "preprocessor.pkl"),
+    )
+    save_object(predict_config.model_path, model)
+    save_object(predict_config.preprocessor_path, preprocessor)
+
+    input_path = os.path.join(tmpdir, "input.csv")
+    df.to_csv(input_path, index=False)
+    expected = model.predict(preprocessor.transform(df[FEATURE_COLUMNS]))
+    return predict_config, input_path, expected
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_batch_scoring_matches_direct_prediction(tmpdir, trained_artifacts, workers):
+    """Chunked scoring (in-process or with workers) yields the same predictions in input order."""
+    predict_config, input_path, expected = trained_artifacts
+    output_path = os.path.join(tmpdir, f"scored_{workers}.csv")
+
+    pipeline = BatchPredictPipeline(BatchPredictConfig(chunk_size=128, workers=workers), predict_config)
+    report = pipeline.run(input_path, output_path)
+
+    scored = pd.read_csv(output_path)
+    assert report["rows"] == len(expected)
+    assert report["chunks"] == int(np.ceil(len(expected) / 128))
+    np.testing.assert_allclose(scored["math_score_prediction"], expected)
+
+
+def test_batch_scoring_parquet_round_trip(tmpdir, trained_artifacts):
+    """Parquet input and output are streamed the same way as CSV."""
+    pytest.importorskip("pyarrow")
+    predict_config, input_path, expected = trained_artifacts
+    parquet_input = os.path.join(tmpdir, "input.parquet")
+    pd.read_csv(input_path).to_parquet(parquet_input, index=False)
+    output_path = os.path.join(tmpdir, "scored.parquet")
+
+    BatchPredictPipeline(BatchPredictConfig(chunk_size=300), predict_config).run(parquet_input, output_path)
+
+    np.testing.assert_allclose(pd.read_parquet(output_path)["math_score_prediction"], expected)
+
+
+def test_batch_scoring_parquet_keeps_schema_when_dtypes_change(tmpdir, trained_artifacts):
+    """A later chunk whose int column turns float (missing value) is written with the file's schema."""
+    pytest.importorskip("pyarrow")
+    predict_config, input_path, _ = trained_artifacts
+    df = pd.read_csv(input_path)
+    first, second = df.iloc[:300].copy(), df.iloc[300:].copy()
+    second["reading_score"] = second["reading_score"].astype(float)
+    second.iloc[-1, second.columns.get_loc("reading_score")] = np.nan
+    output_path = os.path.join(tmpdir, "scored.parquet")
+
+    pipeline = BatchPredictPipeline(BatchPredictConfig(chunk_size=300), predict_config)
+    with patch.object(pipeline, "_read_chunks", return_value=iter([first, second])):
+        report = pipeline.run(input_path, output_path)
+
+    scored = pd.read_parquet(output_path)
+    assert report["chunks"] == 2
+    assert len(scored) == len(df)
+    assert scored["reading_score"].isna().sum() == 1
+    np.testing.assert_array_equal(scored["reading_score"].iloc[:-1], df["reading_score"].iloc[:-1])
+
+
+def test_batch_scoring_missing_columns(tmpdir, trained_artifacts):
+    """Inputs without the feature columns are rejected."""
+    predict_config, _, _ = trained_artifacts
+    input_path = os.path.join(tmpdir, "bad.csv")
+    pd.DataFrame({"A": [1, 2]}).to_csv(input_path, index=False)
+
+    with pytest.raises(CustomException) as excinfo:
+        BatchPredictPipeline(predict_config=predict_config).run(input_path, os.path.join(tmpdir, "out.csv"))
+
+    assert "missing feature columns" in str(excinfo.value)
@@ -0,0 +1,59 @@
+import pandas as pd
+from benchmarks.__main__ import main
+from benchmarks.harness import compare_results, save_results
+from benchmarks.suite import PREDICT_BATCH_SIZES, run_suite
+from benchmarks.synthetic_data import generate_dataset
+from src import metrics
+from src.configuration import config
+
+
+def test_synthetic_data_matches_source_schema():
+    """Generated rows keep the source columns and categories, with integer scores in 0-100."""
+    source = pd.read_csv(config.DATASET_FILE)
+    df = generate_dataset(5000, seed=1, source=source)
+
+    assert list(df.columns) == list(source.columns)
+    assert len(df) == 5000
+    for column in ("gender", "race_ethnicity", "parental_level_of_education", "lunch", "test_preparation_course"):
+        assert set(df[column]) <= set(source[column])
+    for column in ("math_score", "reading_score", "writing_score"):
+        assert df[column].between(0, 100).all()
+        assert df[column].dtype == "int64"
+    pd.testing.assert_frame_equal(df, generate_dataset(5000, seed=1, source=source))
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    baseline = {"results": {"a": {"median_s": 1.0}, "b": {"median_s": 1.0}, "c": {"median_s": 1.0},
+                            "gone": {"median_s": 1.0}}}
+    current = {"results": {"a": {"median_s": 1.05}, "b": {"median_s": 1.5}, "c": {"median_s": 0.5},
+                           "new": {"median_s": 1.0}}}
+
+    statuses = {row["name"]: row["status"] for row in compare_results(baseline, current, threshold=0.10)}
+    assert statuses == {"a": "ok", "b": "regression", "c": "improvement", "gone": "removed", "new": "added"}
+
+    overridden = compare_results(baseline, current, threshold=0.10, thresholds={"b": 0.60})
+    assert {row["name"]: row["status"] for row in overridden}["b"] == "ok"
+
+
+def test_compare_command_exit_status(tmpdir):
+    baseline = save_results(str(tmpdir / "baseline.json"), {"predict/batch_1": {"median_s": 0.010}}, meta={})
+    current = save_results(str(tmpdir / "current.json"), {"predict/batch_1": {"median_s": 0.013}}, meta={})
+
+    assert main(["compare", baseline, current, "--threshold", "0.10"]) == 1
+    assert main(["compare", baseline, current, "--threshold-for", "predict/batch_1=0.5"]) == 0
+
+
+def test_serving_benchmarks_run_on_a_small_dataset(tmpdir):
+    """The serving benchmarks run end to end and write nothing outside the work directory."""
+    metrics_dir, startup_report = config.METRICS_DIR, config.STARTUP_REPORT_FILE
+    results = run_suite(rows=600, repeat=1, only=["load_object", "predict", "flask"], workdir=str(tmpdir))
+
+    expected = {f"predict/batch_{size}" for size in PREDICT_BATCH_SIZES} | {"predict/record",
+                                                                           "load_object/preprocessor",
+                                                                           "load_object/model",
+                                                                           "flask/predictdata"}
+    assert set(results) == expected
+    assert results["predict/batch_100"]["items"] == 100
+    assert all(result["median_s"] > 0 for result in results.values())
+    assert (config.METRICS_DIR, config.STARTUP_REPORT_FILE) == (metrics_dir, startup_report)
+    assert metrics.registry.snapshot() == {}
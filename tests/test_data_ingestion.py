@@ -1,9 +1,12 @@
+import json
 import os
+import numpy as np
 import pytest
 import pandas as pd
 from unittest.mock import patch, MagicMock
 from src.components.data_ingestion import DataIngestion
 from src.exception import CustomException
+from src.utils import FrameWriter, apply_schema, load_frame, save_frame
 
 
 @pytest.fixture
@@ -15,6 +18,7 @@ def mock_config(tmpdir):
         train_data_path = os.path.join(tmpdir, "train.csv")
         test_data_path = os.path.join(tmpdir, "test.csv")
         raw_data_path = os.path.join(tmpdir, "raw.csv")
+        report_file_path = os.path.join(tmpdir, "ingestion_report.json")
 
     return MockConfig()
 
@@ -81,3 +85,83 @@ def test_data_ingestion_mocked(mock_config_class, mock_to_csv, mock_makedirs, mo
     mock_makedirs.assert_called_once()  # Ensure directory is created
     # Mock the config class and return the object
 
+
+@pytest.mark.parametrize("file_format", ["csv", "parquet", "feather", "npy"])
+@pytest.mark.parametrize("mmap", [False, True])
+def test_intermediate_format_round_trip(tmpdir, file_format, mmap):
+    """Every intermediate format reloads the same values and dtypes, with categoricals as categories."""
+    df = apply_schema(pd.DataFrame({
+        "gender": ["male", "female", "female"],
+        "lunch": ["standard", "free/reduced", "standard"],
+        "math_score": [72, 69, 90],
+    }))
+
+    path = save_frame(df, os.path.join(tmpdir, "train.csv"), file_format=file_format)
+    loaded = load_frame(path, mmap=mmap)
+
+    assert path.endswith(f".{file_format}")
+    assert isinstance(loaded["gender"].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(loaded.copy(deep=True), df, check_categorical=False)
+
+
+def test_npy_writer_widens_dtypes_across_chunks(tmpdir):
+    """Category codes outgrowing int8 and ints turning float in a later chunk keep their values."""
+    chunks = [
+        pd.DataFrame({"group": pd.Categorical(["a", "b"]), "score": [1, 2]}),
+        pd.DataFrame({"group": pd.Categorical([f"c{i}" for i in range(200)]), "score": [3.5] + [np.nan] * 199}),
+    ]
+    with FrameWriter(os.path.join(tmpdir, "train.csv"), file_format="npy") as writer:
+        for chunk in chunks:
+            writer.write(chunk)
+
+    loaded = load_frame(writer.file_path)
+
+    assert list(loaded["group"].astype(str)) == ["a", "b"] + [f"c{i}" for i in range(200)]
+    np.testing.assert_array_equal(loaded["score"].to_numpy()[:3], [1.0, 2.0, 3.5])
+    assert loaded["score"].isna().sum() == 199
+
+
+@patch("src.components.data_ingestion.config.INTERMEDIATE_FORMAT", "npy")
+@patch("src.components.data_ingestion.config.EXPORT_CSV", True)
+def test_data_ingestion_writes_configured_format(mock_config):
+    """Splits are written in the configured format, with CSV copies when EXPORT_CSV is set."""
+    data_ingestion = DataIngestion()
+    data_ingestion.ingestion_config = mock_config
+    pd.DataFrame({"gender": ["male", "female"] * 5, "math_score": range(10)}).to_csv(mock_config.dataset_file,
+                                                                                   index=False)
+
+    train_path, test_path = data_ingestion.initiate_data_ingestion()
+
+    assert train_path.endswith("train.npy") and os.path.isdir(train_path)
+    assert os.path.exists(mock_config.train_data_path)  # CSV export
+    assert len(load_frame(train_path)) == 8
+    assert load_frame(test_path)["gender"].dtype == "category"
+
+
+@pytest.mark.parametrize("file_format", ["csv", "parquet", "feather", "npy"])
+def test_streaming_ingestion_is_deterministic_and_chunk_independent(mock_config, file_format):
+    """Streaming assigns each row by its hash: the split does not depend on the chunk size."""
+    data_ingestion = DataIngestion()
+    data_ingestion.ingestion_config = mock_config
+    df = pd.DataFrame({"gender": ["male", "female", "female", "male"] * 50, "math_score": range(200)})
+    df.to_csv(mock_config.dataset_file, index=False)
+
+    splits = []
+    with patch("src.components.data_ingestion.config.INGESTION_STREAMING", True), \
+            patch("src.components.data_ingestion.config.INTERMEDIATE_FORMAT", file_format):
+        for chunk_size in [7, 1000]:
+            with patch("src.components.data_ingestion.config.INGESTION_CHUNK_SIZE", chunk_size):
+                train_path, test_path = data_ingestion.initiate_data_ingestion()
+            splits.append((load_frame(train_path), load_frame(test_path)))
+
+    (train_a, test_a), (train_b, test_b) = splits
+    assert train_a["math_score"].tolist() == train_b["math_score"].tolist()
+    assert test_a["math_score"].tolist() == test_b["math_score"].tolist()
+    assert sorted(train_a["math_score"].tolist() + test_a["math_score"].tolist()) == list(range(200))
+    assert 20 <= len(test_a) <= 60  # About TEST_SIZE of the rows
+    assert isinstance(train_a["gender"].dtype, pd.CategoricalDtype)
+
+    with open(mock_config.report_file_path) as f:
+        report = json.load(f)
+    assert report["rows"] == 200 and report["train_rows"] + report["test_rows"] == 200
+    assert report["chunks"] == 1
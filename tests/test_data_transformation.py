@@ -24,7 +24,7 @@ def mock_data():
     return train_data, test_data
 
 
-@patch("src.components.data_transformation.pd.read_csv")
+@patch("src.utils.pd.read_csv")  # Read through load_frame
 @patch("src.components.data_transformation.save_object")
 @patch("src.components.data_transformation.DataTransformation.get_data_transformer_object")
 @patch("src.components.data_transformation.os.path.exists")
@@ -65,3 +65,27 @@ def test_data_transformation(mock_exists, mock_get_data_transformer_object, mock
     mock_exists.assert_any_call("/tmp/mock_train.csv")   # Verify that os.path.exists was called
     mock_exists.assert_any_call("/tmp/mock_test.csv")
 
+
+@pytest.mark.parametrize("layout, feature_dtype", [("sparse", "float64"), ("dense", "float32")])
+def test_split_transformation_keeps_target_separate(tmpdir, mock_data, layout, feature_dtype):
+    """The split output has the same values as the packed arrays, in the configured layout and dtype."""
+    from scipy import sparse
+
+    train_data, test_data = mock_data
+    train_path, test_path = str(tmpdir / "train.csv"), str(tmpdir / "test.csv")
+    train_data.to_csv(train_path, index=False)
+    test_data.to_csv(test_path, index=False)
+
+    data_transformation = DataTransformation()
+    data_transformation.data_transformation_config.preprocessor_obj_file_path = str(tmpdir / "preprocessor.pkl")
+    with patch("src.components.data_transformation.config.FEATURE_LAYOUT", layout), \
+            patch("src.components.data_transformation.config.FEATURE_DTYPE", feature_dtype):
+        x_train, y_train, x_test, y_test, _ = data_transformation.initiate_split_transformation(train_path, test_path)
+    train_arr, test_arr, _ = data_transformation.initiate_data_transformation(train_path, test_path)
+
+    assert sparse.issparse(x_train) == (layout == "sparse")
+    assert x_train.dtype == np.dtype(feature_dtype)
+    dense_x_train = x_train.toarray() if sparse.issparse(x_train) else x_train
+    np.testing.assert_allclose(dense_x_train, train_arr[:, :-1], rtol=1e-6)
+    np.testing.assert_array_equal(y_train, train_arr[:, -1])
+    np.testing.assert_array_equal(y_test, test_arr[:, -1])
@@ -0,0 +1,92 @@
+import gc
+import logging
+import os
+import traceback
+import pytest
+from unittest.mock import patch
+from src.configuration import config
+from src.configuration.predict_config import CustomData, PredictConfig
+from src.exception import CustomException, ValidationError
+from src.logger import Logger
+from src.pipelines.predict_pipeline import PredictPipeline
+
+
+def raise_chain():
+    """Raises a failure wrapped twice, as a loader inside a pipeline would."""
+    try:
+        try:
+            1 / 0
+        except Exception as e:
+            raise CustomException("Error loading object", cause=e)
+    except Exception as e:
+        raise CustomException("Prediction failed", cause=e)
+
+
+@patch("src.exception.logger")
+def test_chain_logs_root_cause_once(mock_logger):
+    with pytest.raises(CustomException) as excinfo:
+        raise_chain()
+
+    mock_logger.error.assert_called_once()
+    message = str(excinfo.value)
+    assert message.startswith("[CustomException] Error in ")
+    assert "Prediction failed" in message
+    assert "ZeroDivisionError: division by zero" in message
+
+
+@patch("src.exception.logger")
+def test_message_is_formatted_only_when_rendered(mock_logger):
+    with patch("src.exception.traceback.format_exception", wraps=traceback.format_exception) as fmt:
+        with pytest.raises(CustomException) as excinfo:
+            raise_chain()
+        assert fmt.call_count == 0  # Logged lazily with "%s", the mock logger never renders it
+
+        first = str(excinfo.value)
+        assert str(excinfo.value) is first  # Formatted once, then cached
+    assert CustomException.get_last_error() == first
+
+
+def test_last_error_does_not_keep_the_exception_alive():
+    try:
+        raise_chain()
+    except CustomException:
+        pass
+    gc.collect()
+    assert CustomException.get_last_error() is None
+
+
+def test_failed_prediction_logs_one_error(tmpdir):
+    """Wrappers re-raise without logging; only the exception wrapping the root cause logs it."""
+    records = []
+    handler = logging.Handler(logging.ERROR)
+    handler.emit = records.append
+    logger = Logger.get_logger()
+    logger.addHandler(handler)
+    try:
+        pipeline = PredictPipeline(PredictConfig(model_path=os.path.join(tmpdir, "missing_model.pkl"),
+                                                 preprocessor_path=os.path.join(tmpdir, "missing.pkl")))
+        with pytest.raises(CustomException):
+            pipeline.predict(CustomData.records_to_dataframe([config.PREDICT_WARMUP_RECORD]))
+    finally:
+        logger.removeHandler(handler)
+    assert len(records) == 1
+
+
+@patch("src.exception.logger")
+def test_eager_mode_formats_and_logs_every_wrap(mock_logger):
+    with patch("src.exception.config.EXCEPTION_LAZY", False):
+        with pytest.raises(CustomException) as excinfo:
+            raise_chain()
+    assert mock_logger.error.call_count == 2
+    assert "ZeroDivisionError: division by zero" in str(excinfo.value)
+
+
+@patch("src.exception.logger")
+def test_validation_error_is_not_logged(mock_logger):
+    with pytest.raises(ValidationError) as excinfo:
+        CustomData.from_form({"gender": "female", "reading_score": "abc"})
+
+    mock_logger.error.assert_not_called()
+    assert "'reading_score' must be a number" in excinfo.value.details
+    assert "'lunch' must be a non-empty string" in excinfo.value.details
+    assert str(excinfo.value).startswith("Invalid input.")
@@ -0,0 +1,161 @@
+import os
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+import pytest
+from catboost import CatBoostRegressor
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.metrics import r2_score
+
+from src.components.data_ingestion import DataIngestion
+from src.components.data_transformation import DataTransformation
+from src.components.incremental_trainer import IncrementalTrainer, column_stats, continue_training, merge_stats
+from src.configuration import config
+from src.utils import load_frame, load_json, load_object, model_input, save_object
+
+BASE_ROWS = 600
+
+
+@pytest.fixture
+def source():
+    return pd.read_csv(config.DATASET_FILE)
+
+
+@pytest.fixture
+def trainer(tmpdir, source):
+    """An IncrementalTrainer whose artifacts live in tmpdir, after a full run on the first BASE_ROWS rows."""
+    dataset = os.path.join(tmpdir, "dataset.csv")
+    source.iloc[:BASE_ROWS].to_csv(dataset, index=False)
+
+    ingestion = DataIngestion()
+    ingestion.ingestion_config.dataset_file = dataset
+    for name in ("raw", "train", "test"):
+        setattr(ingestion.ingestion_config, f"{name}_data_path", os.path.join(tmpdir, f"{name}.csv"))
+    ingestion.ingestion_config.report_file_path = os.path.join(tmpdir, "ingestion_report.json")
+    train_path, test_path = ingestion.initiate_data_ingestion()
+
+    transformation = DataTransformation()
+    transformation.data_transformation_config.preprocessor_obj_file_path = os.path.join(tmpdir, "preprocessor.pkl")
+    x_train, y_train, x_test, y_test, _ = transformation.initiate_split_transformation(train_path, test_path)
+
+    model_path = os.path.join(tmpdir, "model.pkl")
+    model = GradientBoostingRegressor(n_estimators=20, random_state=0)
+    model.fit(model_input(model, x_train), y_train)
+    save_object(model_path, model)
+
+    trainer = IncrementalTrainer()
+    trainer.ingestion_config = ingestion.ingestion_config
+    trainer.data_transformation_config = transformation.data_transformation_config
+    trainer.model_trainer_config.trained_model_file_path = model_path
+    trainer.incremental_config.state_file_path = os.path.join(tmpdir, "incremental_state.json")
+    trainer.incremental_config.report_file_path = os.path.join(tmpdir, "incremental_report.json")
+    trainer.record_state(float(r2_score(y_test, model.predict(model_input(model, x_test)))))
+    return trainer
+
+
+def append(dataset, rows):
+    rows.to_csv(dataset, mode="a", header=False, index=False)
+
+
+def test_merged_stats_equal_stats_of_all_rows(source):
+    merged = merge_stats(column_stats(source.iloc[:300]), column_stats(source.iloc[300:]))
+    expected = column_stats(source)
+
+    assert merged["reading_score"]["mean"] == pytest.approx(expected["reading_score"]["mean"])
+    assert merged["reading_score"]["m2"] == pytest.approx(expected["reading_score"]["m2"])
+    assert merged["reading_score"]["values"] == expected["reading_score"]["values"]
+    assert merged["gender"] == expected["gender"]
+
+
+def test_appended_rows_continue_model_on_frozen_preprocessor(trainer, source):
+    """Appended rows are split and the model adds trees; its fitted trees predict the same rows as before."""
+    dataset = trainer.ingestion_config.dataset_file
+    preprocessor_path = trainer.data_transformation_config.preprocessor_obj_file_path
+    model_path = trainer.model_trainer_config.trained_model_file_path
+    features = source.drop(columns=["math_score"]).iloc[:BASE_ROWS + 200]
+    before = load_object(model_path).predict(load_object(preprocessor_path).transform(features))
+    append(dataset, source.iloc[BASE_ROWS:BASE_ROWS + 200])
+
+    report, x_test = trainer.initiate_incremental_training()
+
+    assert report["mode"] == "incremental", report.get("reason")
+    assert report["new_train_rows"] + report["new_test_rows"] == 200
+    assert report["model"]["method"] == "warm_start" and report["preprocessor"] == "frozen"
+    model = load_object(model_path)
+    assert model.n_estimators == 30
+    assert x_test.shape[0] == len(load_frame(trainer.ingestion_config.test_data_path))
+    assert len(load_frame(trainer.ingestion_config.train_data_path)) + x_test.shape[0] == BASE_ROWS + 200
+
+    # The first 20 stages are the pre-existing trees, on the same raw rows
+    stages = model.staged_predict(load_object(preprocessor_path).transform(features))
+    np.testing.assert_allclose(next(islice(stages, 19, None)), before)
+
+    state = load_json(trainer.incremental_config.state_file_path)
+    assert state["offset"] == os.path.getsize(dataset) and state["mode"] == "incremental"
+
+    # Nothing new: the model is left alone
+    report, x_test = trainer.initiate_incremental_training()
+    assert report["mode"] == "unchanged" and x_test is None
+
+
+def test_refit_model_updates_preprocessor_statistics(trainer, source):
+    """A model without fitted trees to keep is refit, after the preprocessor statistics take in the new rows."""
+    preprocessor_path = trainer.data_transformation_config.preprocessor_obj_file_path
+    train_df = load_frame(trainer.ingestion_config.train_data_path)
+    x_train = load_object(preprocessor_path).transform(train_df.drop(columns=["math_score"]))
+    save_object(trainer.model_trainer_config.trained_model_file_path,
+                LinearRegression().fit(x_train, train_df["math_score"]))
+    trainer.record_state(0.0)
+    append(trainer.ingestion_config.dataset_file, source.iloc[BASE_ROWS:BASE_ROWS + 200])
+
+    report, _ = trainer.initiate_incremental_training()
+
+    assert report["mode"] == "incremental", report.get("reason")
+    assert report["model"]["method"] == "refit" and report["preprocessor"] == "updated"
+    train_df = load_frame(trainer.ingestion_config.train_data_path)
+    num_pipeline = load_object(preprocessor_path).named_transformers_["num_pipeline"]
+    numeric = train_df[["writing_score", "reading_score"]].to_numpy(dtype=float)
+    np.testing.assert_allclose(num_pipeline.named_steps["imputer"].statistics_, np.median(numeric, axis=0))
+    np.testing.assert_allclose(num_pipeline.named_steps["scaler"].mean_, numeric.mean(axis=0))
+
+
+def test_drift_or_rewritten_dataset_needs_full_retrain(trainer, source):
+    """Drifted rows and a rewritten dataset fall back to a full retrain without touching the artifacts."""
+    dataset = trainer.ingestion_config.dataset_file
+    model_path = trainer.model_trainer_config.trained_model_file_path
+    with open(model_path, "rb") as file:
+        model_bytes = file.read()
+
+    drifted = source.iloc[BASE_ROWS:BASE_ROWS + 200].assign(reading_score=100, writing_score=100)
+    append(dataset, drifted)
+    report, x_test = trainer.initiate_incremental_training()
+    assert report["mode"] == "full" and "drift in" in report["reason"] and x_test is None
+    assert set(report["drift"]["drifted"]) >= {"reading_score", "writing_score"}
+
+    source.iloc[100:BASE_ROWS].to_csv(dataset, index=False)
+    report, _ = trainer.initiate_incremental_training()
+    assert report["mode"] == "full" and "rewritten" in report["reason"]
+
+    with open(model_path, "rb") as file:
+        assert file.read() == model_bytes
+    assert len(load_frame(trainer.ingestion_config.train_data_path)) == load_json(
+        trainer.incremental_config.state_file_path)["train_rows"]
+
+
+@pytest.mark.parametrize("model, method", [
+    (RandomForestRegressor(n_estimators=20, random_state=0), "warm_start"),
+    (CatBoostRegressor(iterations=20, verbose=False, random_seed=0), "init_model"),
+])
+def test_continue_training_adds_estimators(model, method):
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=(300, 4))
+    y = x @ np.array([1.0, 2.0, -1.0, 0.5])
+    model.fit(x[:200], y[:200])
+
+    continued, summary, reason = continue_training(model, x, y, new_share=1 / 3)
+
+    assert reason is None and summary["method"] == method
+    assert summary["estimators_before"] == 20 and summary["estimators_after"] == 30
+    assert continued.predict(x).shape == (300,)
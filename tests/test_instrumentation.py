@@ -0,0 +1,72 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+from src.instrumentation import RunInstrumentation, annotate, stage
+from src.utils import load_json
+
+
+def busy(seconds):
+    end = time.process_time() + seconds
+    while time.process_time() < end:
+        pass
+
+
+def test_stage_records_time_memory_and_throughput():
+    """Stages record wall/CPU time, RSS and rows/fits per second, with nested stages naming their parent."""
+    instrumentation = RunInstrumentation(sample_interval=0.01)
+    with instrumentation.activate():
+        with stage("training", rows=1000) as record:
+            record["fits"] = 6
+            with stage("search/Linear Regression"):
+                annotate(rows=500)
+                busy(0.05)
+
+    search, training = instrumentation.stages
+    assert search["name"] == "search/Linear Regression" and search["parent"] == "training"
+    assert training["parent"] is None
+    assert search["cpu_s"] >= 0.04 and search["wall_s"] >= search["cpu_s"] * 0.5
+    assert search["rows_per_s"] == pytest.approx(500 / search["wall_s"], rel=0.01)
+    assert training["fits_per_s"] == pytest.approx(6 / training["wall_s"], rel=0.01)
+    assert training["peak_rss_mb"] >= training["rss_start_mb"] > 0
+    assert instrumentation.wall_s >= training["wall_s"]
+
+
+def test_stage_outside_a_run_is_a_no_op():
+    with stage("ingestion") as record:
+        annotate(rows=10)
+    assert record == {}
+
+
+def test_failed_stage_is_recorded_and_reraised(tmpdir):
+    """The error is recorded on the stage and the report is still saved."""
+    instrumentation = RunInstrumentation()
+    with pytest.raises(ValueError):
+        with instrumentation.activate(), stage("transformation"):
+            raise ValueError("bad column")
+
+    report = instrumentation.save(os.path.join(tmpdir, "report.json"))
+    assert report["stages"][0]["error"] == "ValueError: bad column"
+    assert load_json(os.path.join(tmpdir, "report.json"))["stages"][0]["name"] == "transformation"
+
+
+def test_profile_and_tracemalloc_hooks(tmpdir, monkeypatch):
+    """With both flags on, the report has traced allocation peaks and the profile's top functions."""
+    from src.configuration import config
+    monkeypatch.setattr(config, "TRAIN_PROFILE_FILE", os.path.join(tmpdir, "train.prof"))
+
+    instrumentation = RunInstrumentation(profile=True, trace_memory=True)
+    with instrumentation.activate():
+        with stage("outer"):
+            with stage("inner"):
+                data = np.ones(2 ** 20)  # 8 MB
+                del data
+
+    report = instrumentation.save(os.path.join(tmpdir, "report.json"))
+    inner, outer = report["stages"]
+    assert inner["traced_peak_mb"] >= 7.9 and outer["traced_peak_mb"] >= inner["traced_peak_mb"]
+    assert "cumulative" in report["profile"]["top_cumulative"]
+    assert report["tracemalloc_top"]
+    assert os.path.exists(os.path.join(tmpdir, "train.prof"))
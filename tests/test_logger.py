@@ -0,0 +1,73 @@
+import json
+import logging
+import os
+import queue
+import sys
+import pytest
+from unittest.mock import patch
+from src.logger import DroppingQueueHandler, JsonFormatter, Logger, RateLimitFilter
+
+
+@pytest.fixture
+def fresh_logger():
+    """Lets a test configure its own singleton, restoring the project logger afterwards."""
+    saved = Logger._logger, Logger._hot_path_logger, Logger._listener, Logger._writer
+    Logger._logger = Logger._hot_path_logger = Logger._listener = Logger._writer = None
+    yield
+    Logger.shutdown()
+    Logger._logger, Logger._hot_path_logger, Logger._listener, Logger._writer = saved
+
+
+def make_record(level=logging.INFO, msg="message", lineno=10):
+    return logging.LogRecord("test", level, "module.py", lineno, msg, None, None)
+
+
+def test_async_logger_writes_from_background_thread(tmpdir, fresh_logger):
+    """Records go through the queue and reach the log file once flushed, as JSON lines."""
+    logger = Logger.get_logger(log_dir=str(tmpdir), logger_name="test_async_logger", mode="async",
+                               log_format="json")
+    assert [type(h) for h in logger.handlers] == [DroppingQueueHandler]
+
+    logger.info("scored %d rows", 3, extra={"model_version": "abc"})
+    Logger.flush()
+
+    (log_file,) = os.listdir(tmpdir)
+    with open(os.path.join(tmpdir, log_file)) as f:
+        entry = json.loads(f.readline())
+    assert entry["message"] == "scored 3 rows"
+    assert entry["model_version"] == "abc"
+    assert entry["level"] == "INFO"
+    logger.handlers.clear()
+
+
+def test_rate_limit_filter_caps_info_per_call_site():
+    """Repeated INFO records from one line are capped and counted; warnings always pass."""
+    rate_filter = RateLimitFilter(rate=1.0)
+    with patch("src.logger.time.monotonic", return_value=100.0):
+        assert rate_filter.filter(make_record())
+        assert not rate_filter.filter(make_record())
+        assert not rate_filter.filter(make_record())
+        assert rate_filter.filter(make_record(lineno=11))
+        assert rate_filter.filter(make_record(level=logging.WARNING))
+
+    with patch("src.logger.time.monotonic", return_value=101.5):
+        record = make_record()
+        assert rate_filter.filter(record)
+    assert record.suppressed == 2
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+    handler.emit(make_record())
+    handler.emit(make_record())
+    assert handler.dropped == 1
+
+
+def test_json_formatter_includes_exception():
+    try:
+        raise ValueError("bad input")
+    except ValueError:
+        record = logging.LogRecord("test", logging.ERROR, "module.py", 1, "failed", None, sys.exc_info())
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "failed"
+    assert "ValueError: bad input" in entry["exc_info"]
@@ -0,0 +1,137 @@
+import multiprocessing
+import threading
+
+import pytest
+
+from src import metrics
+from src.metrics import MetricsRegistry
+
+
+@pytest.fixture
+def registry(tmpdir):
+    """Registry writing its snapshots to a temporary directory."""
+    return MetricsRegistry(directory=str(tmpdir), flush_interval=60, snapshots=True)
+
+
+def test_counts_from_every_thread_are_summed(registry):
+    """Each thread records into its own shard; the totals add them up."""
+    requests = registry.counter("requests_total", "Requests.", ("endpoint",))
+    latency = registry.histogram("latency_seconds", "Latency.", ("phase",), buckets=(0.01, 0.1))
+
+    def record():
+        for _ in range(1000):
+            requests.inc("predict")
+        latency.observe(0.05, "predict")
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    latency.observe(0.5, "predict")
+
+    values = registry.collect()
+    assert values[("requests_total", ("predict",))] == 4000
+    assert values[("latency_seconds", ("predict",))] == pytest.approx([0, 4, 1, 0.7])
+
+
+def test_shards_of_ended_threads_are_retired(registry):
+    """Threads started per request do not leave a shard each behind, and their counts are kept."""
+    requests = registry.counter("requests_total", "Requests.", ("endpoint",))
+    latency = registry.histogram("latency_seconds", "Latency.", ("phase",), buckets=(0.01, 0.1))
+
+    def record():
+        requests.inc("predict")
+        latency.observe(0.05, "predict")
+
+    for _ in range(20):
+        thread = threading.Thread(target=record)
+        thread.start()
+        thread.join()
+    requests.inc("predict")
+
+    values = registry.collect()
+    assert values[("requests_total", ("predict",))] == 21
+    assert values[("latency_seconds", ("predict",))] == pytest.approx([0, 20, 0, 1.0])
+    assert len(registry._shards) == 1
+
+
+def test_render_prometheus_text_format(registry):
+    requests = registry.counter("requests_total", "Requests.", ("endpoint", "status"))
+    latency = registry.histogram("latency_seconds", "Latency.", ("phase",), buckets=(0.01, 0.1))
+    registry.gauge("model_info", "Model version.", ("version",), lambda values: {('v"1',): 1})
+    requests.inc("predict", "200", amount=3)
+    latency.observe(0.005, "parse")
+    latency.observe(0.05, "parse")
+
+    text = registry.render()
+
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{endpoint="predict",status="200"} 3' in text
+    assert "# TYPE latency_seconds histogram" in text
+    assert 'latency_seconds_bucket{phase="parse",le="0.01"} 1' in text
+    assert 'latency_seconds_bucket{phase="parse",le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{phase="parse",le="+Inf"} 2' in text
+    assert 'latency_seconds_count{phase="parse"} 2' in text
+    assert 'latency_seconds_sum{phase="parse"} 0.055' in text
+    assert 'model_info{version="v\\"1"} 1' in text
+
+
+def test_scrape_sums_snapshots_of_other_processes(tmpdir, monkeypatch):
+    """A forked worker starts from zero, and its flushed totals are added to this process's live ones."""
+    monkeypatch.setattr(metrics.registry, "directory", str(tmpdir))
+    monkeypatch.setattr(metrics.registry, "snapshots", True)
+    metrics.REQUESTS.inc("fork_test", "200")
+
+    def worker():
+        metrics.REQUESTS.inc("fork_test", "200", amount=2)
+        metrics.registry.flush()
+
+    process = multiprocessing.get_context("fork").Process(target=worker)
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+
+    assert metrics.registry.collect()[("prediction_http_requests_total", ("fork_test", "200"))] == 3
+    assert metrics.registry.snapshot()[("prediction_http_requests_total", ("fork_test", "200"))] == 1
+
+
+def test_hit_ratio_per_lookup_source(registry):
+    lookups = {
+        (metrics.LOOKUPS.name, ("cache", "hit")): 3.0,
+        (metrics.LOOKUPS.name, ("cache", "miss")): 1.0,
+        (metrics.LOOKUPS.name, ("table", "miss")): 2.0,
+    }
+    assert metrics.HIT_RATIO.callback(lookups) == {("cache",): 0.75, ("table",): 0.0}
+
+
+def test_flush_without_values_writes_nothing(registry, tmpdir):
+    """A process that recorded nothing (e.g. a CLI importing the module) leaves no snapshot behind."""
+    registry.flush()
+    assert tmpdir.listdir() == []
+
+
+def test_registry_stays_in_memory_unless_snapshots_are_enabled(tmpdir):
+    """A batch run or training script records metrics without adding to the server's totals."""
+    registry = MetricsRegistry(directory=str(tmpdir), flush_interval=60)
+    registry.counter("requests_total", "Requests.").inc()
+    tmpdir.join("metrics_1.json").write('{"pid": 1, "values": [["requests_total", [], 5.0]]}')
+
+    registry.flush()
+
+    assert [path.basename for path in tmpdir.listdir()] == ["metrics_1.json"]
+    assert registry.collect() == {("requests_total", ()): 1.0}
+
+
+def test_retire_folds_exited_worker_into_retired_totals(registry, tmpdir):
+    """The snapshot of an exited worker is removed, but its counts stay in the scrape."""
+    requests = registry.counter("requests_total", "Requests.")
+    tmpdir.join("metrics_1.json").write('{"pid": 1, "values": [["requests_total", [], 2.0]]}')
+    tmpdir.join("metrics_2.json").write('{"pid": 2, "values": [["requests_total", [], 3.0]]}')
+    requests.inc()
+
+    registry.retire(1)
+    registry.retire(2)
+
+    assert sorted(path.basename for path in tmpdir.listdir()) == ["metrics_retired.json"]
+    assert registry.collect() == {("requests_total", ()): 6.0}
@@ -0,0 +1,70 @@
+import threading
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import MagicMock
+from src.pipelines.micro_batcher import MicroBatcher
+
+
+def double_scores(features: pd.DataFrame):
+    """Stand-in for a vectorized model: one prediction per row."""
+    return features["score"].to_numpy() * 2
+
+
+def test_concurrent_requests_are_coalesced():
+    """Concurrent single-row requests are scored together and each caller gets its own row."""
+    predict_fn = MagicMock(side_effect=double_scores)
+    batcher = MicroBatcher(predict_fn, max_batch_size=8, max_wait_ms=200)
+
+    futures = [batcher.submit(pd.DataFrame({"score": [i]})) for i in range(8)]
+    results = [future.result(timeout=5) for future in futures]
+
+    assert [result.tolist() for result in results] == [[i * 2] for i in range(8)]
+    assert predict_fn.call_count == 1
+    stats = batcher.stats()
+    assert stats["batches"] == 1
+    assert stats["batch_size_counts"] == {8: 1}
+
+
+def test_wait_budget_flushes_partial_batch():
+    """A lone request is scored once the max wait expires."""
+    batcher = MicroBatcher(double_scores, max_batch_size=64, max_wait_ms=1)
+    assert batcher.predict(pd.DataFrame({"score": [21]})).tolist() == [42]
+    assert batcher.stats()["max_batch_size"] == 1
+
+
+def test_failing_request_does_not_fail_neighbours():
+    """When a batch fails, requests are retried individually so only the bad one errors."""
+    def predict_fn(features):
+        if (features["score"] < 0).any():
+            raise ValueError("negative score")
+        return double_scores(features)
+
+    batcher = MicroBatcher(predict_fn, max_batch_size=3, max_wait_ms=200)
+    good = batcher.submit(pd.DataFrame({"score": [1]}))
+    bad = batcher.submit(pd.DataFrame({"score": [-1]}))
+    other = batcher.submit(pd.DataFrame({"score": [3]}))
+
+    assert good.result(timeout=5).tolist() == [2]
+    assert other.result(timeout=5).tolist() == [6]
+    with pytest.raises(ValueError):
+        bad.result(timeout=5)
+
+
+def test_thread_safety_under_load():
+    """Many threads submitting at once all receive their own predictions."""
+    batcher = MicroBatcher(double_scores, max_batch_size=16, max_wait_ms=2)
+    results = {}
+
+    def worker(i):
+        results[i] = batcher.predict(pd.DataFrame({"score": [i]}))[0]
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(64)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {i: i * 2 for i in range(64)}
+    assert batcher.stats()["rows"] == 64
+    assert np.isclose(batcher.stats()["mean_batch_size"], 64 / batcher.stats()["batches"])
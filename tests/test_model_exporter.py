@@ -0,0 +1,91 @@
+import os
+import numpy as np
+import pytest
+from catboost import CatBoostRegressor
+from scipy import sparse
+from sklearn.ensemble import AdaBoostRegressor, GradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.neighbors import KNeighborsRegressor
+from sklearn.tree import DecisionTreeRegressor
+from src.components.model_exporter import ModelExporter
+from src.pipelines.portable_model import load_portable_model
+from src.utils import save_object
+
+
+@pytest.fixture
+def regression_data():
+    """Regression problem mixing continuous and one-hot-like columns."""
+    rng = np.random.default_rng(0)
+    x = np.c_[rng.normal(size=(300, 3)), rng.integers(0, 2, size=(300, 4))].astype(np.float64)
+    y = x @ np.array([2.0, -1.0, 0.5, 3.0, 0.0, -2.0, 1.0]) + rng.normal(scale=0.3, size=300)
+    return x[:240], y[:240], x[240:]
+
+
+@pytest.fixture
+def exporter(tmpdir):
+    exporter = ModelExporter()
+    exporter.model_trainer_config.portable_model_file_path = str(tmpdir / "model_portable.npz")
+    return exporter
+
+
+@pytest.mark.parametrize("model", [
+    LinearRegression(),
+    DecisionTreeRegressor(random_state=0),
+    RandomForestRegressor(n_estimators=16, random_state=0),
+    GradientBoostingRegressor(n_estimators=32, random_state=0),
+    AdaBoostRegressor(n_estimators=16, random_state=0),
+    CatBoostRegressor(iterations=20, verbose=False, random_seed=0),
+], ids=lambda model: type(model).__name__)
+@pytest.mark.parametrize("as_sparse", [False, True])
+def test_portable_model_matches_fitted_estimator(tmpdir, exporter, regression_data, model, as_sparse):
+    """The exported model reproduces the estimator's predictions after a save/load round trip."""
+    x_train, y_train, x_test = regression_data
+    model.fit(x_train, y_train)
+    model_path = str(tmpdir / "model.pkl")
+    save_object(model_path, model)
+    x_eval = sparse.csr_matrix(x_test) if as_sparse else x_test
+
+    portable_path = exporter.initiate_model_export(model_path, x_eval)
+
+    assert portable_path is not None
+    np.testing.assert_allclose(load_portable_model(portable_path).predict(x_eval), model.predict(x_test),
+                               rtol=1e-9, atol=1e-9)
+
+
+def test_unsupported_model_is_not_exported(tmpdir, exporter, regression_data):
+    """Models without a portable form are skipped, and a stale export is removed."""
+    x_train, y_train, x_test = regression_data
+    model_path = str(tmpdir / "model.pkl")
+    save_object(model_path, KNeighborsRegressor().fit(x_train, y_train))
+    with open(exporter.model_trainer_config.portable_model_file_path, "w") as f:
+        f.write("stale")
+
+    assert exporter.initiate_model_export(model_path, x_test) is None
+    assert not os.path.exists(exporter.model_trainer_config.portable_model_file_path)
+
+
+def test_portable_model_rejects_wrong_feature_count(tmpdir, exporter, regression_data):
+    """Scoring with the wrong number of features fails loudly instead of indexing garbage."""
+    x_train, y_train, x_test = regression_data
+    model_path = str(tmpdir / "model.pkl")
+    save_object(model_path, RandomForestRegressor(n_estimators=4, random_state=0).fit(x_train, y_train))
+    portable = load_portable_model(exporter.initiate_model_export(model_path, x_test))
+
+    with pytest.raises(ValueError, match="Expected 7 features"):
+        portable.predict(x_test[:, :5])
+
+
+def test_portable_model_is_memory_mapped(tmpdir, exporter, regression_data):
+    """With mmap, the node arrays are read-only views of the file and predictions are unchanged."""
+    x_train, y_train, x_test = regression_data
+    model_path = str(tmpdir / "model.pkl")
+    save_object(model_path, GradientBoostingRegressor(n_estimators=8, random_state=0).fit(x_train, y_train))
+    portable_path = exporter.initiate_model_export(model_path, x_test)
+
+    mapped = load_portable_model(portable_path, mmap=True)
+    loaded = load_portable_model(portable_path, mmap=False)
+
+    assert isinstance(mapped.arrays["threshold"], np.memmap)
+    assert not mapped.arrays["threshold"].flags.writeable
+    assert mapped.params == loaded.params
+    np.testing.assert_array_equal(mapped.predict(x_test), loaded.predict(x_test))
@@ -3,6 +3,8 @@ import numpy as np
 from unittest.mock import patch, MagicMock
 from src.components.model_trainer import ModelTrainer
 from src.exception import CustomException
+from src.instrumentation import RunInstrumentation
+from src.utils import evaluate_models
 
 
 # @patch("src.utils.evaluate_models")
@@ -53,4 +55,133 @@ def test_model_trainer_no_valid_model(mock_save_object, mock_evaluate_models):
     assert "Model evaluation failed. No valid models found." in str(exc_info.value)
 
     # ✅ Ensure `save_object` was NEVER called
-    mock_save_object.assert_not_called()
\ No newline at end of file
+    mock_save_object.assert_not_called()
+
+
+@pytest.fixture
+def packed_arrays():
+    """Train/test arrays with the target packed as the last column, as DataTransformation returns them."""
+    rng = np.random.default_rng(1)
+    x = rng.normal(size=(240, 3))
+    y = x @ np.array([3.0, -1.0, 2.0]) + rng.normal(scale=0.2, size=240)
+    data = np.c_[x, y]
+    return data[:180], data[180:]
+
+
+def test_model_trainer_halving_search_records_budget(tmpdir, packed_arrays):
+    """Successive halving trains fewer candidates to full size and records its budget in the report."""
+    import json
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.linear_model import LinearRegression
+
+    train_array, test_array = packed_arrays
+    model_trainer = ModelTrainer()
+    model_trainer.models = {
+        "Random Forest": RandomForestRegressor(random_state=0),
+        "Linear Regression": LinearRegression(),
+    }
+    model_trainer.model_config = {"Random Forest": {"n_estimators": [3, 9, 27], "max_depth": [2, 4, 8, None]}}
+    model_trainer.search_strategy = "halving"
+    model_trainer.model_trainer_config.trained_model_file_path = str(tmpdir / "model.pkl")
+    model_trainer.model_trainer_config.report_file_path = str(tmpdir / "model_report.json")
+
+    r2 = model_trainer.initiate_model_trainer(train_array, test_array)
+
+    with open(tmpdir / "model_report.json") as f:
+        report = json.load(f)
+    assert report["search_strategy"] == "halving"
+    assert report["r2_score"] == pytest.approx(r2)
+    forest = report["models"]["Random Forest"]["search"]
+    assert forest["resource"] == "n_estimators"
+    assert forest["resources_per_iteration"] == [9, 27]
+    assert forest["candidates_per_iteration"] == [4, 2]
+    assert forest["fits"] < forest["exhaustive_fits"]
+
+
+def test_model_trainer_tournament_eliminates_weak_families(tmpdir, packed_arrays):
+    """Families far behind the leader on the cheap probe never get the full search."""
+    import json
+    from sklearn.dummy import DummyRegressor
+    from sklearn.linear_model import LinearRegression
+
+    train_array, test_array = packed_arrays
+    model_trainer = ModelTrainer()
+    model_trainer.models = {"Linear Regression": LinearRegression(), "Dummy": DummyRegressor()}
+    model_trainer.model_config = {}
+    model_trainer.search_strategy = "grid"
+    model_trainer.tournament_mode = True
+    model_trainer.model_trainer_config.trained_model_file_path = str(tmpdir / "model.pkl")
+    model_trainer.model_trainer_config.report_file_path = str(tmpdir / "model_report.json")
+
+    with patch("src.components.model_trainer.evaluate_models", wraps=evaluate_models) as mock_evaluate:
+        model_trainer.initiate_model_trainer(train_array, test_array)
+
+    assert list(mock_evaluate.call_args.kwargs["models"]) == ["Linear Regression"]
+    with open(tmpdir / "model_report.json") as f:
+        tournament = json.load(f)["tournament"]
+    assert tournament["Linear Regression"]["eliminated"] is None
+    assert "behind Linear Regression" in tournament["Dummy"]["eliminated"]
+    assert tournament["Dummy"]["fits"] == 3
+
+
+@pytest.mark.parametrize("search_strategy", ["grid", "pooled"])
+def test_train_models_keeps_sparse_input_where_accepted(tmpdir, packed_arrays, search_strategy):
+    """Sparse features reach sparse-capable estimators as-is and are densified only for the others."""
+    import json
+    from scipy import sparse
+    from sklearn.ensemble import HistGradientBoostingRegressor
+    from sklearn.linear_model import LinearRegression
+
+    train_array, test_array = packed_arrays
+    model_trainer = ModelTrainer()
+    model_trainer.models = {"Linear Regression": LinearRegression(),
+                            "Hist Gradient Boosting": HistGradientBoostingRegressor(max_iter=20)}
+    model_trainer.model_config = {}
+    model_trainer.search_strategy = search_strategy
+    model_trainer.model_trainer_config.trained_model_file_path = str(tmpdir / "model.pkl")
+    model_trainer.model_trainer_config.report_file_path = str(tmpdir / "model_report.json")
+
+    fit = LinearRegression.fit
+    instrumentation = RunInstrumentation()
+    with patch("src.utils.config.SEARCH_JOURNAL_FILE", str(tmpdir / "journal.jsonl")), \
+            patch.object(LinearRegression, "fit", autospec=True, side_effect=fit) as linear_fit, \
+            instrumentation.activate():
+        r2 = model_trainer.train_models(sparse.csr_matrix(train_array[:, :-1]), train_array[:, -1],
+                                        sparse.csr_matrix(test_array[:, :-1]), test_array[:, -1])
+
+    assert all(sparse.issparse(call.args[1]) for call in linear_fit.call_args_list)
+    # Per-family search timing, also when all families share one pooled search
+    stages = {record["name"]: record for record in instrumentation.stages}
+    if search_strategy == "pooled":
+        assert set(stages["search/pooled"]["models"]) == set(model_trainer.models)
+    else:
+        assert {f"search/{name}" for name in model_trainer.models} <= set(stages)
+    with open(tmpdir / "model_report.json") as f:
+        report = json.load(f)
+    assert set(report["models"]) == {"Linear Regression", "Hist Gradient Boosting"}
+    assert r2 > 0.9
+
+
+def test_train_models_float32_reports_precision_and_stamps_model(tmpdir, packed_arrays):
+    """In float32 mode the model is trained on float32 features, stamped, and compared against float64."""
+    import json
+    from sklearn.ensemble import RandomForestRegressor
+
+    train_array, test_array = packed_arrays
+    model_trainer = ModelTrainer()
+    model_trainer.models = {"Random Forest": RandomForestRegressor(n_estimators=10)}
+    model_trainer.model_config = {}
+    model_trainer.search_strategy = "grid"
+    model_trainer.model_trainer_config.trained_model_file_path = str(tmpdir / "model.pkl")
+    model_trainer.model_trainer_config.report_file_path = str(tmpdir / "model_report.json")
+
+    with patch("src.components.model_trainer.config.FEATURE_DTYPE", "float32"):
+        model_trainer.initiate_model_trainer(train_array, test_array)
+
+    with open(tmpdir / "model_report.json") as f:
+        precision = json.load(f)["precision"]
+    with open(tmpdir / "model.pkl.meta.json") as f:
+        assert json.load(f) == {"feature_dtype": "float32"}
+    assert precision["feature_dtype"] == "float32"
+    assert precision["r2_difference"] == pytest.approx(precision["refit_r2_score"] - precision["float64_r2_score"])
+    assert abs(precision["r2_difference"]) < 0.01
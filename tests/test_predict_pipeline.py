@@ -0,0 +1,69 @@
+import os
+import pytest
+from src.artifact_cache import ArtifactCache
+from src.configuration.predict_config import PredictConfig
+from src.pipelines.predict_pipeline import PredictPipeline
+from src.stage_cache import StageCache
+from src.utils import load_json, manifest_path, save_json, save_object
+
+
+@pytest.fixture
+def pipeline(tmpdir):
+    """Pipeline over a model and preprocessor in a temp directory, checking the files on every call."""
+    predict_config = PredictConfig(
+        model_path=os.path.join(tmpdir, "model.pkl"),
+        preprocessor_path=os.path.join(tmpdir, "preprocessor.pkl"),
+        use_compiled_preprocessor=False, use_portable_model=False, use_prediction_table=False,
+    )
+    save_object(predict_config.model_path, {"model": 1})
+    save_object(predict_config.preprocessor_path, {"preprocessor": 1})
+    pipeline = PredictPipeline(predict_config)
+    pipeline.artifact_cache = ArtifactCache(check_interval=0)
+    pipeline.metadata_cache = ArtifactCache(loader=load_json, check_interval=0)
+    return pipeline
+
+
+def write_manifest(predict_config):
+    save_json(manifest_path(predict_config.model_path), {
+        "model": StageCache.file_hash(predict_config.model_path),
+        "preprocessor": StageCache.file_hash(predict_config.preprocessor_path),
+    })
+
+
+def test_artifacts_are_published_together(pipeline):
+    """Without a manifest, a retrained pair is picked up as one new set; sets already taken are unchanged."""
+    first = pipeline.serving_artifacts()
+    save_object(pipeline.config.model_path, {"model": 2})
+    save_object(pipeline.config.preprocessor_path, {"preprocessor": 2})
+
+    second = pipeline.serving_artifacts()
+
+    assert (first.model, first.preprocessor) == ({"model": 1}, {"preprocessor": 1})
+    assert (second.model, second.preprocessor) == ({"model": 2}, {"preprocessor": 2})
+    assert second.version != first.version
+    assert pipeline.load_artifacts() == (second.model, second.preprocessor)
+
+
+def test_partial_retrain_waits_for_the_manifest(pipeline):
+    """A new preprocessor alone is not paired with the old model; the manifest switches both at once."""
+    write_manifest(pipeline.config)
+    first = pipeline.serving_artifacts()
+
+    save_object(pipeline.config.preprocessor_path, {"preprocessor": 2})
+    assert pipeline.serving_artifacts() is first
+
+    save_object(pipeline.config.model_path, {"model": 2})
+    assert pipeline.serving_artifacts() is first
+
+    write_manifest(pipeline.config)
+    second = pipeline.serving_artifacts()
+    assert (second.model, second.preprocessor) == ({"model": 2}, {"preprocessor": 2})
+    assert pipeline.model_version() == second.version != first.version
+
+
+def test_first_load_ignores_a_stale_manifest(pipeline):
+    """With nothing serving yet, artifacts that do not match the manifest are still loaded."""
+    write_manifest(pipeline.config)
+    save_object(pipeline.config.model_path, {"model": 2})
+
+    assert pipeline.serving_artifacts().model == {"model": 2}
@@ -0,0 +1,85 @@
+import os
+import numpy as np
+import pytest
+from unittest.mock import MagicMock, patch
+from src.artifact_cache import ArtifactCache
+from src.configuration.predict_config import PredictConfig
+from src.pipelines.predict_pipeline import PredictPipeline
+from src.pipelines.prediction_cache import PredictionCache
+from src.utils import save_object
+
+
+@pytest.fixture
+def record():
+    """A single valid prediction record."""
+    return {
+        "gender": "female",
+        "race_ethnicity": "group B",
+        "parental_level_of_education": "bachelor's degree",
+        "lunch": "standard",
+        "test_preparation_course": "none",
+        "reading_score": 72,
+        "writing_score": 74,
+    }
+
+
+def test_key_normalizes_record(record):
+    """Whitespace and int/float score spellings map to the same key."""
+    padded = dict(record, gender=" female ", reading_score=72.0)
+    assert PredictionCache.make_key(padded) == PredictionCache.make_key(record)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = PredictionCache(max_entries=2)
+    cache.put("v1", "a", 1)
+    cache.put("v1", "b", 2)
+    cache.get("v1", "a")  # "b" is now the least recently used
+    cache.put("v1", "c", 3)
+
+    assert cache.get("v1", "b") is None
+    assert cache.get("v1", "a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expired_entry_is_a_miss():
+    cache = PredictionCache(ttl_seconds=10)
+    with patch("src.pipelines.prediction_cache.time.monotonic", return_value=100.0):
+        cache.put("v1", "a", 1)
+    with patch("src.pipelines.prediction_cache.time.monotonic", return_value=105.0):
+        assert cache.get("v1", "a") == 1
+    with patch("src.pipelines.prediction_cache.time.monotonic", return_value=111.0):
+        assert cache.get("v1", "a") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_new_model_version_drops_entries():
+    cache = PredictionCache()
+    cache.put("v1", "a", 1)
+
+    assert cache.get("v2", "a") is None
+    assert cache.stats()["invalidations"] == 1
+    assert cache.stats()["size"] == 0
+
+
+def test_pipeline_serves_repeats_from_cache_until_model_changes(tmpdir, record):
+    """Repeated records skip scoring; replacing the model artifact invalidates the cache."""
+    model_path = os.path.join(tmpdir, "model.pkl")
+    preprocessor_path = os.path.join(tmpdir, "preprocessor.pkl")
+    save_object(model_path, {"model": 1})
+    save_object(preprocessor_path, {"preprocessor": 1})
+
+    pipeline = PredictPipeline(PredictConfig(model_path=model_path, preprocessor_path=preprocessor_path))
+    pipeline.artifact_cache = ArtifactCache(check_interval=0)
+    pipeline._predict_record = MagicMock(return_value=np.array([70.0]))
+
+    assert pipeline.predict_record(record).tolist() == [70.0]
+    assert pipeline.predict_record(dict(record, lunch=" standard")).tolist() == [70.0]
+    pipeline._predict_record.assert_called_once()
+
+    save_object(model_path, {"model": 2})
+    pipeline._predict_record.return_value = np.array([80.0])
+
+    assert pipeline.predict_record(record).tolist() == [80.0]
+    stats = pipeline.prediction_cache.stats()
+    assert (stats["hits"], stats["misses"], stats["invalidations"]) == (1, 2, 1)
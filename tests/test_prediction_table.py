@@ -0,0 +1,89 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+from src.components.data_transformation import DataTransformation
+from src.components.prediction_table_builder import PredictionTableBuilder
+from src.configuration import config
+from src.configuration.predict_config import PredictConfig
+from src.pipelines.predict_pipeline import PredictPipeline
+from src.pipelines.prediction_table import load_prediction_table
+from src.utils import save_object
+
+
+@pytest.fixture
+def trained_artifacts(tmpdir):
+    """Paths to a preprocessor and model fitted on the raw dataset."""
+    df = pd.read_csv(config.DATASET_FILE)
+    x, y = df.drop(columns=["math_score"]), df["math_score"]
+    preprocessor = DataTransformation().get_data_transformer_object().fit(x)
+    model = LinearRegression().fit(preprocessor.transform(x), y)
+
+    model_path = os.path.join(tmpdir, "model.pkl")
+    preprocessor_path = os.path.join(tmpdir, "preprocessor.pkl")
+    save_object(model_path, model)
+    save_object(preprocessor_path, preprocessor)
+    return model_path, preprocessor_path, x
+
+
+@pytest.fixture
+def table_path(tmpdir, trained_artifacts):
+    """Builds a table over a reduced score range (0-5) to keep the grid small."""
+    model_path, preprocessor_path, _ = trained_artifacts
+    builder = PredictionTableBuilder()
+    builder.model_trainer_config.prediction_table_file_path = os.path.join(tmpdir, "model_prediction_table.npz")
+    builder.score_range = (0, 5)
+    builder.batch_rows = 1000
+    return builder.initiate_prediction_table(model_path, preprocessor_path)
+
+
+def make_pipeline(model_path, preprocessor_path, table_path, **kwargs):
+    return PredictPipeline(PredictConfig(model_path=model_path, preprocessor_path=preprocessor_path,
+                                         prediction_table_path=table_path, use_compiled_preprocessor=False,
+                                         prediction_cache_max_entries=0, **kwargs))
+
+
+def test_table_matches_model_on_every_cell(trained_artifacts, table_path):
+    """Every cell holds exactly what the model predicts for that input."""
+    model_path, preprocessor_path, _ = trained_artifacts
+    table = load_prediction_table(table_path)
+    assert table.values.shape == (2, 5, 6, 2, 2, 6, 6)
+
+    index = np.indices(table.values.shape).reshape(table.values.ndim, -1)
+    grid = {column: np.asarray(categories, dtype=object)[index[i]]
+            for i, (column, categories) in enumerate(zip(table.categorical_columns, table.categories))}
+    grid.update({column: index[5 + k] for k, column in enumerate(table.score_columns)})
+
+    pipeline = make_pipeline(model_path, preprocessor_path, table_path, use_prediction_table=False)
+    expected = pipeline.predict_batch(pd.DataFrame(grid))
+    np.testing.assert_array_equal(table.values.ravel(), expected)
+
+
+def test_pipeline_looks_up_in_domain_and_scores_the_rest(trained_artifacts, table_path):
+    """In-domain rows come from the table; unknown categories and out-of-range scores use the model."""
+    model_path, preprocessor_path, x = trained_artifacts
+    features = x[(x["reading_score"] <= 5) | (x.index < 20)].reset_index(drop=True)
+    features.loc[0, "gender"] = "unknown"
+
+    with_table = make_pipeline(model_path, preprocessor_path, table_path)
+    without_table = make_pipeline(model_path, preprocessor_path, table_path, use_prediction_table=False)
+
+    np.testing.assert_allclose(with_table.predict_batch(features), without_table.predict_batch(features))
+    record = dict(x.iloc[0].to_dict(), reading_score=3, writing_score=4.0)
+    assert with_table._prediction_table().lookup(record) is not None
+    assert with_table._prediction_table().lookup(dict(record, reading_score=3.5)) is None
+    assert with_table.predict_record(record) == pytest.approx(without_table.predict_record(record))
+
+
+def test_stale_table_is_ignored(trained_artifacts, table_path):
+    """A table stamped with a different model version is never used."""
+    model_path, preprocessor_path, x = trained_artifacts
+    pipeline = make_pipeline(model_path, preprocessor_path, table_path)
+    assert pipeline._prediction_table() is not None
+
+    model = LinearRegression().fit(np.eye(19), np.arange(19.0))
+    save_object(model_path, model)
+    pipeline.artifact_cache.invalidate(model_path)
+
+    assert pipeline._prediction_table() is None
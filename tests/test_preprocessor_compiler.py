@@ -0,0 +1,149 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import patch
+from sklearn.linear_model import LinearRegression
+from src.components.data_transformation import DataTransformation
+from src.components.preprocessor_compiler import PreprocessorCompiler
+from src.configuration import config
+from src.configuration.predict_config import PredictConfig
+from src.pipelines.compiled_preprocessor import CompiledPreprocessor
+from src.pipelines.predict_pipeline import PredictPipeline
+from src.utils import save_object, load_object
+
+
+@pytest.fixture
+def dataset():
+    """Raw dataset split into features and target."""
+    df = pd.read_csv(config.DATASET_FILE)
+    return df.drop(columns=["math_score"]), df["math_score"]
+
+
+@pytest.fixture
+def fitted_preprocessor(dataset):
+    """The project's preprocessor fitted on the raw dataset."""
+    x, _ = dataset
+    return DataTransformation().get_data_transformer_object().fit(x)
+
+
+def test_compiled_transform_is_bit_identical(dataset, fitted_preprocessor):
+    """The lookup-table transform reproduces the sklearn output exactly."""
+    x, _ = dataset
+    compiled = CompiledPreprocessor.from_column_transformer(fitted_preprocessor)
+
+    expected = fitted_preprocessor.transform(x)
+    actual = compiled.transform(x.to_dict(orient="records"))
+
+    assert actual.shape == expected.shape
+    assert np.array_equal(actual, expected)
+
+
+def test_compiled_transform_handles_unknown_and_missing(dataset, fitted_preprocessor):
+    """Unknown categories are ignored and missing values use the imputer fill, as in sklearn."""
+    x, _ = dataset
+    compiled = CompiledPreprocessor.from_column_transformer(fitted_preprocessor)
+    record = dict(x.iloc[0].to_dict(), race_ethnicity="group Z", reading_score=np.nan)
+
+    expected = fitted_preprocessor.transform(pd.DataFrame([record]))
+    assert np.array_equal(compiled.transform_record(record), expected)
+
+
+def test_compiler_exports_verified_preprocessor(tmpdir, dataset, fitted_preprocessor):
+    """The compiler saves the compiled form after verifying it against the test file."""
+    x, y = dataset
+    preprocessor_path = os.path.join(tmpdir, "preprocessor.pkl")
+    test_path = os.path.join(tmpdir, "test.csv")
+    save_object(preprocessor_path, fitted_preprocessor)
+    x.assign(math_score=y).to_csv(test_path, index=False)
+
+    compiler = PreprocessorCompiler()
+    compiler.data_transformation_config.compiled_preprocessor_obj_file_path = os.path.join(tmpdir, "compiled.pkl")
+    compiled_path = compiler.initiate_preprocessor_compilation(preprocessor_path, test_path)
+
+    assert compiled_path == os.path.join(tmpdir, "compiled.pkl")
+    assert isinstance(load_object(compiled_path), CompiledPreprocessor)
+
+
+def test_compiler_skips_unsupported_preprocessor(tmpdir, dataset):
+    """Preprocessors outside the supported step set are not compiled, and stale exports are removed."""
+    from sklearn.compose import ColumnTransformer
+    from sklearn.preprocessing import MinMaxScaler
+
+    x, y = dataset
+    preprocessor = ColumnTransformer([("num", MinMaxScaler(), ["reading_score"])]).fit(x)
+    preprocessor_path = os.path.join(tmpdir, "preprocessor.pkl")
+    test_path = os.path.join(tmpdir, "test.csv")
+    stale_path = os.path.join(tmpdir, "compiled.pkl")
+    save_object(preprocessor_path, preprocessor)
+    save_object(stale_path, "stale")
+    x.assign(math_score=y).to_csv(test_path, index=False)
+
+    compiler = PreprocessorCompiler()
+    compiler.data_transformation_config.compiled_preprocessor_obj_file_path = stale_path
+
+    assert compiler.initiate_preprocessor_compilation(preprocessor_path, test_path) is None
+    assert not os.path.exists(stale_path)
+
+
+def test_predict_record_fast_path_matches_dataframe_path(tmpdir, dataset, fitted_preprocessor):
+    """PredictPipeline.predict_record gives exactly the DataFrame-path prediction."""
+    x, y = dataset
+    model = LinearRegression().fit(fitted_preprocessor.transform(x), y)
+    predict_config = PredictConfig(
+        model_path=os.path.join(tmpdir, "model.pkl"),
+        preprocessor_path=os.path.join(tmpdir, "preprocessor.pkl"),
+        compiled_preprocessor_path=os.path.join(tmpdir, "compiled.pkl"),
+    )
+    save_object(predict_config.model_path, model)
+    save_object(predict_config.preprocessor_path, fitted_preprocessor)
+    save_object(predict_config.compiled_preprocessor_path,
+                CompiledPreprocessor.from_column_transformer(fitted_preprocessor))
+
+    pipeline = PredictPipeline(predict_config)
+    record = x.iloc[3].to_dict()
+
+    with patch.object(pipeline, "predict", wraps=pipeline.predict) as dataframe_path:
+        fast = pipeline.predict_record(record)
+        dataframe_path.assert_not_called()
+
+    assert np.array_equal(fast, pipeline.predict(pd.DataFrame([record])))
+
+
+def test_predict_record_fast_path_goes_through_micro_batcher(tmpdir, dataset, fitted_preprocessor):
+    """With micro-batching on, concurrent compiled records are scored in shared model calls."""
+    x, y = dataset
+    model = LinearRegression().fit(fitted_preprocessor.transform(x), y)
+    predict_config = PredictConfig(
+        model_path=os.path.join(tmpdir, "model.pkl"),
+        preprocessor_path=os.path.join(tmpdir, "preprocessor.pkl"),
+        compiled_preprocessor_path=os.path.join(tmpdir, "compiled.pkl"),
+        use_compiled_preprocessor=True, use_prediction_table=False, prediction_cache_max_entries=0,
+        micro_batching=True, micro_batch_max_size=8, micro_batch_max_wait_ms=200,
+    )
+    save_object(predict_config.model_path, model)
+    save_object(predict_config.preprocessor_path, fitted_preprocessor)
+    save_object(predict_config.compiled_preprocessor_path,
+                CompiledPreprocessor.from_column_transformer(fitted_preprocessor))
+
+    pipeline = PredictPipeline(predict_config)
+    records = [x.iloc[i].to_dict() for i in range(8)]
+    results = [None] * len(records)
+
+    def client(i):
+        results[i] = pipeline.predict_record(records[i])
+
+    with patch.object(pipeline, "predict", wraps=pipeline.predict) as dataframe_path:
+        threads = [threading.Thread(target=client, args=(i,)) for i in range(len(records))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        dataframe_path.assert_not_called()
+
+    expected = model.predict(fitted_preprocessor.transform(pd.DataFrame(records)))
+    assert np.allclose(np.concatenate(results), expected)
+    stats = pipeline.record_batcher.stats()
+    assert stats["rows"] == len(records)
+    assert stats["batches"] < len(records)
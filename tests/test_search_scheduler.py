@@ -0,0 +1,131 @@
+import os
+import numpy as np
+import pytest
+from unittest.mock import patch
+from joblib import hash as joblib_hash
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.model_selection import GridSearchCV
+from sklearn.tree import DecisionTreeRegressor
+from src.components import search_scheduler
+from src.components.search_scheduler import SearchScheduler
+
+
+@pytest.fixture
+def regression_data():
+    """Small deterministic regression problem."""
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=(90, 4))
+    y = x @ np.array([1.5, -2.0, 0.5, 0.0]) + rng.normal(scale=0.3, size=90)
+    return x, y
+
+
+@pytest.fixture
+def models_and_grid():
+    """Two model families with small grids."""
+    models = {
+        "Decision Tree": DecisionTreeRegressor(random_state=0),
+        "Linear Regression": LinearRegression(),
+    }
+    param_grid = {"Decision Tree": {"max_depth": [2, 4, 8], "min_samples_leaf": [1, 5]}}
+    return models, param_grid
+
+
+def test_pooled_search_matches_grid_search(tmpdir, regression_data, models_and_grid):
+    """The pooled search picks the same parameters and CV score as GridSearchCV."""
+    x, y = regression_data
+    models, param_grid = models_and_grid
+
+    result = SearchScheduler(os.path.join(tmpdir, "journal.jsonl"), cv=3, n_jobs=1).run(x, y, models, param_grid)
+
+    gs = GridSearchCV(models["Decision Tree"], param_grid["Decision Tree"], cv=3, scoring="r2").fit(x, y)
+    assert result["Decision Tree"]["best_params"] == gs.best_params_
+    assert result["Decision Tree"]["cv_score"] == pytest.approx(gs.best_score_)
+    assert result["Decision Tree"]["fits"] == 6 * 3
+    assert result["Linear Regression"]["fits"] == 3
+    np.testing.assert_allclose(result["Decision Tree"]["model"].predict(x), gs.best_estimator_.predict(x))
+
+
+def test_interrupted_search_resumes_from_journal(tmpdir, regression_data, models_and_grid):
+    """Fits recorded in the journal are not run again; the journal is removed once the search completes."""
+    x, y = regression_data
+    models, param_grid = models_and_grid
+    scheduler = SearchScheduler(os.path.join(tmpdir, "journal.jsonl"), cv=3, n_jobs=1)
+    first = scheduler.run(x, y, models, param_grid)
+    assert tmpdir.listdir() == []
+
+    # Simulate an interruption after 10 fits, leaving a half-written line
+    fit_and_score, calls = search_scheduler._fit_and_score, []
+
+    def interrupted(*args):
+        if len(calls) == 10:
+            raise KeyboardInterrupt
+        calls.append(args)
+        return fit_and_score(*args)
+
+    with patch.object(search_scheduler, "_fit_and_score", side_effect=interrupted):
+        with pytest.raises(KeyboardInterrupt):
+            scheduler.run(x, y, models, param_grid)
+    (journal,) = tmpdir.listdir()
+    journal.write('{"key": "trunc', mode="a")
+
+    with patch.object(search_scheduler, "_fit_and_score", wraps=search_scheduler._fit_and_score) as fit:
+        resumed = scheduler.run(x, y, models, param_grid)
+
+    assert fit.call_count == 7 * 3 - 10
+    assert resumed["Decision Tree"]["best_params"] == first["Decision Tree"]["best_params"]
+    timings = [result["timing"] for result in resumed.values()]
+    assert sum(timing["fits_resumed"] for timing in timings) == 10
+    assert sum(timing["fits_run"] for timing in timings) == 7 * 3 - 10
+    assert all(timing["refit_wall_s"] > 0 for timing in timings)
+    assert all(timing["fit_wall_s"] > 0 for timing in timings if timing["fits_run"])
+    assert tmpdir.listdir() == []
+
+
+def test_failed_fits_are_not_journaled(tmpdir, regression_data, models_and_grid):
+    """A fit that raised is scored as NaN for this run but retried when the search resumes."""
+    x, y = regression_data
+    models, param_grid = models_and_grid
+    scheduler = SearchScheduler(os.path.join(tmpdir, "journal.jsonl"), cv=3, n_jobs=1)
+    journal_path = scheduler.journal_file(joblib_hash((x, y, 3)))
+    fit_and_score = search_scheduler._fit_and_score
+
+    def failing(key, model, *args):
+        if isinstance(model, LinearRegression):
+            return key, float("nan"), 0.0, "ValueError: boom"
+        return fit_and_score(key, model, *args)
+
+    with patch.object(search_scheduler, "_fit_and_score", side_effect=failing), \
+            patch.object(search_scheduler.os, "remove"):  # Keep the journal to inspect it
+        result = scheduler.run(x, y, models, param_grid)
+
+    assert "Linear Regression" not in result
+    with open(journal_path) as journal:
+        assert len(journal.readlines()) == 6 * 3
+
+
+def test_multi_threaded_estimators_fit_on_one_thread_in_the_pool():
+    """Estimators with their own thread count are pinned to one thread, unless the pool is sequential."""
+    forest = RandomForestRegressor(n_estimators=5, n_jobs=-1)
+    assert search_scheduler._thread_params(forest) == {"n_jobs": 1}
+    assert search_scheduler._thread_params(LinearRegression()) == {"n_jobs": 1}
+    assert search_scheduler._thread_params(DecisionTreeRegressor()) == {}
+
+    x, y = np.arange(20.0).reshape(10, 2), np.arange(10.0)
+    with patch.object(RandomForestRegressor, "fit", autospec=True, side_effect=lambda self, *args: self) as fit:
+        search_scheduler._fit_and_score("key", forest, {}, x, y, np.arange(5), np.arange(5, 10), single_threaded=True)
+    assert fit.call_args[0][0].n_jobs == 1
+    assert forest.n_jobs == -1
+
+
+def test_changed_data_does_not_reuse_journal(tmpdir, regression_data, models_and_grid):
+    """Journal entries are keyed on the training data, so new data is searched from scratch."""
+    x, y = regression_data
+    models, param_grid = models_and_grid
+    scheduler = SearchScheduler(os.path.join(tmpdir, "journal.jsonl"), cv=3, n_jobs=1)
+    scheduler.run(x, y, models, param_grid)
+
+    with patch.object(search_scheduler, "_fit_and_score", wraps=search_scheduler._fit_and_score) as fit:
+        scheduler.run(x, y + 1.0, models, param_grid)
+
+    assert fit.call_count == 7 * 3
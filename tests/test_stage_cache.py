@@ -0,0 +1,177 @@
+import os
+import numpy as np
+import pytest
+from scipy import sparse
+from unittest.mock import patch, MagicMock
+from src.configuration import config
+from src.stage_cache import StageCache
+from src.utils import load_json
+from src.pipelines.train_pipeline import TrainPipeline
+
+
+@pytest.fixture
+def stage_cache(tmpdir):
+    """Stage cache rooted in a temporary directory."""
+    return StageCache(cache_dir=os.path.join(tmpdir, "cache"), enabled=True, max_entries_per_stage=2)
+
+
+def write(path, content):
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def test_make_key_depends_on_every_input():
+    """Keys are stable for equal inputs and change when any input changes."""
+    key = StageCache.make_key("training", params={"a": [1, 2]}, seed=4)
+    assert key == StageCache.make_key("training", seed=4, params={"a": [1, 2]})
+    assert key != StageCache.make_key("training", params={"a": [1, 3]}, seed=4)
+    assert key != StageCache.make_key("ingestion", params={"a": [1, 2]}, seed=4)
+
+
+def test_store_and_restore_round_trip(tmpdir, stage_cache):
+    """Stored files are copied back into place and arrays/metadata are returned."""
+    output_path = os.path.join(tmpdir, "model.pkl")
+    write(output_path, "model-v1")
+    stage_cache.store("training", "k1", files={"model": output_path},
+                      arrays={"train": np.arange(6).reshape(2, 3)}, metadata={"r2_score": 0.87})
+
+    write(output_path, "overwritten")
+    cached = stage_cache.restore("training", "k1", files={"model": output_path})
+
+    assert open(output_path).read() == "model-v1"
+    np.testing.assert_array_equal(cached.arrays["train"], np.arange(6).reshape(2, 3))
+    assert cached.metadata == {"r2_score": 0.87}
+    assert stage_cache.restore("training", "missing-key", files={"model": output_path}) is None
+
+
+def test_store_and_restore_sparse_arrays(stage_cache):
+    """Sparse feature matrices are stored as .npz and restored as CSR matrices."""
+    x = sparse.random(20, 8, density=0.2, format="csr", random_state=0)
+    stage_cache.store("transformation", "k1", arrays={"x_train": x, "y_train": np.arange(20.0)})
+
+    cached = stage_cache.restore("transformation", "k1")
+
+    assert sparse.isspmatrix_csr(cached.arrays["x_train"])
+    assert (cached.arrays["x_train"] != x).nnz == 0
+    np.testing.assert_array_equal(cached.arrays["y_train"], np.arange(20.0))
+
+
+def test_disabled_cache_never_hits(tmpdir):
+    """A disabled cache stores nothing and always misses."""
+    cache = StageCache(cache_dir=os.path.join(tmpdir, "cache"), enabled=False)
+    output_path = os.path.join(tmpdir, "out.csv")
+    write(output_path, "x")
+    cache.store("ingestion", "k", files={"train": output_path})
+    assert cache.restore("ingestion", "k", files={"train": output_path}) is None
+
+
+def test_prune_keeps_most_recent_entries(tmpdir, stage_cache):
+    """Only `max_entries_per_stage` entries are kept per stage."""
+    output_path = os.path.join(tmpdir, "out.csv")
+    write(output_path, "x")
+    for key in ["k1", "k2", "k3"]:
+        stage_cache.store("ingestion", key, files={"train": output_path})
+
+    assert sorted(os.listdir(os.path.join(stage_cache.cache_dir, "ingestion"))) == ["k2", "k3"]
+
+
+@patch("src.pipelines.train_pipeline.ModelExporter")
+@patch("src.pipelines.train_pipeline.PreprocessorCompiler")
+@patch("src.pipelines.train_pipeline.ModelTrainer")
+@patch("src.pipelines.train_pipeline.DataTransformation")
+@patch("src.pipelines.train_pipeline.DataIngestion")
+def test_train_pipeline_skips_unchanged_stages(mock_ingestion, mock_transformation, mock_trainer, mock_compiler,
+                                               mock_exporter, tmpdir, stage_cache):
+    """A second run with identical inputs restores every stage; changing MODEL_PARAMS reruns only training."""
+    dataset = os.path.join(tmpdir, "raw_input.csv")
+    write(dataset, "a,b\n1,2\n")
+    paths = {name: os.path.join(tmpdir, f"{name}.csv") for name in ["train", "test", "raw", "pre", "model", "report"]}
+
+    ingestion = mock_ingestion.return_value
+    ingestion.ingestion_config = MagicMock(dataset_file=dataset, train_data_path=paths["train"],
+                                           test_data_path=paths["test"], raw_data_path=paths["raw"])
+
+    def ingest():
+        for name in ["train", "test", "raw"]:
+            write(paths[name], name)
+        return paths["train"], paths["test"]
+    ingestion.initiate_data_ingestion.side_effect = ingest
+
+    transformation = mock_transformation.return_value
+    transformation.data_transformation_config.preprocessor_obj_file_path = paths["pre"]
+    transformation.get_data_transformer_object.return_value = {"scaler": "standard"}
+
+    def transform(train_path, test_path):
+        write(paths["pre"], "preprocessor")
+        write(paths["pre"] + ".meta.json", "{}")
+        return sparse.csr_matrix(np.eye(3)), np.ones(3), np.zeros((1, 3)), np.zeros(1), paths["pre"]
+    transformation.initiate_split_transformation.side_effect = transform
+
+    trainer = mock_trainer.return_value
+    trainer.model_trainer_config = MagicMock(trained_model_file_path=paths["model"], report_file_path=paths["report"])
+    trainer.models = {"Linear Regression": "lr"}
+    trainer.model_config = {"Linear Regression": {}}
+    trainer.search_strategy, trainer.tournament_mode = "grid", False
+
+    def train(x_train, y_train, x_test, y_test):
+        assert sparse.issparse(x_train) and x_train.shape == (3, 3)
+        write(paths["model"], "model")
+        write(paths["model"] + ".meta.json", "{}")
+        write(paths["report"], "{}")
+        return 0.9
+    trainer.train_models.side_effect = train
+    mock_compiler.return_value.initiate_preprocessor_compilation.return_value = None  # Nothing exported
+    mock_exporter.return_value.initiate_model_export.return_value = None
+
+    pipeline = TrainPipeline()
+    pipeline.stage_cache = stage_cache
+    report_path = os.path.join(tmpdir, "train_run_report.json")
+    with patch.object(config, "TRAIN_RUN_REPORT_FILE", report_path):
+        assert pipeline.run_pipeline() == 0.9
+        assert pipeline.run_pipeline() == 0.9
+
+    stages = {record["name"]: record for record in load_json(report_path)["stages"]}
+    assert stages["ingestion"]["cached"] and stages["transformation"]["cached"] and stages["training"]["cached"]
+
+    assert ingestion.initiate_data_ingestion.call_count == 1
+    assert transformation.initiate_split_transformation.call_count == 1
+    assert trainer.train_models.call_count == 1
+    # Written after every serving artifact, listing their content hashes
+    assert load_json(paths["model"] + ".manifest.json") == {
+        "model": StageCache.file_hash(paths["model"]), "preprocessor": StageCache.file_hash(paths["pre"])}
+
+    trainer.model_config = {"Linear Regression": {"fit_intercept": [True, False]}}
+    with patch.object(config, "TRAIN_RUN_REPORT_FILE", report_path):
+        pipeline.run_pipeline()
+
+    assert ingestion.initiate_data_ingestion.call_count == 1
+    assert transformation.initiate_split_transformation.call_count == 1
+    assert trainer.train_models.call_count == 2
+
+
+@patch("src.pipelines.train_pipeline.ModelExporter")
+@patch("src.pipelines.train_pipeline.PreprocessorCompiler")
+@patch("src.pipelines.train_pipeline.IncrementalTrainer")
+def test_incremental_mode_updates_or_falls_back(mock_incremental, mock_compiler, mock_exporter, tmpdir):
+    """An incremental update rebuilds the serving artifacts; a fallback runs the full pipeline and records its state."""
+    incremental = mock_incremental.return_value
+    incremental.initiate_incremental_training.return_value = ({"mode": "incremental", "r2_score": 0.91}, np.zeros(1))
+    model_path, preprocessor_path = os.path.join(tmpdir, "model.pkl"), os.path.join(tmpdir, "preprocessor.pkl")
+    write(model_path, "model")
+    write(preprocessor_path, "preprocessor")
+    incremental.model_trainer_config.trained_model_file_path = model_path
+    incremental.data_transformation_config.preprocessor_obj_file_path = preprocessor_path
+    mock_compiler.return_value.initiate_preprocessor_compilation.return_value = None
+    mock_exporter.return_value.initiate_model_export.return_value = None
+    pipeline = TrainPipeline()
+    with patch.object(config, "TRAIN_MODE", "incremental"), \
+            patch.object(config, "TRAIN_RUN_REPORT_FILE", os.path.join(tmpdir, "train_run_report.json")):
+        assert pipeline.run_pipeline() == 0.91
+        mock_compiler.return_value.initiate_preprocessor_compilation.assert_called_once()
+        mock_exporter.return_value.initiate_model_export.assert_called_once()
+        assert os.path.exists(model_path + ".manifest.json")
+
+        incremental.initiate_incremental_training.return_value = ({"mode": "full", "reason": "drift"}, None)
+        with patch.object(TrainPipeline, "_run_stages", return_value=0.88):
+            assert pipeline.run_pipeline() == 0.88
+        incremental.record_state.assert_called_once_with(0.88)